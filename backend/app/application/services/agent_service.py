@@ -1,21 +1,32 @@
-from typing import AsyncGenerator, Dict, Any, Optional, Generator, List
+from typing import AsyncGenerator, Dict, Any, Optional, Generator, List, Tuple
+import asyncio
+import base64
 import logging
 from datetime import datetime
-from app.domain.models.session import Session
+from app.domain.models.session import Session, SessionEventPage, SessionSummary
+from app.domain.models.memory import ContextLimits
+from app.domain.models.llm_usage import LLMUsage
+from app.domain.repositories.llm_usage_repository import LLMUsageRepository
 from app.domain.repositories.session_repository import SessionRepository
 from app.interfaces.schemas.request import AttachmentBindRequest
 
 from app.interfaces.schemas.response import ShellViewResponse, FileViewResponse, GetSessionResponse
 from app.domain.services.agent_domain_service import AgentDomainService
-from app.domain.events.agent_events import AgentEvent
-from app.application.errors.exceptions import NotFoundError
+from app.domain.services.task_scheduler import TaskScheduler, SchedulerStats
+from app.domain.services.flow_recovery_service import FlowRecoveryService
+from app.domain.repositories.checkpoint_repository import CheckpointRepository
+from app.domain.external.session_change_feed import SessionChangeFeed
+from app.application.services.session_list_broadcaster import SessionListBroadcaster, SessionListChanges
+from app.domain.events.agent_events import AgentEvent, PlanEvent
+from app.domain.events.event_codec import EventEncoding
+from app.application.errors.exceptions import NotFoundError, BadRequestError
 from typing import Type
 from app.domain.models.agent import Agent
 from app.domain.external.sandbox import Sandbox
 from app.domain.external.search import SearchEngine
 from app.domain.external.llm import LLM
 from app.domain.repositories.agent_repository import AgentRepository
-from app.domain.external.task import Task
+from app.domain.external.task import Task, TaskRunner
 from app.domain.utils.json_parser import JsonParser
 
 # Set up logger
@@ -31,11 +42,21 @@ class AgentService:
             sandbox_cls: Type[Sandbox],
             task_cls: Type[Task],
             json_parser: JsonParser,
-            search_engine: Optional[SearchEngine] = None
+            search_engine: Optional[SearchEngine] = None,
+            use_workers: bool = False,
+            task_scheduler: Optional[TaskScheduler] = None,
+            checkpoint_repository: Optional[CheckpointRepository] = None,
+            max_recovery_attempts: int = 3,
+            event_encoding: EventEncoding = EventEncoding.JSON,
+            session_change_feed: Optional[SessionChangeFeed] = None,
+            session_flush_interval_seconds: float = 1.0,
+            context_limits: Optional[ContextLimits] = None,
+            llm_usage_repository: Optional[LLMUsageRepository] = None,
     ):
         logger.info("Initializing AgentService")
         self._agent_repository = agent_repository
         self._session_repository = session_repository
+        self._llm_usage_repository = llm_usage_repository
         self._agent_domain_service = AgentDomainService(
             self._agent_repository,
             self._session_repository,
@@ -44,7 +65,24 @@ class AgentService:
             task_cls,
             json_parser,
             search_engine,
+            use_workers,
+            task_scheduler,
+            checkpoint_repository,
+            event_encoding,
+            session_flush_interval_seconds,
+            context_limits,
         )
+        self._flow_recovery = None
+        if checkpoint_repository:
+            self._flow_recovery = FlowRecoveryService(
+                checkpoint_repository,
+                self._session_repository,
+                self._agent_domain_service,
+                max_recovery_attempts,
+            )
+        self._session_list_broadcaster = None
+        if session_change_feed:
+            self._session_list_broadcaster = SessionListBroadcaster(self._session_repository, session_change_feed)
         self._llm = llm
         self._search_engine = search_engine
         self._sandbox_cls = sandbox_cls
@@ -92,11 +130,12 @@ class AgentService:
             session_id: str,
             message: Optional[str] = None,
             timestamp: Optional[datetime] = None,
-            event_id: Optional[str] = None
+            event_id: Optional[str] = None,
+            client_id: Optional[str] = None
     ) -> AsyncGenerator[AgentEvent, None]:
         logger.info(f"Starting chat with session {session_id}: {message[:50]}...")
         # Directly use the domain service's chat method, which will check if the session exists
-        async for event in self._agent_domain_service.chat(session_id, message, timestamp, event_id):
+        async for event in self._agent_domain_service.chat(session_id, message, timestamp, event_id, client_id):
             logger.debug(f"Received event: {event}")
             yield event
         logger.info(f"Chat with session {session_id} completed")
@@ -108,9 +147,115 @@ class AgentService:
             raise NotFoundError(f"Session not found: {session_id}")
         return session
 
+    async def get_session_events(self, session_id: str) -> AsyncGenerator[AgentEvent, None]:
+        async for event in self._session_repository.get_events(session_id):
+            yield event
+
+    async def get_session_event_page(
+            self,
+            session_id: str,
+            limit: Optional[int] = None,
+            before: Optional[int] = None,
+            after: Optional[int] = None,
+            compact: bool = False
+    ) -> Tuple[SessionEventPage, Optional[PlanEvent]]:
+        """Get a page of a session's event history, the latest events without a cursor
+
+        Args:
+            session_id: Session ID
+            limit: Most events in the page, all of them if None
+            before: Sequence number to page backwards from
+            after: Sequence number to page forwards from
+            compact: Leave tool content out of the events
+
+        Returns:
+            The page, and the latest plan of the session when the page starts
+            after it, so the plan can be shown without reading older pages
+        """
+        if before is not None and after is not None:
+            raise BadRequestError("Only one of before and after can be given")
+        page = await self._session_repository.get_event_page(session_id, limit, before, after, compact)
+        latest_plan = None
+        if page.has_before:
+            latest_plan = await self._session_repository.get_latest_event(session_id, "plan")
+        return page, latest_plan
+
     async def get_all_sessions(self) -> List[Session]:
         return await self._session_repository.get_all()
 
+    async def get_session_summaries(
+            self,
+            limit: int,
+            cursor: Optional[str] = None
+    ) -> Tuple[List[SessionSummary], Optional[str]]:
+        """Get a page of session summaries, most recently active first
+
+        Args:
+            limit: Page size
+            cursor: Cursor returned with the previous page, None for the first page
+
+        Returns:
+            Tuple[List[SessionSummary], Optional[str]]: The page and the cursor of the next one, None on the last page
+        """
+        before = self._decode_session_cursor(cursor) if cursor else None
+        summaries = await self._session_repository.get_summaries(limit, before)
+        next_cursor = None
+        if len(summaries) == limit and summaries[-1].latest_message_at:
+            next_cursor = self._encode_session_cursor(summaries[-1])
+        return summaries, next_cursor
+
+    async def watch_sessions(
+            self,
+            limit: int,
+            poll_interval_seconds: int = 5
+    ) -> AsyncGenerator[Tuple[SessionListChanges, Optional[str]], None]:
+        """Follow the session list
+
+        The first update is a snapshot of the first page, the following ones only
+        carry the sessions that changed. Without a change feed every update is a
+        snapshot taken every `poll_interval_seconds`.
+
+        Args:
+            limit: Page size of snapshots
+            poll_interval_seconds: Snapshot interval when there is no change feed
+
+        Yields:
+            Tuple[SessionListChanges, Optional[str]]: The update and, for snapshots,
+            the cursor of the next page. Snapshots have `resync` set.
+        """
+        if not self._session_list_broadcaster:
+            while True:
+                summaries, next_cursor = await self.get_session_summaries(limit)
+                yield SessionListChanges(resync=True, sessions=summaries), next_cursor
+                await asyncio.sleep(poll_interval_seconds)
+
+        # Subscribe before the snapshot so no change falls in between
+        subscription = self._session_list_broadcaster.subscribe()
+        try:
+            summaries, next_cursor = await self.get_session_summaries(limit)
+            yield SessionListChanges(resync=True, sessions=summaries), next_cursor
+            async for changes in subscription:
+                if changes.resync:
+                    summaries, next_cursor = await self.get_session_summaries(limit)
+                    yield SessionListChanges(resync=True, sessions=summaries), next_cursor
+                elif changes.sessions or changes.deleted_session_ids:
+                    yield changes, None
+        finally:
+            self._session_list_broadcaster.unsubscribe(subscription)
+
+    @staticmethod
+    def _encode_session_cursor(summary: SessionSummary) -> str:
+        raw = f"{summary.latest_message_at.isoformat()}|{summary.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def _decode_session_cursor(cursor: str) -> Tuple[datetime, str]:
+        try:
+            latest_message_at, session_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+            return datetime.fromisoformat(latest_message_at), session_id
+        except ValueError:
+            raise BadRequestError(f"Invalid session cursor: {cursor}")
+
     async def delete_session(self, session_id: str, attachment_service):
         await self._agent_domain_service.stop_session(session_id)
         await self._session_repository.delete(session_id)
@@ -123,8 +268,44 @@ class AgentService:
     async def stop_session(self, session_id: str):
         await self._agent_domain_service.stop_session(session_id)
 
+    async def create_task_runner(self, session_id: str) -> TaskRunner:
+        """Create the task runner for a session, used by worker processes"""
+        return await self._agent_domain_service.create_task_runner(session_id)
+
+    async def get_session_llm_usage(self, session_id: str) -> Optional[LLMUsage]:
+        """Get the tokens and time LLM calls took for a session, None when LLM usage is not recorded"""
+        # Summaries are enough to know the session exists, without restoring an archived one
+        if not await self._session_repository.get_summaries_by_ids([session_id]):
+            logger.warning(f"Session not found: {session_id}")
+            raise NotFoundError(f"Session not found: {session_id}")
+        if not self._llm_usage_repository:
+            return None
+        return await self._llm_usage_repository.get_usage(session_id=session_id)
+
+    async def get_llm_usage(self, agent_id: Optional[str] = None, since: Optional[datetime] = None) -> Optional[LLMUsage]:
+        """Get the tokens and time of all LLM calls, or of one agent's, None when LLM usage is not recorded"""
+        if not self._llm_usage_repository:
+            return None
+        return await self._llm_usage_repository.get_usage(agent_id=agent_id, since=since)
+
+    def get_scheduler_stats(self) -> Optional[SchedulerStats]:
+        """Get admission control metrics, None when admission control is disabled"""
+        return self._agent_domain_service.get_scheduler_stats()
+
+    def start_flow_recovery(self, interval_seconds: int) -> None:
+        """Periodically resume sessions whose task was lost with a crashed process"""
+        if self._flow_recovery:
+            self._flow_recovery.start(interval_seconds)
+
+    async def stop_flow_recovery(self) -> None:
+        if self._flow_recovery:
+            await self._flow_recovery.shutdown()
+
     async def shutdown(self):
         logger.info("Closing all agents and cleaning up resources")
+        await self.stop_flow_recovery()
+        if self._session_list_broadcaster:
+            await self._session_list_broadcaster.shutdown()
         # Clean up all Agents and their associated sandboxes
         await self._agent_domain_service.shutdown()
         logger.info("All agents closed successfully")
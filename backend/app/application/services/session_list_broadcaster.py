@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from typing import AsyncGenerator, Dict, List, Optional, Set
+from pydantic import BaseModel
+from app.domain.external.session_change_feed import SessionChangeFeed
+from app.domain.models.session import SessionSummary
+from app.domain.repositories.session_repository import SessionRepository
+
+logger = logging.getLogger(__name__)
+
+
+class SessionListChanges(BaseModel):
+    """Changes to deliver to one session list viewer"""
+    resync: bool = False  # Changes may have been missed, the viewer needs a fresh snapshot
+    sessions: List[SessionSummary] = []
+    deleted_session_ids: List[str] = []
+
+
+class SessionListSubscription:
+    """Changes pending for one viewer, repeated changes to a session collapse into the latest"""
+
+    def __init__(self):
+        self._pending: Dict[str, Optional[SessionSummary]] = {}
+        self._resync = False
+        self._ready = asyncio.Event()
+
+    def push(self, changes: Dict[str, Optional[SessionSummary]]) -> None:
+        self._pending.update(changes)
+        self._ready.set()
+
+    def request_resync(self) -> None:
+        self._resync = True
+        self._pending.clear()
+        self._ready.set()
+
+    async def __aiter__(self) -> AsyncGenerator[SessionListChanges, None]:
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            pending, self._pending = self._pending, {}
+            resync, self._resync = self._resync, False
+            yield SessionListChanges(
+                resync=resync,
+                sessions=[summary for summary in pending.values() if summary is not None],
+                deleted_session_ids=[session_id for session_id, summary in pending.items() if summary is None],
+            )
+
+
+class SessionListBroadcaster:
+    """
+    Fans session changes out to the session list viewers of this process.
+
+    A single consumer follows the change feed and loads the summaries of each
+    batch of changed sessions once, whatever the number of viewers.
+    """
+
+    def __init__(self, session_repository: SessionRepository, change_feed: SessionChangeFeed):
+        self._session_repository = session_repository
+        self._change_feed = change_feed
+        self._subscriptions: Set[SessionListSubscription] = set()
+        self._consumer: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> SessionListSubscription:
+        """Start receiving changes, call unsubscribe() once done"""
+        subscription = SessionListSubscription()
+        self._subscriptions.add(subscription)
+        if self._consumer is None or self._consumer.done():
+            self._consumer = asyncio.create_task(self._consume())
+        return subscription
+
+    def unsubscribe(self, subscription: SessionListSubscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    async def _consume(self) -> None:
+        try:
+            async for session_ids in self._change_feed.subscribe():
+                if session_ids is None:
+                    for subscription in self._subscriptions:
+                        subscription.request_resync()
+                    continue
+                if not self._subscriptions:
+                    continue
+                try:
+                    summaries = await self._session_repository.get_summaries_by_ids(session_ids)
+                except Exception as e:
+                    logger.error(f"Failed to load changed sessions, resyncing viewers: {str(e)}")
+                    for subscription in self._subscriptions:
+                        subscription.request_resync()
+                    continue
+                # Sessions missing from the result were deleted
+                changes: Dict[str, Optional[SessionSummary]] = {session_id: None for session_id in session_ids}
+                changes.update({summary.id: summary for summary in summaries})
+                for subscription in self._subscriptions:
+                    subscription.push(changes)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Session list broadcaster stopped")
+
+    async def shutdown(self) -> None:
+        """Stop following the change feed"""
+        if self._consumer is not None and not self._consumer.done():
+            self._consumer.cancel()
+            try:
+                await self._consumer
+            except asyncio.CancelledError:
+                pass
+        self._consumer = None
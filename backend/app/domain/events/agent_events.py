@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Dict, Any, Literal, Optional, Union, List
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from typing import Annotated, Dict, Any, Literal, Optional, Union, List
 from datetime import datetime
 import time
 import uuid
@@ -91,6 +91,17 @@ class MessageEvent(BaseEvent):
     role: Literal["user", "assistant"] = "assistant"
     message: str
 
+class MessageDeltaEvent(BaseEvent):
+    """Text of a message still being written, not persisted
+
+    Deltas of the same message share its message_id and are followed by the
+    complete message as a MessageEvent, or the tool event carrying it.
+    """
+    type: Literal["message_delta"] = "message_delta"
+    role: Literal["assistant"] = "assistant"
+    message_id: str
+    delta: str
+
 class DoneEvent(BaseEvent):
     """Done event"""
     type: Literal["done"] = "done"
@@ -99,6 +110,11 @@ class WaitEvent(BaseEvent):
     """Wait event"""
     type: Literal["wait"] = "wait"
 
+class QueueEvent(BaseEvent):
+    """Queue position of a chat waiting for a free run slot, not persisted"""
+    type: Literal["queue"] = "queue"
+    position: int
+
 AgentEvent = Union[
     BaseEvent,
     ErrorEvent,
@@ -106,38 +122,45 @@ AgentEvent = Union[
     ToolEvent,
     StepEvent,
     MessageEvent,
+    MessageDeltaEvent,
     DoneEvent,
     TitleEvent,
-    WaitEvent
+    WaitEvent,
+    QueueEvent
 ]
 
 
+# Concrete events keyed on their type tag, decoded in a single validation pass
+_EVENT_ADAPTER: TypeAdapter = TypeAdapter(Annotated[
+    Union[
+        ErrorEvent,
+        PlanEvent,
+        ToolEvent,
+        StepEvent,
+        MessageEvent,
+        MessageDeltaEvent,
+        DoneEvent,
+        TitleEvent,
+        WaitEvent,
+        QueueEvent,
+    ],
+    Field(discriminator="type")
+])
+
+
 class AgentEventFactory:
     """Factory class for JSON conversion and AgentEvent manipulation"""
     
     @staticmethod
     def from_json(event_str: str) -> AgentEvent:
         """Create an AgentEvent from JSON string"""
-        event = BaseEvent.model_validate_json(event_str)
-        
-        if (event.type == "plan"):
-            return PlanEvent.model_validate_json(event_str)
-        elif (event.type == "step"): 
-            return StepEvent.model_validate_json(event_str)
-        elif (event.type == "tool"):
-            return ToolEvent.model_validate_json(event_str)
-        elif (event.type == "message"):
-            return MessageEvent.model_validate_json(event_str)
-        elif (event.type == "error"):
-            return ErrorEvent.model_validate_json(event_str)
-        elif (event.type == "done"):
-            return DoneEvent.model_validate_json(event_str)
-        elif (event.type == "title"):
-            return TitleEvent.model_validate_json(event_str)
-        elif (event.type == "wait"):
-            return WaitEvent.model_validate_json(event_str)
-        else:
-            return event
+        try:
+            return _EVENT_ADAPTER.validate_json(event_str)
+        except ValidationError as e:
+            if e.errors()[0]["type"] != "union_tag_invalid":
+                raise
+            # Unknown event types are kept as plain events
+            return BaseEvent.model_validate_json(event_str)
     
     @staticmethod
     def to_json(event: AgentEvent) -> str:
@@ -0,0 +1,78 @@
+from enum import Enum
+from typing import Dict, Type, Union, get_args
+import msgpack
+from app.domain.events.agent_events import AgentEvent, AgentEventFactory, BaseEvent
+
+# Bumped whenever the layout of encoded events changes incompatibly
+EVENT_SCHEMA_VERSION = 1
+
+# Wire tags of the event types, a tag must never be reused for another type
+EVENT_TYPE_TAGS: Dict[str, int] = {
+    "error": 1,
+    "plan": 2,
+    "tool": 3,
+    "title": 4,
+    "step": 5,
+    "message": 6,
+    "done": 7,
+    "wait": 8,
+    "queue": 9,
+    "message_delta": 10,
+}
+
+_EVENT_CLASSES: Dict[int, Type[BaseEvent]] = {
+    EVENT_TYPE_TAGS[event_cls.model_fields["type"].default]: event_cls
+    for event_cls in get_args(AgentEvent)
+    if event_cls is not BaseEvent
+}
+
+
+class EventEncoding(str, Enum):
+    """Encoding of events written to task streams"""
+    JSON = "json"
+    MSGPACK = "msgpack"
+
+
+class AgentEventCodec:
+    """Encodes events for task streams and decodes them whatever their encoding
+
+    A msgpack payload is `[schema version, type tag, fields]`. The type is carried
+    by the tag and the event ID is left out, readers take the stream entry ID as
+    event ID. Decoding validates the fields once against the tagged event class.
+    """
+
+    def __init__(self, encoding: EventEncoding = EventEncoding.JSON):
+        self._encoding = EventEncoding(encoding)
+
+    @property
+    def encoding(self) -> EventEncoding:
+        return self._encoding
+
+    def encode(self, event: BaseEvent) -> Union[str, bytes]:
+        """Encode an event for a stream"""
+        if self._encoding == EventEncoding.JSON:
+            return event.model_dump_json()
+        tag = EVENT_TYPE_TAGS.get(event.type)
+        if tag is None:
+            raise ValueError(f"Event type {event.type} has no wire tag")
+        fields = event.model_dump(mode="json", exclude={"type", "id"})
+        return msgpack.packb([EVENT_SCHEMA_VERSION, tag, fields], use_bin_type=True)
+
+    @staticmethod
+    def decode(payload: Union[str, bytes]) -> AgentEvent:
+        """Decode an event written in either encoding
+
+        Payloads read through a text Redis connection arrive as str, binary ones
+        are restored from the surrogate escapes left by decoding.
+        """
+        if isinstance(payload, str):
+            if payload.startswith("{"):
+                return AgentEventFactory.from_json(payload)
+            payload = payload.encode("utf-8", "surrogateescape")
+        version, tag, fields = msgpack.unpackb(payload, raw=False)
+        if version > EVENT_SCHEMA_VERSION:
+            raise ValueError(f"Unsupported event schema version {version}")
+        event_cls = _EVENT_CLASSES.get(tag)
+        if event_cls is None:
+            raise ValueError(f"Unknown event type tag {tag}")
+        return event_cls.model_validate(fields)
@@ -1,4 +1,49 @@
-from typing import List, Dict, Any, Optional, Protocol
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional, Protocol
+from pydantic import BaseModel
+
+
+class LLMCallScope(BaseModel):
+    """Who LLM calls are made for, so their cost can be accounted to it"""
+    session_id: Optional[str] = None
+    agent_id: Optional[str] = None
+    caller: Optional[str] = None
+
+
+_llm_call_scope: ContextVar[LLMCallScope] = ContextVar("llm_call_scope", default=LLMCallScope())
+
+
+@contextmanager
+def llm_call_scope(
+    session_id: Optional[str] = None,
+    agent_id: Optional[str] = None,
+    caller: Optional[str] = None
+) -> Iterator[LLMCallScope]:
+    """Attribute the LLM calls made within the block, fields not given are kept from the enclosing scope
+
+    Scopes follow the asyncio context, so they carry over into tasks created within the block.
+    """
+    fields = {"session_id": session_id, "agent_id": agent_id, "caller": caller}
+    scope = _llm_call_scope.get().model_copy(update={k: v for k, v in fields.items() if v is not None})
+    token = _llm_call_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _llm_call_scope.reset(token)
+
+
+def current_llm_call_scope() -> LLMCallScope:
+    """Get the scope LLM calls are currently made in"""
+    return _llm_call_scope.get()
+
+
+class LLMStreamChunk(BaseModel):
+    """Piece of a streamed LLM response"""
+    content: Optional[str] = None  # Text added to the content of the message
+    tool_calls: List[Dict[str, Any]] = []  # Tool calls assembled so far, set when a chunk extends them
+    message: Optional[Dict[str, Any]] = None  # The complete message, on the last chunk only
+
 
 class LLM(Protocol):
     """AI service gateway interface for interacting with AI services"""
@@ -21,6 +66,27 @@ class LLM(Protocol):
         """
         ... 
 
+    def ask_stream(
+        self,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """Send chat request to AI service and stream the response as it is generated
+
+        The call is attributed to the LLM call scope current when this is called,
+        not when the chunks are read.
+
+        Args:
+            messages: List of messages, including conversation history
+            tools: Optional list of tools for function calling
+            response_format: Optional response format configuration
+
+        Returns:
+            Chunks of the response, the last one carrying the complete message
+        """
+        ...
+
     @property
     def model_name(self) -> str:
         """Get the model name"""
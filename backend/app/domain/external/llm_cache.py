@@ -0,0 +1,12 @@
+from typing import Any, Dict, Optional, Protocol
+
+class LLMCache(Protocol):
+    """Responses of an LLM kept by a hash of the request that produced them"""
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a copy of the response cached for a request key, None on a miss"""
+        ...
+
+    async def put(self, key: str, message: Dict[str, Any]) -> None:
+        """Cache the response to a request"""
+        ...
@@ -0,0 +1,29 @@
+from typing import Any, Dict, List, Optional, Protocol
+from app.domain.models.memory import Memory
+
+class MemoryCache(Protocol):
+    """Copies of agent memories kept close to the process running the agent"""
+
+    def get(self, agent_id: str, name: str) -> Optional[Memory]:
+        """Get a copy of a cached memory, None on a miss"""
+        ...
+
+    def put(self, agent_id: str, name: str, memory: Memory) -> None:
+        """Cache a memory as it is stored"""
+        ...
+
+    def append(self, agent_id: str, name: str, messages: List[Dict[str, Any]], version: int) -> None:
+        """Record messages appended to a stored memory, which is now at `version`"""
+        ...
+
+    def set_summary(self, agent_id: str, name: str, summary: str, summarized: int) -> None:
+        """Record the summary stored for a memory"""
+        ...
+
+    def invalidate(self, agent_id: str, name: Optional[str] = None) -> None:
+        """Drop one memory of an agent, or all of them"""
+        ...
+
+    async def claim(self, agent_id: str) -> None:
+        """Announce that this process now runs the agent, so copies held by others go stale"""
+        ...
@@ -1,4 +1,4 @@
-from typing import Any, Protocol, Tuple, Optional
+from typing import Any, AsyncGenerator, List, Protocol, Tuple, Optional
 
 class MessageQueue(Protocol):
     """Message queue interface for agent communication"""
@@ -11,6 +11,14 @@ class MessageQueue(Protocol):
         """
         ...
     
+    async def put_many(self, messages: List[Any]) -> List[str]:
+        """Put several messages into the queue in a single round trip
+        
+        Returns:
+            List[str]: Message IDs, in the same order as the messages
+        """
+        ...
+    
     async def get(self, start_id: Optional[str] = None, block_ms: Optional[int] = None) -> Tuple[str, Any]:
         """Get a message from the queue
         
@@ -23,14 +31,54 @@ class MessageQueue(Protocol):
         """
         ...
     
-    async def pop(self) -> Tuple[str, Any]:
+    async def get_batch(self, start_id: Optional[str] = None, count: int = 100, block_ms: Optional[int] = None) -> List[Tuple[str, Any]]:
+        """Get up to count messages from the queue
+        
+        Args:
+            start_id: Message ID to start reading from, defaults to "0" meaning from the earliest message
+            count: Maximum number of messages to return
+            block_ms: Block time in milliseconds, defaults to None meaning no blocking
+            
+        Returns:
+            List[Tuple[str, Any]]: (Message ID, Message content) pairs, empty if no message
+        """
+        ...
+    
+    def listen(self, start_id: Optional[str] = None) -> AsyncGenerator[Tuple[str, Any], None]:
+        """Follow the queue and yield messages as they arrive
+        
+        Args:
+            start_id: Message ID to start after, defaults to "0" meaning from the earliest message
+            
+        Yields:
+            Tuple[str, Any]: (Message ID, Message content)
+        """
+        ...
+    
+    async def pop(self, block_ms: Optional[int] = None) -> Tuple[str, Any]:
         """Get and remove the first message from the queue
         
+        Args:
+            block_ms: Block time in milliseconds, defaults to None meaning no blocking
+            
         Returns:
             Tuple[str, Any]: (Message ID, Message content), returns (None, None) if queue is empty
         """
         ...
     
+    async def ack(self, message_id: str) -> bool:
+        """Acknowledge that a popped message has been processed
+        
+        Queues with at-least-once delivery redeliver popped messages that are never acknowledged.
+        
+        Args:
+            message_id: ID of the popped message
+            
+        Returns:
+            bool: True if message was acknowledged successfully, False otherwise
+        """
+        ...
+    
     async def clear(self) -> None:
         """Clear all messages from the queue"""
         ...
@@ -0,0 +1,21 @@
+from typing import Protocol
+
+class SessionArchive(Protocol):
+    """Cold storage for the history of sessions no longer in use
+
+    An archived session keeps its own fields, so it still shows in session
+    lists, but its events, agent memories and the tool results its agent
+    stored aside only live in the archive until the session is restored.
+    """
+
+    async def restore(self, session_id: str) -> bool:
+        """Bring an archived session's events and agent memories back
+
+        Returns:
+            bool: Whether anything was restored, False for sessions not archived
+        """
+        ...
+
+    async def discard(self, session_id: str) -> None:
+        """Delete the archive of a session, if it has one"""
+        ...
@@ -0,0 +1,17 @@
+from typing import AsyncGenerator, List, Optional, Protocol
+
+class SessionChangeFeed(Protocol):
+    """Notifications about sessions whose list fields changed"""
+
+    async def publish(self, session_id: str) -> None:
+        """Announce that a session was created, updated or deleted"""
+        ...
+
+    def subscribe(self) -> AsyncGenerator[Optional[List[str]], None]:
+        """Follow the changes
+
+        Yields:
+            Optional[List[str]]: IDs of the sessions changed since the last batch,
+            or None when changes may have been missed and subscribers should reload
+        """
+        ...
@@ -83,9 +83,12 @@ class Task(Protocol):
         ...
     
     @classmethod
-    def get(cls, task_id: str) -> Optional["Task"]:
+    async def get(cls, task_id: str) -> Optional["Task"]:
         """Get a task by its ID.
 
+        The task may be running in another process; the returned instance then
+        routes run and cancel requests to its owner.
+
         Returns:
             Optional[Task]: Task instance if found, None otherwise
         """
@@ -103,6 +106,20 @@ class Task(Protocol):
         """
         ...
 
+    @classmethod
+    def create_queued(cls, session_id: str) -> "Task":
+        """Create a task that a worker process will run.
+
+        The worker builds the task runner for the session itself once it claims the task.
+
+        Args:
+            session_id (str): Session the task belongs to
+
+        Returns:
+            Task: Handle on the queued task
+        """
+        ...
+
     @classmethod
     async def destroy(cls) -> None:
         """Destroy all task instances.
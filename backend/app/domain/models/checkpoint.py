@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+from datetime import datetime, UTC
+from typing import Optional
+from app.domain.models.plan import Plan
+
+
+class FlowCheckpoint(BaseModel):
+    """Snapshot of a session's flow state machine, written at every transition"""
+    session_id: str
+    agent_id: str
+    status: str  # State of the flow, see AgentStatus
+    message: str  # Message the flow is working on
+    plan: Optional[Plan] = None
+    step_id: Optional[str] = None  # Step being executed when the checkpoint was written
+    recovery_count: int = 0  # Times the flow was resumed after its task was lost
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
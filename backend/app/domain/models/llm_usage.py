@@ -0,0 +1,37 @@
+from datetime import datetime, UTC
+import uuid
+from typing import Dict, Optional
+from pydantic import BaseModel, Field
+
+
+class LLMCall(BaseModel):
+    """Tokens and time spent on one LLM call"""
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)  # Stable, so a batch retried after a partial write is not recorded twice
+    session_id: Optional[str] = None
+    agent_id: Optional[str] = None
+    caller: str = "unknown"  # What made the call: planner, execution, summary, json_repair, browser
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0  # Prompt tokens served from the provider's prompt cache
+    duration_ms: float = 0.0  # Wall time, retries and their backoff included
+    retries: int = 0
+    success: bool = True
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+
+class LLMUsageTotals(BaseModel):
+    """Sums over a set of LLM calls"""
+    calls: int = 0
+    failures: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    duration_ms: float = 0.0
+    retries: int = 0
+
+
+class LLMUsage(BaseModel):
+    """LLM calls of a session, an agent or the whole deployment, in total and by caller"""
+    total: LLMUsageTotals = LLMUsageTotals()
+    by_caller: Dict[str, LLMUsageTotals] = {}
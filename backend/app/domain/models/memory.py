@@ -1,11 +1,21 @@
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 
+class ContextLimits(BaseModel):
+    """Limits on the memory an agent sends to the LLM with each call"""
+    budget_tokens: int = 0  # Most memory tokens sent per call, older turns are summarized past it, 0 for no limit
+    tool_result_max_bytes: int = 0  # Larger tool results are stored aside and sent as stubs after the next call, 0 for no limit
+    tool_result_stale_turns: int = 0  # Tool results older than this many turns are sent as stubs, 0 keeps them
+
+
 class Memory(BaseModel):
     """
     Memory class, defining the basic behavior of memory
     """
     messages: List[Dict[str, Any]] = []
+    version: int = 0  # Number of writes persisted, used to detect concurrent writers
+    summary: Optional[str] = None  # Rolling summary of the oldest messages, sent to the LLM in their place
+    summarized: int = 0  # Number of leading messages the summary covers
 
     def get_message_role(self, message: Dict[str, Any]) -> str:
         """Get the role of the message"""
@@ -3,8 +3,7 @@ from datetime import datetime, UTC
 from typing import List, Optional
 from enum import Enum
 import uuid
-from app.domain.events.agent_events import BaseEvent, PlanEvent, AgentEvent
-from app.domain.models.plan import Plan
+from app.domain.events.agent_events import AgentEvent
 
 
 class SessionStatus(str, Enum):
@@ -27,12 +26,41 @@ class Session(BaseModel):
     latest_message_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(UTC))
     created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
-    events: List[AgentEvent] = []
     status: SessionStatus = SessionStatus.PENDING
 
-    def get_last_plan(self) -> Optional[Plan]:
-        """Get the last plan from the events"""
-        for event in reversed(self.events):
-            if isinstance(event, PlanEvent):
-                return event.plan
-        return None
\ No newline at end of file
+
+class SessionSummary(BaseModel):
+    """Fields of a session shown in session lists"""
+    id: str
+    title: Optional[str] = None
+    status: SessionStatus
+    unread_message_count: int = 0
+    latest_message: Optional[str] = None
+    latest_message_at: Optional[datetime] = None
+
+
+class SessionEventPage(BaseModel):
+    """A run of consecutive events of a session, oldest first"""
+    events: List[AgentEvent] = []
+    first_seq: Optional[int] = None  # Sequence numbers of the first and last events in the page
+    last_seq: Optional[int] = None
+    has_before: bool = False  # Whether the session has events older than the page
+    has_after: bool = False  # Whether the session has events newer than the page
+
+
+class SessionUpdate(BaseModel):
+    """Changes to apply to a session at once, unset fields are left as they are"""
+    title: Optional[str] = None
+    latest_message: Optional[str] = None
+    latest_message_at: Optional[datetime] = None
+    status: Optional[SessionStatus] = None
+    unread_message_increment: int = 0
+
+    def is_empty(self) -> bool:
+        return not (self.model_fields_set - {"unread_message_increment"}) and not self.unread_message_increment
+
+    def merge(self, newer: "SessionUpdate") -> "SessionUpdate":
+        """Combine with a later update, whose fields win"""
+        merged = self.model_copy(update=newer.model_dump(exclude_unset=True, exclude={"unread_message_increment"}))
+        merged.unread_message_increment = self.unread_message_increment + newer.unread_message_increment
+        return merged
@@ -1,4 +1,4 @@
-from typing import Optional, List, Protocol
+from typing import Any, Dict, Optional, List, Protocol
 from app.domain.models.agent import Agent
 from app.domain.models.plan import Plan
 from app.domain.models.memory import Memory
@@ -24,6 +24,43 @@ class AgentRepository(Protocol):
         """Get memory by name from agent, create if not exists"""
         ...
 
-    async def save_memory(self, agent_id: str, name: str, memory: Memory) -> None:
-        """Update the messages of a memory"""
-        ... 
\ No newline at end of file
+    async def save_memory(self, agent_id: str, name: str, memory: Memory) -> int:
+        """Replace the messages of a memory
+
+        Returns:
+            int: The new version of the memory
+        """
+        ...
+
+    async def append_memory(
+        self,
+        agent_id: str,
+        name: str,
+        messages: List[Dict[str, Any]],
+        expected_version: int
+    ) -> Optional[int]:
+        """Append messages to a memory without rewriting the stored ones
+
+        The messages are appended only if the stored memory is still at
+        `expected_version`, so writers holding a stale copy cannot interleave.
+
+        Returns:
+            Optional[int]: The new version, None if the memory was written by someone else
+        """
+        ...
+
+    async def save_memory_summary(self, agent_id: str, name: str, summary: str, summarized: int) -> None:
+        """Record the rolling summary of the first `summarized` messages of a memory"""
+        ...
+
+    async def save_tool_payload(self, agent_id: str, tool_call_id: str, content: str) -> None:
+        """Store the full result of a tool call kept out of memory"""
+        ...
+
+    async def get_tool_payload(self, agent_id: str, tool_call_id: str) -> Optional[str]:
+        """Get the stored full result of a tool call, None if it was not stored"""
+        ...
+
+    async def claim_memories(self, agent_id: str) -> None:
+        """Announce that this process now runs the agent, so memories cached by others are dropped"""
+        ...
@@ -0,0 +1,32 @@
+from typing import Optional, Protocol, List
+from app.domain.models.checkpoint import FlowCheckpoint
+
+class CheckpointRepository(Protocol):
+    """Repository interface for flow checkpoints"""
+
+    async def save(self, checkpoint: FlowCheckpoint) -> None:
+        """Save or replace the checkpoint of a session, keeping its recovery count"""
+        ...
+
+    async def find_by_session_id(self, session_id: str) -> Optional[FlowCheckpoint]:
+        """Find the checkpoint of a session"""
+        ...
+
+    async def get_all(self) -> List[FlowCheckpoint]:
+        """Get the checkpoints of all flows in progress"""
+        ...
+
+    async def claim_recovery(self, session_id: str, recovery_count: int) -> bool:
+        """Claim the recovery of a session's flow
+
+        The recovery count is incremented only if it still equals `recovery_count`,
+        so a single replica wins when several try to resume the same flow.
+
+        Returns:
+            bool: True if this caller claimed the recovery
+        """
+        ...
+
+    async def delete(self, session_id: str) -> None:
+        """Delete the checkpoint of a session"""
+        ...
@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import List, Optional, Protocol
+from app.domain.models.llm_usage import LLMCall, LLMUsage
+
+class LLMUsageRepository(Protocol):
+    """Repository interface for the accounting of LLM calls"""
+
+    async def add_calls(self, calls: List[LLMCall]) -> None:
+        """Record LLM calls"""
+        ...
+
+    async def get_usage(
+        self,
+        session_id: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        since: Optional[datetime] = None
+    ) -> LLMUsage:
+        """Sum the recorded LLM calls matching all the given filters, all calls if none is given"""
+        ...
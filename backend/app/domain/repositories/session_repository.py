@@ -1,7 +1,7 @@
-from typing import Optional, Protocol, List
+from typing import AsyncIterator, Optional, Protocol, List, Tuple
 from datetime import datetime
-from app.domain.models.session import Session, SessionStatus
-from app.domain.events.agent_events import BaseEvent
+from app.domain.models.session import Session, SessionStatus, SessionEventPage, SessionSummary, SessionUpdate
+from app.domain.events.agent_events import AgentEvent, BaseEvent
 
 class SessionRepository(Protocol):
     """Repository interface for Session aggregate"""
@@ -23,7 +23,46 @@ class SessionRepository(Protocol):
         ...
 
     async def add_event(self, session_id: str, event: BaseEvent) -> None:
-        """Add an event to a session"""
+        """Append an event to a session"""
+        ...
+
+    async def add_events(self, session_id: str, events: List[BaseEvent]) -> None:
+        """Append events to a session in order"""
+        ...
+
+    async def apply_update(self, session_id: str, update: SessionUpdate) -> None:
+        """Apply several field changes to a session in a single write"""
+        ...
+
+    def get_events(self, session_id: str) -> AsyncIterator[AgentEvent]:
+        """Iterate over the events of a session in order, fetching them lazily"""
+        ...
+
+    async def get_event_page(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+        before_seq: Optional[int] = None,
+        after_seq: Optional[int] = None,
+        compact: bool = False
+    ) -> SessionEventPage:
+        """Get consecutive events of a session
+
+        Without a cursor the page is the latest events, so history can be read
+        from the tail backwards. Raw tool function results are left out, they
+        are only needed by the agent that called the tool.
+
+        Args:
+            session_id: Session to read
+            limit: Most events to return, all of them if None
+            before_seq: Only events older than this sequence number, newest of them first to fill the page
+            after_seq: Only events newer than this sequence number
+            compact: Leave tool content out of the events
+        """
+        ...
+
+    async def get_latest_event(self, session_id: str, event_type: str) -> Optional[AgentEvent]:
+        """Get the most recent event of a type in a session"""
         ...
 
     async def update_status(self, session_id: str, status: SessionStatus) -> None:
@@ -48,4 +87,24 @@ class SessionRepository(Protocol):
     
     async def get_all(self) -> List[Session]:
         """Get all sessions"""
-        ...
\ No newline at end of file
+        ...
+
+    async def get_summaries(
+        self,
+        limit: int,
+        before: Optional[Tuple[datetime, str]] = None
+    ) -> List[SessionSummary]:
+        """Get a page of session summaries, most recently active first
+
+        Args:
+            limit: Maximum number of summaries to return
+            before: (latest_message_at, session_id) of the last summary of the previous page
+
+        Returns:
+            List[SessionSummary]: Summaries ordered by latest_message_at then session_id, descending
+        """
+        ...
+
+    async def get_summaries_by_ids(self, session_ids: List[str]) -> List[SessionSummary]:
+        """Get the summaries of the given sessions, deleted sessions are left out"""
+        ...
@@ -3,13 +3,17 @@ import logging
 import time
 from datetime import datetime
 from app.domain.models.session import Session, SessionStatus
+from app.domain.models.memory import ContextLimits
 from app.domain.external.llm import LLM
 from app.domain.external.sandbox import Sandbox
 from app.domain.external.search import SearchEngine
-from app.domain.events.agent_events import BaseEvent, ErrorEvent, DoneEvent, PlanEvent, StepEvent, ToolEvent, MessageEvent, WaitEvent, AgentEventFactory
+from app.domain.events.agent_events import BaseEvent, ErrorEvent, DoneEvent, PlanEvent, StepEvent, ToolEvent, MessageEvent, MessageDeltaEvent, WaitEvent, QueueEvent
+from app.domain.events.event_codec import AgentEventCodec, EventEncoding
 from app.domain.repositories.agent_repository import AgentRepository
 from app.domain.repositories.session_repository import SessionRepository
+from app.domain.repositories.checkpoint_repository import CheckpointRepository
 from app.domain.services.agent_task_runner import AgentTaskRunner
+from app.domain.services.task_scheduler import TaskScheduler, SchedulerTicket, SchedulerStats
 from app.domain.external.task import Task
 from app.domain.utils.json_parser import JsonParser
 from typing import Type
@@ -17,6 +21,8 @@ from typing import Type
 # Setup logging
 logger = logging.getLogger(__name__)
 
+RECOVERY_CLIENT_ID = "recovery"  # Scheduler client the flows resumed after a restart are admitted as
+
 class AgentDomainService:
     """
     Agent domain service, responsible for coordinating the work of planning agent and execution agent
@@ -30,7 +36,13 @@ class AgentDomainService:
         sandbox_cls: Type[Sandbox],
         task_cls: Type[Task],
         json_parser: JsonParser,
-        search_engine: Optional[SearchEngine] = None
+        search_engine: Optional[SearchEngine] = None,
+        use_workers: bool = False,
+        task_scheduler: Optional[TaskScheduler] = None,
+        checkpoint_repository: Optional[CheckpointRepository] = None,
+        event_encoding: EventEncoding = EventEncoding.JSON,
+        session_flush_interval_seconds: float = 1.0,
+        context_limits: Optional[ContextLimits] = None,
     ):
         self._repository = agent_repository
         self._session_repository =session_repository
@@ -39,6 +51,13 @@ class AgentDomainService:
         self._search_engine = search_engine
         self._task_cls = task_cls
         self._json_parser = json_parser
+        self._use_workers = use_workers  # Run tasks in worker processes instead of this one
+        # Admission control for tasks run in this process, workers cap their own concurrency
+        self._task_scheduler = task_scheduler if not use_workers else None
+        self._checkpoint_repository = checkpoint_repository
+        self._event_encoding = event_encoding  # Encoding of events written to task output streams
+        self._session_flush_interval_seconds = session_flush_interval_seconds  # Max delay of session field writes by runners
+        self._context_limits = context_limits  # Limits on the memory agents send per LLM call
         logger.info("AgentDomainService initialization completed")
             
     async def shutdown(self) -> None:
@@ -47,8 +66,16 @@ class AgentDomainService:
         await self._task_cls.destroy()
         logger.info("All agents closed successfully")
 
-    async def _create_task(self, session: Session) -> Task:
-        """Create a new agent task"""
+    async def create_task_runner(self, session_id: str) -> AgentTaskRunner:
+        """Create the runner executing a session's agent flow"""
+        session = await self._session_repository.find_by_id(session_id)
+        if not session:
+            logger.error(f"Attempted to create task runner for non-existent Session {session_id}")
+            raise RuntimeError("Session not found")
+        return await self._create_task_runner(session)
+
+    async def _create_task_runner(self, session: Session) -> AgentTaskRunner:
+        """Prepare the sandbox and browser of a session and create its task runner"""
         sandbox = None
         sandbox_id = session.sandbox_id
         if sandbox_id:
@@ -63,8 +90,9 @@ class AgentDomainService:
             raise RuntimeError(f"Failed to get browser for Sandbox {sandbox_id}")
         
         await self._session_repository.save(session)
+        await self._repository.claim_memories(session.agent_id)
 
-        task_runner = AgentTaskRunner(
+        return AgentTaskRunner(
             session_id=session.id,
             agent_id=session.agent_id,
             llm=self._llm,
@@ -74,9 +102,21 @@ class AgentDomainService:
             session_repository=self._session_repository,
             json_parser=self._json_parser,
             agent_repository=self._repository,
+            checkpoint_repository=self._checkpoint_repository,
+            event_encoding=self._event_encoding,
+            session_flush_interval_seconds=self._session_flush_interval_seconds,
+            context_limits=self._context_limits,
         )
 
-        task = self._task_cls.create(task_runner)
+    async def _create_task(self, session: Session, ticket: Optional[SchedulerTicket] = None) -> Task:
+        """Create a new agent task"""
+        if self._use_workers:
+            task = self._task_cls.create_queued(session.id)
+        else:
+            task_runner = await self._create_task_runner(session)
+            if ticket:
+                task_runner.add_done_callback(lambda: self._task_scheduler.release(ticket))
+            task = self._task_cls.create(task_runner)
         session.task_id = task.id
         await self._session_repository.save(session)
 
@@ -89,7 +129,48 @@ class AgentDomainService:
         if not task_id:
             return None
         
-        return self._task_cls.get(task_id)
+        return await self._task_cls.get(task_id)
+
+    async def has_active_task(self, session: Session) -> bool:
+        """Check whether a session's task is queued or running somewhere"""
+        task = await self._get_task(session)
+        return task is not None and not task.done
+
+    async def resume_session(self, session: Session, message: str) -> None:
+        """Start a new task for a session whose task was lost, replaying the message its flow was working on"""
+        ticket = None
+        handed_over = False
+        try:
+            if self._task_scheduler:
+                # Recovered flows are admitted like new ones, fairly shared as a client of their own
+                ticket = self._task_scheduler.enqueue(RECOVERY_CLIENT_ID)
+                async for _ in self._wait_for_slot(session.id, ticket):
+                    pass
+            task = await self._create_task(session, ticket)
+            await task.input_stream.put(message)
+            await task.run()
+            handed_over = True
+        finally:
+            if ticket and not handed_over:
+                self._task_scheduler.cancel(ticket)
+        logger.info(f"Session {session.id} resumed in Task {task.id}")
+
+    async def _wait_for_slot(self, session_id: str, ticket: SchedulerTicket) -> AsyncGenerator[QueueEvent, None]:
+        """Wait for the scheduler to admit a ticket, reporting queue positions"""
+        try:
+            async for position in self._task_scheduler.wait(ticket):
+                logger.debug(f"Session {session_id} waiting for a run slot at position {position}")
+                yield QueueEvent(position=position)
+        except BaseException:
+            # Client went away or the request failed while queued
+            self._task_scheduler.cancel(ticket)
+            raise
+
+    def get_scheduler_stats(self) -> Optional[SchedulerStats]:
+        """Get admission control metrics, None when admission control is disabled"""
+        if not self._task_scheduler:
+            return None
+        return self._task_scheduler.get_stats()
 
     async def stop_session(self, session_id: str) -> None:
         """Stop a session"""
@@ -107,12 +188,16 @@ class AgentDomainService:
         session_id: str,
         message: Optional[str] = None,
         timestamp: Optional[datetime] = None,
-        latest_event_id: Optional[str] = None
+        latest_event_id: Optional[str] = None,
+        client_id: Optional[str] = None
     ) -> AsyncGenerator[BaseEvent, None]:
         """
         Chat with an agent
         """
 
+        ticket = None
+        handed_over = False  # Whether the run slot of the ticket now belongs to a running task
+        task = None
         try:
             session = await self._session_repository.find_by_id(session_id)
             if not session:
@@ -123,7 +208,11 @@ class AgentDomainService:
 
             if message:
                 if session.status != SessionStatus.RUNNING:
-                    task = await self._create_task(session)
+                    if self._task_scheduler:
+                        ticket = self._task_scheduler.enqueue(client_id or "anonymous")
+                        async for event in self._wait_for_slot(session_id, ticket):
+                            yield event
+                    task = await self._create_task(session, ticket)
                     if not task:
                         raise RuntimeError("Failed to create task")
                 
@@ -133,24 +222,26 @@ class AgentDomainService:
                 message_event = MessageEvent(message=message, role="user", id=message_id)
                 await self._session_repository.add_event(session_id, message_event)
                 await task.run()
+                handed_over = True
                 logger.debug(f"Put message into Session {session_id}'s event queue: {message[:50]}...")
             
             logger.info(f"Session {session_id} started")
             logger.debug(f"Session {session_id} task: {task}")
            
-            while task and not task.done:
-                event_id, event_str = await task.output_stream.get(start_id=latest_event_id, block_ms=0)
-                latest_event_id = event_id
-                if event_str is None:
-                    logger.debug(f"No event found in Session {session_id}'s event queue")
-                    continue
-                event = AgentEventFactory.from_json(event_str)
-                event.id = event_id
-                logger.debug(f"Got event from Session {session_id}'s event queue: {type(event).__name__}")
-                await self._session_repository.update_unread_message_count(session_id, 0)
-                yield event
-                if isinstance(event, (DoneEvent, ErrorEvent, WaitEvent)):
-                    break
+            if task and not task.done:
+                async for event_id, payload in task.output_stream.listen(start_id=latest_event_id):
+                    if payload is None:
+                        logger.debug(f"No event found in Session {session_id}'s event queue")
+                        continue
+                    event = AgentEventCodec.decode(payload)
+                    event.id = event_id
+                    logger.debug(f"Got event from Session {session_id}'s event queue: {type(event).__name__}")
+                    if not isinstance(event, MessageDeltaEvent):
+                        # Deltas are not persisted, so they leave nothing new to be read
+                        await self._session_repository.update_unread_message_count(session_id, 0)
+                    yield event
+                    if isinstance(event, (DoneEvent, ErrorEvent, WaitEvent)):
+                        break
             
             logger.info(f"Session {session_id} completed")
 
@@ -160,4 +251,7 @@ class AgentDomainService:
             await self._session_repository.add_event(session_id, event)
             yield event # TODO: raise api exception
         finally:
+            if ticket and not handed_over:
+                # Failed or client went away before the task ran, cancellation included
+                self._task_scheduler.cancel(ticket)
             await self._session_repository.update_unread_message_count(session_id, 0)
\ No newline at end of file
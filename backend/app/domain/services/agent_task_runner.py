@@ -1,4 +1,5 @@
-from typing import Optional, AsyncGenerator
+from typing import Optional, AsyncGenerator, Callable, List
+from contextlib import aclosing
 import asyncio
 import logging
 from app.domain.events.agent_events import (
@@ -6,6 +7,7 @@ from app.domain.events.agent_events import (
     ErrorEvent,
     TitleEvent,
     MessageEvent,
+    MessageDeltaEvent,
     DoneEvent,
     ToolEvent,
     WaitEvent,
@@ -14,15 +16,19 @@ from app.domain.events.agent_events import (
     SearchToolContent,
     ToolStatus
 )
+from app.domain.events.event_codec import AgentEventCodec, EventEncoding
 from app.domain.services.flows.plan_act import PlanActFlow
+from app.domain.services.session_updater import SessionUpdater
 from app.domain.external.sandbox import Sandbox
 from app.domain.external.browser import Browser
 from app.domain.external.search import SearchEngine
-from app.domain.external.llm import LLM
+from app.domain.external.llm import LLM, llm_call_scope
 from app.domain.repositories.agent_repository import AgentRepository
 from app.domain.external.task import TaskRunner, Task
 from app.domain.repositories.session_repository import SessionRepository
+from app.domain.repositories.checkpoint_repository import CheckpointRepository
 from app.domain.models.session import SessionStatus
+from app.domain.models.memory import ContextLimits
 from app.domain.utils.json_parser import JsonParser
 
 logger = logging.getLogger(__name__)
@@ -40,6 +46,10 @@ class AgentTaskRunner(TaskRunner):
         session_repository: SessionRepository,
         json_parser: JsonParser,
         search_engine: Optional[SearchEngine] = None,
+        checkpoint_repository: Optional[CheckpointRepository] = None,
+        event_encoding: EventEncoding = EventEncoding.JSON,
+        session_flush_interval_seconds: float = 1.0,
+        context_limits: Optional[ContextLimits] = None,
     ):
         self._session_id = session_id
         self._agent_id = agent_id
@@ -50,6 +60,9 @@ class AgentTaskRunner(TaskRunner):
         self._repository = agent_repository
         self._session_repository = session_repository
         self._json_parser = json_parser
+        self._event_codec = AgentEventCodec(event_encoding)
+        self._session_updater = SessionUpdater(session_repository, session_id, session_flush_interval_seconds)
+        self._done_callbacks: List[Callable[[], None]] = []
         self._flow = PlanActFlow(
             self._agent_id,
             self._repository,
@@ -60,12 +73,22 @@ class AgentTaskRunner(TaskRunner):
             self._browser,
             self._json_parser,
             self._search_engine,
+            checkpoint_repository,
+            context_limits,
         )
 
     async def _put_and_add_event(self, task: Task, event: BaseEvent) -> None:
-        event_id = await task.output_stream.put(event.model_dump_json())
-        event.id = event_id
-        await self._session_repository.add_event(self._session_id, event)
+        await self._put_and_add_events(task, [event])
+
+    async def _put_and_add_events(self, task: Task, events: List[BaseEvent]) -> None:
+        """Publish a burst of events in one round trip and persist them in order"""
+        event_ids = await task.output_stream.put_many([self._event_codec.encode(event) for event in events])
+        for event, event_id in zip(events, event_ids):
+            event.id = event_id
+        # Deltas only matter to those watching live, the complete message is persisted after them
+        await self._session_repository.add_events(
+            self._session_id, [event for event in events if not isinstance(event, MessageDeltaEvent)]
+        )
     
     async def _handle_tool_event(self, task: Task, event: ToolEvent) -> None:
         """Handle tool event"""
@@ -86,47 +109,118 @@ class AgentTaskRunner(TaskRunner):
                     event.tool_content = FileToolContent(content=file_read_result.data.get("content", ""))
                 else:
                     event.tool_content = FileToolContent(content="(No Content)")
+            elif event.tool_name == "recall":
+                pass
             else:
                 logger.warning(f"Agent {self._agent_id} received unknown tool event: {event.tool_name}")
 
     async def run(self, task: Task) -> None:
         """Process agent's message queue and run the agent's flow"""
+        # LLM calls made for this task, and in the tasks it starts, are accounted to the session
+        with llm_call_scope(session_id=self._session_id, agent_id=self._agent_id):
+            await self._run(task)
+
+    async def _run(self, task: Task) -> None:
         try:
             logger.info(f"Agent {self._agent_id} message processing task started")
             while not await task.input_stream.is_empty():
-                _, message = await task.input_stream.pop()
+                message_id, message = await task.input_stream.pop()
                 if message is None:
                     logger.warning(f"Agent {self._agent_id} received empty message")
                     return
                     
                 logger.info(f"Agent {self._agent_id} received new message: {message[:50]}...")
                 
-                async for event in self._run_flow(message):
-                    if isinstance(event, ToolEvent):
-                        # TODO: move to tool function
-                        await self._handle_tool_event(task, event)
-                    await self._put_and_add_event(task, event)
-                    if isinstance(event, TitleEvent):
-                        await self._session_repository.update_title(self._session_id, event.title)
-                    elif isinstance(event, MessageEvent):
-                        await self._session_repository.update_latest_message(self._session_id, event.message, event.timestamp)
-                        await self._session_repository.increment_unread_message_count(self._session_id)
-                    elif isinstance(event, WaitEvent):
-                        await self._session_repository.update_status(self._session_id, SessionStatus.WAITING)
-                        return
-                    if not await task.input_stream.is_empty():
-                        break
+                replan = False
+                try:
+                    async with aclosing(self._run_flow_bursts(task, message)) as bursts:
+                        async for events in bursts:
+                            messages = [event for event in events if isinstance(event, MessageEvent)]
+                            if messages:
+                                for event in messages:
+                                    self._session_updater.set_latest_message(event.message, event.timestamp)
+                                    self._session_updater.increment_unread_message_count()
+                                # Written before the messages go out, or a live viewer's reset to 0 would land first
+                                try:
+                                    await self._session_updater.flush()
+                                except Exception as e:
+                                    logger.error(f"Agent {self._agent_id} failed to update its session: {str(e)}")
+                            await self._put_and_add_events(task, events)
+                            for event in events:
+                                if isinstance(event, TitleEvent):
+                                    self._session_updater.set_title(event.title)
+                                elif isinstance(event, WaitEvent):
+                                    self._session_updater.set_status(SessionStatus.WAITING)
+                                    await self._session_updater.flush()
+                                    return
+                                elif isinstance(event, (DoneEvent, ErrorEvent)):
+                                    await self._session_updater.flush()
+                            if not await task.input_stream.is_empty():
+                                replan = True
+                                break
+                    if replan:
+                        # A new message replans, the interrupted state must not be resumed. Cleared
+                        # once the bursts are closed, so the event read ahead cannot checkpoint after it
+                        await self._flow.clear_checkpoint()
+                finally:
+                    # Only a crashed process leaves the message pending for redelivery
+                    await task.input_stream.ack(message_id)
 
-            await self._session_repository.update_status(self._session_id, SessionStatus.COMPLETED)
+            self._session_updater.set_status(SessionStatus.COMPLETED)
+            await self._session_updater.flush()
         except asyncio.CancelledError:
             logger.info(f"Agent {self._agent_id} task cancelled")
+            await self._flow.clear_checkpoint()
             await self._put_and_add_event(task, DoneEvent())
-            await self._session_repository.update_status(self._session_id, SessionStatus.COMPLETED)
+            self._session_updater.set_status(SessionStatus.COMPLETED)
+            await self._session_updater.flush()
         except Exception as e:
             logger.exception(f"Agent {self._agent_id} task encountered exception: {str(e)}")
+            await self._flow.clear_checkpoint()
             await self._put_and_add_event(task, ErrorEvent(error=f"Task error: {str(e)}"))
-            await self._session_repository.update_status(self._session_id, SessionStatus.COMPLETED)
+            self._session_updater.set_status(SessionStatus.COMPLETED)
+            await self._session_updater.flush()
     
+    async def _run_flow_bursts(self, task: Task, message: str) -> AsyncGenerator[List[BaseEvent], None]:
+        """Group the events the flow produces back-to-back into bursts
+
+        The next event is requested ahead of time. If the flow hands it over without
+        waiting on I/O it joins the current burst, otherwise the burst is emitted
+        while the flow keeps working.
+        """
+        events = self._run_flow(message)
+        pending: Optional[asyncio.Future] = None
+        burst: List[BaseEvent] = []
+        try:
+            while True:
+                pending = asyncio.ensure_future(events.__anext__())
+                if burst:
+                    await asyncio.sleep(0)
+                    if not pending.done():
+                        yield burst
+                        burst = []
+                try:
+                    event = await pending
+                except StopAsyncIteration:
+                    break
+                if isinstance(event, ToolEvent):
+                    # TODO: move to tool function
+                    await self._handle_tool_event(task, event)
+                burst.append(event)
+                if isinstance(event, WaitEvent):
+                    # The flow must not run past a wait, so stop reading ahead
+                    break
+            if burst:
+                yield burst
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+                try:
+                    await pending
+                except (asyncio.CancelledError, StopAsyncIteration, Exception):
+                    pass
+            await events.aclose()
+
     async def _run_flow(self, message: str) -> AsyncGenerator[BaseEvent, None]:
         """Process a single message through the agent's flow and yield events"""
         if not message:
@@ -140,9 +234,18 @@ class AgentTaskRunner(TaskRunner):
         logger.info(f"Agent {self._agent_id} completed processing one message")
 
     
+    def add_done_callback(self, callback: Callable[[], None]) -> None:
+        """Register a callback invoked once the task is done"""
+        self._done_callbacks.append(callback)
+
     async def on_done(self, task: Task) -> None:
         """Called when the task is done"""
         logger.info(f"Agent {self._agent_id} task done")
+        for callback in self._done_callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Agent {self._agent_id} done callback failed: {str(e)}")
 
 
     async def destroy(self) -> None:
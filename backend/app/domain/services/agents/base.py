@@ -1,13 +1,15 @@
 import json
 import logging
 import asyncio
+import time
 import uuid
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional, AsyncGenerator
-from app.domain.external.llm import LLM
+from typing import List, Dict, Any, Optional, AsyncGenerator, Union
+from app.domain.external.llm import LLM, llm_call_scope
 from app.domain.models.agent import Agent
-from app.domain.models.memory import Memory
+from app.domain.models.memory import ContextLimits, Memory
 from app.domain.services.tools.base import BaseTool
+from app.domain.services.agents.context_window import ContextWindow, tool_result_stub, is_tool_result_stub
 from app.domain.models.tool_result import ToolResult
 from app.domain.events.agent_events import (
     BaseEvent,
@@ -15,6 +17,7 @@ from app.domain.events.agent_events import (
     ToolStatus,
     ErrorEvent,
     MessageEvent,
+    MessageDeltaEvent,
     DoneEvent,
 )
 from app.domain.repositories.agent_repository import AgentRepository
@@ -32,6 +35,7 @@ class BaseAgent(ABC):
     max_iterations: int = 30
     max_retries: int = 3
     retry_interval: float = 1.0
+    stream_interval: float = 0.05  # Least seconds between two deltas of a reply, text written meanwhile goes out together
 
     def __init__(
         self,
@@ -39,7 +43,8 @@ class BaseAgent(ABC):
         agent_repository: AgentRepository,
         llm: LLM,
         json_parser: JsonParser,
-        tools: List[BaseTool] = []
+        tools: List[BaseTool] = [],
+        context_limits: Optional[ContextLimits] = None
     ):
         self._agent_id = agent_id
         self._repository = agent_repository
@@ -47,6 +52,7 @@ class BaseAgent(ABC):
         self.json_parser = json_parser
         self.tools = tools
         self.memory = None
+        self.context_window = ContextWindow(llm, context_limits)
     
     def get_available_tools(self) -> Optional[List[Dict[str, Any]]]:
         """Get all available tools list"""
@@ -82,7 +88,11 @@ class BaseAgent(ABC):
         return ToolResult(success=False, error=last_error)
     
     async def execute(self, request: str) -> AsyncGenerator[BaseEvent, None]:
-        message = await self.ask(request, self.format)
+        async for reply in self.ask_stream(request, self.format):
+            if isinstance(reply, MessageDeltaEvent):
+                yield reply
+            else:
+                message = reply
         for _ in range(self.max_iterations):
             if not message.get("tool_calls"):
                 break
@@ -118,54 +128,150 @@ class BaseAgent(ABC):
                     function_result=result
                 )
 
-                tool_response = {
-                    "role": "tool",
-                    "tool_call_id": tool_call_id,
-                    "content": result.model_dump_json()
-                }
-                tool_responses.append(tool_response)
+                tool_responses.append(await self._tool_response(tool_call_id, result))
 
-            message = await self.ask_with_messages(tool_responses)
+            async for reply in self.ask_stream_with_messages(tool_responses):
+                if isinstance(reply, MessageDeltaEvent):
+                    yield reply
+                else:
+                    message = reply
         else:
             yield ErrorEvent(error="Maximum iteration count reached, failed to complete the task")
         
         yield MessageEvent(message=message["content"])
     
+    async def _tool_response(self, tool_call_id: str, result: ToolResult) -> Dict[str, Any]:
+        """Tool message for a result, a stub in place of results too large to keep in memory
+
+        The full result is stored aside and still sent with the next call.
+        """
+        content = result.model_dump_json()
+        max_bytes = self.context_window.limits.tool_result_max_bytes
+        if max_bytes > 0 and len(content.encode()) > max_bytes:
+            try:
+                await self._repository.save_tool_payload(self._agent_id, tool_call_id, content)
+            except Exception as e:
+                logger.warning(f"Failed to store the result of tool call {tool_call_id}, keeping it in memory: {str(e)}")
+            else:
+                self.context_window.hold(tool_call_id, content)
+                content = tool_result_stub(tool_call_id, content)
+        return {
+            "role": "tool",
+            "tool_call_id": tool_call_id,
+            "content": content
+        }
+
+    async def recall_tool_result(self, tool_call_id: str) -> Optional[str]:
+        """Get the full result of an earlier tool call, from memory or from where it was stored aside"""
+        await self._ensure_memory()
+        for message in reversed(self.memory.get_messages()):
+            if message.get("role") == "tool" and message.get("tool_call_id") == tool_call_id \
+                    and not is_tool_result_stub(message.get("content")):
+                return message.get("content")
+        return await self._repository.get_tool_payload(self._agent_id, tool_call_id)
+
     async def _ensure_memory(self):
         if not self.memory:
             self.memory = await self._repository.get_memory(self._agent_id, self.name)
     
     async def _add_to_memory(self, messages: List[Dict[str, Any]]) -> None:
-        """Update memory and save to repository"""
+        """Update memory and append the new messages to the repository"""
         await self._ensure_memory()
-        if self.memory.empty:
-            self.memory.add_message({
-                "role": "system", "content": self.system_prompt,
-            })
-        self.memory.add_messages(messages)
-        await self._repository.save_memory(self._agent_id, self.name, self.memory)
+        for _ in range(self.max_retries):
+            new_messages = messages
+            if self.memory.empty:
+                new_messages = [{"role": "system", "content": self.system_prompt}] + messages
+            version = await self._repository.append_memory(self._agent_id, self.name, new_messages, self.memory.version)
+            if version is not None:
+                self.memory.add_messages(new_messages)
+                self.memory.version = version
+                return
+            # Another writer got there first, continue from what it stored
+            logger.warning(f"Agent {self._agent_id} memory {self.name} changed concurrently, reloading it")
+            self.memory = await self._repository.get_memory(self._agent_id, self.name)
+        raise RuntimeError(f"Agent {self._agent_id} memory {self.name} keeps changing concurrently")
+
+    async def _context_messages(self) -> List[Dict[str, Any]]:
+        """Messages of the memory to send to the LLM, older turns summarized to fit the context budget"""
+        summary = await self.context_window.summarize(self.memory)
+        if summary:
+            text, summarized = summary
+            await self._repository.save_memory_summary(self._agent_id, self.name, text, summarized)
+            self.memory.summary = text
+            self.memory.summarized = summarized
+        return self.context_window.build(self.memory)
+
+    def _streamed_text(self, content: str, tool_calls: List[Dict[str, Any]]) -> Optional[str]:
+        """Text a reply still being written shows the user so far, None if it shows nothing
+
+        Args:
+            content: Content of the reply so far
+            tool_calls: Tool calls of the reply so far, their arguments possibly cut off
+        """
+        return None
 
-    async def ask_with_messages(self, messages: List[Dict[str, Any]], format: Optional[str] = None) -> Dict[str, Any]:
+    async def ask_stream_with_messages(
+        self,
+        messages: List[Dict[str, Any]],
+        format: Optional[str] = None
+    ) -> AsyncGenerator[Union[MessageDeltaEvent, Dict[str, Any]], None]:
+        """Add messages to memory and ask the LLM for a reply
+
+        Yields:
+            Deltas of the text the reply shows the user while it is written, then the reply message
+        """
         await self._add_to_memory(messages)
 
         response_format = None
         if format:
             response_format = {"type": format}
 
-        message = await self.llm.ask(self.memory.get_messages(), 
-                                     tools=self.get_available_tools(), 
-                                     response_format=response_format)
+        # The scope is only held while the stream is opened, its chunks are read across yields
+        with llm_call_scope(caller=self.name):
+            chunks = self.llm.ask_stream(await self._context_messages(), 
+                                         tools=self.get_available_tools(), 
+                                         response_format=response_format)
+        message_id = str(uuid.uuid4())
+        content = ""
+        tool_calls: List[Dict[str, Any]] = []
+        sent = ""
+        sent_at = 0.0
+        message = None
+        async for chunk in chunks:
+            if chunk.message is not None:
+                message = chunk.message
+                continue
+            content += chunk.content or ""
+            tool_calls = chunk.tool_calls or tool_calls
+            if time.monotonic() - sent_at < self.stream_interval:
+                continue
+            text = self._streamed_text(content, tool_calls)
+            if text and len(text) > len(sent) and text.startswith(sent):
+                yield MessageDeltaEvent(message_id=message_id, delta=text[len(sent):])
+                sent = text
+                sent_at = time.monotonic()
+        if message is None:
+            raise RuntimeError("LLM response stream ended without a message")
+        text = self._streamed_text(content, tool_calls)
+        if text and len(text) > len(sent) and text.startswith(sent):
+            yield MessageDeltaEvent(message_id=message_id, delta=text[len(sent):])
+
         if message.get("tool_calls"):
             message["tool_calls"] = message["tool_calls"][:1]
         await self._add_to_memory([message])
-        return message
+        yield message
 
-    async def ask(self, request: str, format: Optional[str] = None) -> Dict[str, Any]:
-        return await self.ask_with_messages([
+    async def ask_stream(
+        self,
+        request: str,
+        format: Optional[str] = None
+    ) -> AsyncGenerator[Union[MessageDeltaEvent, Dict[str, Any]], None]:
+        async for reply in self.ask_stream_with_messages([
             {
                 "role": "user", "content": request
             }
-        ], format)
+        ], format):
+            yield reply
     
     async def roll_back(self):
         await self._ensure_memory()
@@ -183,4 +289,3 @@ class BaseAgent(ABC):
                 "content": ToolResult(success=True).model_dump_json()
             })
         await self._add_to_memory(tool_responses)
-        await self._repository.save_memory(self._agent_id, self.name, self.memory)
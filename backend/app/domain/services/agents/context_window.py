@@ -0,0 +1,307 @@
+import hashlib
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from app.domain.external.llm import LLM, llm_call_scope
+from app.domain.models.memory import ContextLimits, Memory
+from app.domain.services.prompts.context import (
+    SUMMARY_SYSTEM_PROMPT,
+    SUMMARY_PROMPT,
+    SUMMARY_MESSAGE,
+    TOOL_RESULT_STUB,
+)
+
+logger = logging.getLogger(__name__)
+
+# CJK and fullwidth characters, about one token each
+_WIDE_CHARS = re.compile(r"[\u1100-\u11ff\u2e80-\ua4cf\uac00-\ud7af\uf900-\ufaff\ufe30-\ufe4f\uff00-\uffef]")
+MESSAGE_OVERHEAD_TOKENS = 4  # Role and separators of a chat message
+STUB_EXCERPT_CHARS = 300  # Characters of the start and of the end of a tool result kept in its stub
+_STUB_PREFIX = "<stored_tool_result "
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the tokens of a text without the model's tokenizer
+
+    About four characters per token for latin text and code, one per CJK character.
+    """
+    wide = len(_WIDE_CHARS.findall(text))
+    return wide + (len(text) - wide + 3) // 4
+
+
+def _content_text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    return content if isinstance(content, str) else json.dumps(content, ensure_ascii=False)
+
+
+def estimate_message_tokens(message: Dict[str, Any]) -> int:
+    """Estimate the tokens a chat message takes in a prompt, tool calls included"""
+    tokens = MESSAGE_OVERHEAD_TOKENS + estimate_tokens(_content_text(message))
+    for tool_call in message.get("tool_calls") or []:
+        function = tool_call.get("function") or {}
+        tokens += estimate_tokens(function.get("name") or "") + estimate_tokens(function.get("arguments") or "")
+    return tokens
+
+
+def tool_result_stub(tool_call_id: str, content: str) -> str:
+    """Compact stand-in for a tool result: its size, hash and first and last characters"""
+    data = content.encode()
+    return TOOL_RESULT_STUB.format(
+        tool_call_id=tool_call_id,
+        size=len(data),
+        sha256=hashlib.sha256(data).hexdigest()[:16],
+        head=content[:STUB_EXCERPT_CHARS],
+        tail=content[-STUB_EXCERPT_CHARS:],
+    )
+
+
+def is_tool_result_stub(content: Any) -> bool:
+    return isinstance(content, str) and content.startswith(_STUB_PREFIX)
+
+
+class ContextWindow:
+    """Fits the memory of an agent into a token budget for each LLM call
+
+    The memory itself is kept whole, only what is sent is cut down. The system
+    prompt, the latest user message, which carries the plan or step being
+    worked on, and the most recent turns are always sent as they are. When the
+    rest does not fit, the oldest turns are folded into a rolling summary with
+    one LLM call and the summary is sent in their place.
+
+    Tool results are cut down as well. Results older than the latest few turns
+    are sent as stubs, and results too large to keep are stored aside by the
+    agent with only a stub in memory; the full result is held here to be sent
+    once, with the call answering it. The agent can recall either in full.
+
+    A turn is a user message, or an assistant message with the tool responses
+    that follow it, so tool calls are never separated from their results.
+    """
+
+    recent_turns: int = 4  # Latest turns never summarized
+    summarize_to: float = 0.5  # Share of the budget used once turns are summarized, so summaries are not redone every call
+    max_history_chars: int = 2000  # Per message shown to the summarizer
+
+    def __init__(self, llm: LLM, limits: Optional[ContextLimits] = None):
+        """
+        Args:
+            llm: LLM writing the summaries
+            limits: Limits on what is sent per call, None sends the whole memory
+        """
+        self._llm = llm
+        self.limits = limits or ContextLimits()
+        self._budget_tokens = self.limits.budget_tokens
+        self._counted: List[Tuple[Dict[str, Any], int]] = []  # Messages already counted, in memory order
+        self._held: Dict[str, str] = {}  # Full results of tool calls stubbed in memory, by tool call ID
+        self._stubs: Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]] = {}  # Stubbed messages by id of the original
+
+    @property
+    def enabled(self) -> bool:
+        return self._budget_tokens > 0
+
+    @property
+    def stubs_tool_results(self) -> bool:
+        return self.limits.tool_result_max_bytes > 0 or self.limits.tool_result_stale_turns > 0
+
+    def count_tokens(self, messages: List[Dict[str, Any]]) -> List[int]:
+        """Token counts of messages, only counting messages not seen before
+
+        Memories are append-only, so counts are remembered by position and
+        checked against the message at that position.
+        """
+        for i, message in enumerate(messages):
+            if i >= len(self._counted):
+                self._counted.append((message, estimate_message_tokens(message)))
+            elif self._counted[i][0] is not message:
+                self._counted[i] = (message, estimate_message_tokens(message))
+        del self._counted[len(messages):]
+        return [count for _, count in self._counted]
+
+    def hold(self, tool_call_id: str, content: str) -> None:
+        """Send the full result of a tool call stubbed in memory with the next call"""
+        self._held[tool_call_id] = content
+
+    def _derived(self, message: Dict[str, Any], content: str) -> Dict[str, Any]:
+        """Copy of a message with another content, the same copy for as long as the message lives"""
+        cached = self._stubs.get(id(message))
+        if cached is None or cached[0] is not message or cached[1]["content"] != content:
+            cached = (message, {**message, "content": content})
+            self._stubs[id(message)] = cached
+        return cached[1]
+
+    def _sent_messages(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Messages of a memory as sent: held results in full, stale results as stubs
+
+        The list has one message for each message of the memory, so positions
+        in the memory, like where the summary ends, stay valid.
+        """
+        stale_turns = self.limits.tool_result_stale_turns
+        if not self._held and stale_turns <= 0:
+            return messages
+        turns = self._turns(messages)
+        latest_turn = turns[-1][0] if turns else len(messages)
+        stale_before = turns[-stale_turns][0] if 0 < stale_turns <= len(turns) else 0
+        sent = list(messages)
+        held: Dict[str, str] = {}
+        used = set()
+        for i, message in enumerate(messages):
+            if message.get("role") != "tool":
+                continue
+            content = message.get("content")
+            tool_call_id = message.get("tool_call_id") or ""
+            if i >= latest_turn and tool_call_id in self._held:
+                held[tool_call_id] = self._held[tool_call_id]
+                sent[i] = self._derived(message, held[tool_call_id])
+            elif i < stale_before and isinstance(content, str) and not is_tool_result_stub(content):
+                cached = self._stubs.get(id(message))
+                if cached is not None and cached[0] is message:
+                    sent[i] = cached[1]
+                else:
+                    stub = tool_result_stub(tool_call_id, content)
+                    # Short results are cheaper to send than their stub
+                    sent[i] = self._derived(message, stub) if len(stub) < len(content) else message
+                    self._stubs[id(message)] = (message, sent[i])
+            else:
+                continue
+            used.add(id(message))
+        # Held results are only sent with the call answering them
+        self._held = held
+        self._stubs = {key: value for key, value in self._stubs.items() if key in used}
+        return sent
+
+    @staticmethod
+    def _turns(messages: List[Dict[str, Any]]) -> List[Tuple[int, int]]:
+        """Start and end indexes of the turns of a memory, system messages left out"""
+        turns: List[Tuple[int, int]] = []
+        for i, message in enumerate(messages):
+            role = message.get("role")
+            if role == "system":
+                continue
+            if role == "tool" and turns and turns[-1][1] == i:
+                turns[-1] = (turns[-1][0], i + 1)
+            else:
+                turns.append((i, i + 1))
+        return turns
+
+    @staticmethod
+    def _latest_user_index(messages: List[Dict[str, Any]]) -> Optional[int]:
+        for i in range(len(messages) - 1, -1, -1):
+            if messages[i].get("role") == "user":
+                return i
+        return None
+
+    def _summary_message(self, summary: str) -> Dict[str, Any]:
+        return {"role": "system", "content": SUMMARY_MESSAGE.format(summary=summary)}
+
+    def build(self, memory: Memory) -> List[Dict[str, Any]]:
+        """Messages to send for a memory, its summary in place of the messages it covers"""
+        messages = self._sent_messages(memory.get_messages())
+        if not self.enabled or not memory.summary or memory.summarized <= 0:
+            return messages
+        system = memory.get_latest_system_message()
+        prompt = [system] if system else []
+        prompt.append(self._summary_message(memory.summary))
+        latest_user = self._latest_user_index(messages)
+        if latest_user is not None and latest_user < memory.summarized:
+            prompt.append(messages[latest_user])
+        prompt.extend(message for message in messages[memory.summarized:] if message.get("role") != "system")
+        return prompt
+
+    def prompt_tokens(self, memory: Memory) -> int:
+        """Estimated tokens of the messages build() returns for a memory"""
+        messages = self._sent_messages(memory.get_messages())
+        counts = self.count_tokens(messages)
+        if not self.enabled or not memory.summary or memory.summarized <= 0:
+            return sum(counts)
+        tokens = estimate_message_tokens(self._summary_message(memory.summary))
+        system = next((i for i in range(len(messages) - 1, -1, -1) if messages[i].get("role") == "system"), None)
+        if system is not None:
+            tokens += counts[system]
+        latest_user = self._latest_user_index(messages)
+        if latest_user is not None and latest_user < memory.summarized:
+            tokens += counts[latest_user]
+        tokens += sum(
+            count for message, count in zip(messages[memory.summarized:], counts[memory.summarized:])
+            if message.get("role") != "system"
+        )
+        return tokens
+
+    async def summarize(self, memory: Memory) -> Optional[Tuple[str, int]]:
+        """Fold the oldest turns into the summary if the memory no longer fits the budget
+
+        Failures of the summarizer are logged, the memory is then sent as it is.
+
+        Returns:
+            The new summary and the number of leading messages it covers,
+            None if the memory fits or nothing can be summarized
+        """
+        if not self.enabled:
+            return None
+        messages = self._sent_messages(memory.get_messages())
+        counts = self.count_tokens(messages)
+        total = self.prompt_tokens(memory)
+        if total <= self._budget_tokens:
+            return None
+        prompt_tokens = total
+
+        turns = self._turns(messages)
+        if len(turns) <= self.recent_turns:
+            return None
+        tail_start = turns[-self.recent_turns][0]
+        latest_user = self._latest_user_index(messages)
+        target = int(self._budget_tokens * self.summarize_to)
+        covered = memory.summarized
+        folded_tokens = 0
+        end = covered
+        for start, turn_end in turns:
+            if start < covered:
+                continue
+            # Keep the summarizer's own prompt within the budget, the rest is folded by later calls
+            if turn_end > tail_start or folded_tokens >= self._budget_tokens:
+                break
+            turn_tokens = sum(counts[start:turn_end])
+            folded_tokens += turn_tokens
+            if latest_user is None or not start <= latest_user < turn_end:
+                total -= turn_tokens
+            end = turn_end
+            if total <= target:
+                break
+        if end <= covered:
+            return None
+
+        try:
+            with llm_call_scope(caller="summary"):
+                response = await self._llm.ask([
+                    {"role": "system", "content": SUMMARY_SYSTEM_PROMPT.format(max_words=self._summary_max_words())},
+                    {"role": "user", "content": SUMMARY_PROMPT.format(
+                        summary=memory.summary or "(none)",
+                        history=self._history(messages[covered:end])
+                    )},
+                ])
+        except Exception as e:
+            logger.warning(f"Failed to summarize {end - covered} memory messages: {str(e)}")
+            return None
+        summary = (response.get("content") or "").strip()
+        if not summary:
+            return None
+        logger.debug(f"Summarized memory messages {covered} to {end}, prompt down from {prompt_tokens} to about {total} tokens")
+        return summary, end
+
+    def _summary_max_words(self) -> int:
+        return max(200, self._budget_tokens // 10)
+
+    def _history(self, messages: List[Dict[str, Any]]) -> str:
+        """Render messages as a transcript for the summarizer, long contents cut short"""
+        lines = []
+        for message in messages:
+            role = message.get("role")
+            if role == "system":
+                continue
+            text = _content_text(message)
+            for tool_call in message.get("tool_calls") or []:
+                function = tool_call.get("function") or {}
+                text += f"\n[call {function.get('name')}({function.get('arguments')})]"
+            if len(text) > self.max_history_chars:
+                text = text[:self.max_history_chars] + " ...(truncated)"
+            lines.append(f"{role}: {text.strip()}")
+        return "\n\n".join(lines)
@@ -1,5 +1,6 @@
-from typing import AsyncGenerator, Optional
+from typing import Any, AsyncGenerator, Dict, List, Optional
 from app.domain.models.plan import Plan, Step, ExecutionStatus
+from app.domain.models.memory import ContextLimits
 from app.domain.services.agents.base import BaseAgent
 from app.domain.external.llm import LLM
 from app.domain.external.sandbox import Sandbox
@@ -23,7 +24,9 @@ from app.domain.services.tools.browser import BrowserTool
 from app.domain.services.tools.search import SearchTool
 from app.domain.services.tools.file import FileTool
 from app.domain.services.tools.message import MessageTool
+from app.domain.services.tools.recall import RecallTool
 from app.domain.utils.json_parser import JsonParser
+from app.domain.utils.partial_json import partial_json_string
 
 
 class ExecutionAgent(BaseAgent):
@@ -43,6 +46,7 @@ class ExecutionAgent(BaseAgent):
         browser: Browser,
         json_parser: JsonParser,
         search_engine: Optional[SearchEngine] = None,
+        context_limits: Optional[ContextLimits] = None,
     ):
         super().__init__(
             agent_id=agent_id,
@@ -54,13 +58,26 @@ class ExecutionAgent(BaseAgent):
                 BrowserTool(browser),
                 FileTool(sandbox),
                 MessageTool()
-            ]
+            ],
+            context_limits=context_limits,
         )
         
         # Only add search tool when search_engine is not None
         if search_engine:
             self.tools.append(SearchTool(search_engine))
+        # Tool results shortened in the context can be brought back
+        if self.context_window.stubs_tool_results:
+            self.tools.append(RecallTool(self.recall_tool_result))
     
+    def _streamed_text(self, content: str, tool_calls: List[Dict[str, Any]]) -> Optional[str]:
+        # Messages to the user are written as arguments of the message tools
+        if not tool_calls:
+            return None
+        function = tool_calls[0].get("function") or {}
+        if function.get("name") not in ("message_notify_user", "message_ask_user"):
+            return None
+        return partial_json_string(function.get("arguments") or "", "text")
+
     async def execute_step(self, plan: Plan, step: Step, message: str = "") -> AsyncGenerator[BaseEvent, None]:
         message = EXECUTION_PROMPT.format(goal=plan.goal, step=step.description, message=message)
         step.status = ExecutionStatus.RUNNING
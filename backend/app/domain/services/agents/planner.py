@@ -3,7 +3,7 @@ import json
 import logging
 from app.domain.models.plan import Plan, Step
 from app.domain.services.agents.base import BaseAgent
-from app.domain.models.memory import Memory
+from app.domain.models.memory import ContextLimits, Memory
 from app.domain.external.llm import LLM
 from app.domain.services.prompts.planner import (
     PLANNER_SYSTEM_PROMPT, 
@@ -16,6 +16,7 @@ from app.domain.events.agent_events import (
     PlanStatus,
     ErrorEvent,
     MessageEvent,
+    MessageDeltaEvent,
     DoneEvent,
 )
 from app.domain.external.sandbox import Sandbox
@@ -23,6 +24,7 @@ from app.domain.services.tools.file import FileTool
 from app.domain.services.tools.shell import ShellTool
 from app.domain.repositories.agent_repository import AgentRepository
 from app.domain.utils.json_parser import JsonParser
+from app.domain.utils.partial_json import partial_json_string
 
 logger = logging.getLogger(__name__)
 
@@ -41,15 +43,21 @@ class PlannerAgent(BaseAgent):
         agent_repository: AgentRepository,
         llm: LLM,
         json_parser: JsonParser,
+        context_limits: Optional[ContextLimits] = None,
     ):
         super().__init__(
             agent_id=agent_id,
             agent_repository=agent_repository,
             llm=llm,
             json_parser=json_parser,
+            context_limits=context_limits,
         )
 
 
+    def _streamed_text(self, content: str, tool_calls: List[Dict[str, Any]]) -> Optional[str]:
+        # The plan's message is shown to the user once the plan is created
+        return partial_json_string(content, "message")
+
     async def create_plan(self, message: Optional[str] = None) -> AsyncGenerator[BaseEvent, None]:
         message = CREATE_PLAN_PROMPT.format(user_message=message) if message else None
         async for event in self.execute(message):
@@ -65,6 +73,9 @@ class PlannerAgent(BaseAgent):
     async def update_plan(self, plan: Plan) -> AsyncGenerator[BaseEvent, None]:
         message = UPDATE_PLAN_PROMPT.format(plan=plan.model_dump_json(include={"steps"}), goal=plan.goal)
         async for event in self.execute(message):
+            if isinstance(event, MessageDeltaEvent):
+                # The message of an updated plan is not shown
+                continue
             if isinstance(event, MessageEvent):
                 parsed_response = await self.json_parser.parse(event.message)
                 new_steps = [Step(id=step["id"], description=step["description"]) for step in parsed_response["steps"]]
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from typing import Optional
+from app.domain.models.checkpoint import FlowCheckpoint
+from app.domain.models.session import SessionStatus
+from app.domain.events.agent_events import ErrorEvent
+from app.domain.repositories.checkpoint_repository import CheckpointRepository
+from app.domain.repositories.session_repository import SessionRepository
+from app.domain.services.agent_domain_service import AgentDomainService
+
+logger = logging.getLogger(__name__)
+
+
+class FlowRecoveryService:
+    """
+    Resumes flows whose task was lost.
+
+    A running session with a checkpoint but no live task belonged to a process
+    that died mid-flow. Its flow is restarted in a new task from the checkpointed
+    state, so the plan and the steps already executed are kept.
+    """
+
+    def __init__(
+        self,
+        checkpoint_repository: CheckpointRepository,
+        session_repository: SessionRepository,
+        agent_domain_service: AgentDomainService,
+        max_attempts: int = 3,
+    ):
+        self._checkpoint_repository = checkpoint_repository
+        self._session_repository = session_repository
+        self._agent_domain_service = agent_domain_service
+        self._max_attempts = max_attempts
+        self._loop: Optional[asyncio.Task] = None
+
+    async def recover(self) -> int:
+        """Resume every interrupted flow
+
+        Returns:
+            int: Number of sessions resumed
+        """
+        recovered = 0
+        for checkpoint in await self._checkpoint_repository.get_all():
+            try:
+                if await self._recover_session(checkpoint):
+                    recovered += 1
+            except Exception:
+                logger.exception(f"Failed to recover Session {checkpoint.session_id}")
+        if recovered:
+            logger.info(f"Resumed {recovered} interrupted sessions")
+        return recovered
+
+    async def _recover_session(self, checkpoint: FlowCheckpoint) -> bool:
+        session = await self._session_repository.find_by_id(checkpoint.session_id)
+        if not session:
+            await self._checkpoint_repository.delete(checkpoint.session_id)
+            return False
+        if session.status != SessionStatus.RUNNING:
+            # Waiting sessions resume when the user answers
+            if session.status != SessionStatus.WAITING:
+                await self._checkpoint_repository.delete(checkpoint.session_id)
+            return False
+        if await self._agent_domain_service.has_active_task(session):
+            return False
+
+        if checkpoint.recovery_count >= self._max_attempts:
+            logger.warning(f"Giving up on Session {session.id} after {checkpoint.recovery_count} recoveries")
+            await self._checkpoint_repository.delete(session.id)
+            await self._session_repository.add_event(session.id, ErrorEvent(error="Task was interrupted too many times"))
+            await self._session_repository.update_status(session.id, SessionStatus.COMPLETED)
+            return False
+
+        if not await self._checkpoint_repository.claim_recovery(session.id, checkpoint.recovery_count):
+            # Another replica is resuming it
+            return False
+
+        logger.info(f"Resuming Session {session.id} from {checkpoint.status} at step {checkpoint.step_id}")
+        await self._agent_domain_service.resume_session(session, checkpoint.message)
+        return True
+
+    async def _recover_loop(self, interval_seconds: int) -> None:
+        while True:
+            try:
+                await self.recover()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Flow recovery failed: {str(e)}")
+            await asyncio.sleep(interval_seconds)
+
+    def start(self, interval_seconds: int) -> None:
+        """Recover interrupted flows now and then every `interval_seconds`"""
+        if self._loop is None or self._loop.done():
+            self._loop = asyncio.create_task(self._recover_loop(interval_seconds))
+            logger.info("Flow recovery started")
+
+    async def shutdown(self) -> None:
+        """Stop looking for interrupted flows"""
+        if self._loop is not None and not self._loop.done():
+            self._loop.cancel()
+            try:
+                await self._loop
+            except asyncio.CancelledError:
+                pass
+        self._loop = None
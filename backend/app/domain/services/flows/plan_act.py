@@ -1,6 +1,7 @@
 import logging
 from app.domain.services.flows.base import BaseFlow
 from app.domain.models.agent import Agent
+from app.domain.models.memory import ContextLimits
 from typing import AsyncGenerator, Optional
 from enum import Enum
 from app.domain.events.agent_events import (
@@ -22,6 +23,8 @@ from app.domain.repositories.agent_repository import AgentRepository
 from app.domain.utils.json_parser import JsonParser
 from app.domain.repositories.session_repository import SessionRepository
 from app.domain.models.session import SessionStatus
+from app.domain.models.checkpoint import FlowCheckpoint
+from app.domain.repositories.checkpoint_repository import CheckpointRepository
 
 logger = logging.getLogger(__name__)
 
@@ -44,11 +47,14 @@ class PlanActFlow(BaseFlow):
         browser: Browser,
         json_parser: JsonParser,
         search_engine: Optional[SearchEngine] = None,
+        checkpoint_repository: Optional[CheckpointRepository] = None,
+        context_limits: Optional[ContextLimits] = None,
     ):
         self._agent_id = agent_id
         self._repository = agent_repository
         self._session_id = session_id
         self._session_repository = session_repository
+        self._checkpoint_repository = checkpoint_repository
         self.status = AgentStatus.IDLE
         self.plan = None
         # Create planner and execution agents
@@ -57,6 +63,7 @@ class PlanActFlow(BaseFlow):
             agent_repository=self._repository,
             llm=llm,
             json_parser=json_parser,
+            context_limits=context_limits,
         )
         logger.debug(f"Created planner agent for Agent {self._agent_id}")
         
@@ -68,9 +75,35 @@ class PlanActFlow(BaseFlow):
             browser=browser,
             json_parser=json_parser,
             search_engine=search_engine,
+            context_limits=context_limits,
         )
         logger.debug(f"Created execution agent for Agent {self._agent_id}")
 
+    async def _checkpoint(self, message: str, step_id: Optional[str] = None) -> None:
+        """Persist the current state so the flow can resume here after a crash"""
+        if not self._checkpoint_repository:
+            return
+        try:
+            await self._checkpoint_repository.save(FlowCheckpoint(
+                session_id=self._session_id,
+                agent_id=self._agent_id,
+                status=self.status.value,
+                message=message,
+                plan=self.plan,
+                step_id=step_id,
+            ))
+        except Exception as e:
+            logger.error(f"Agent {self._agent_id} failed to checkpoint flow at {self.status}: {str(e)}")
+
+    async def clear_checkpoint(self) -> None:
+        """Drop the checkpoint once the flow has nothing left to resume"""
+        if not self._checkpoint_repository:
+            return
+        try:
+            await self._checkpoint_repository.delete(self._session_id)
+        except Exception as e:
+            logger.error(f"Agent {self._agent_id} failed to clear flow checkpoint: {str(e)}")
+
     async def run(self, message: str) -> AsyncGenerator[BaseEvent, None]:
 
         # TODO: move to task runner
@@ -91,8 +124,25 @@ class PlanActFlow(BaseFlow):
             logger.debug(f"Session {self._session_id} is in WAITING status")
             self.status = AgentStatus.EXECUTING
 
+        checkpoint = None
+        if self._checkpoint_repository and session.status in (SessionStatus.RUNNING, SessionStatus.WAITING):
+            checkpoint = await self._checkpoint_repository.find_by_session_id(self._session_id)
+            if checkpoint and checkpoint.message != message:
+                # Left by an earlier message, this one is planned afresh
+                logger.info(f"Agent {self._agent_id} dropping flow checkpoint of an earlier message")
+                await self.clear_checkpoint()
+                checkpoint = None
+
         await self._session_repository.update_status(self._session_id, SessionStatus.RUNNING)  
-        self.plan = session.get_last_plan()
+        plan_event = await self._session_repository.get_latest_event(self._session_id, "plan")
+        self.plan = plan_event.plan if plan_event else None
+
+        if checkpoint:
+            # Resume where the interrupted flow stopped instead of planning again
+            logger.info(f"Agent {self._agent_id} resuming flow from checkpoint at {checkpoint.status}")
+            self.status = AgentStatus(checkpoint.status)
+            self.plan = checkpoint.plan or self.plan
+        await self._checkpoint(message)
 
         logger.info(f"Agent {self._agent_id} started processing message: {message[:50]}...")
         step = None
@@ -100,6 +150,7 @@ class PlanActFlow(BaseFlow):
             if self.status == AgentStatus.IDLE:
                 logger.info(f"Agent {self._agent_id} state changed from {AgentStatus.IDLE} to {AgentStatus.PLANNING}")
                 self.status = AgentStatus.PLANNING
+                await self._checkpoint(message)
             elif self.status == AgentStatus.PLANNING:
                 # Create plan
                 logger.info(f"Agent {self._agent_id} started creating plan")
@@ -112,6 +163,7 @@ class PlanActFlow(BaseFlow):
                     yield event
                 logger.info(f"Agent {self._agent_id} state changed from {AgentStatus.PLANNING} to {AgentStatus.EXECUTING}")
                 self.status = AgentStatus.EXECUTING
+                await self._checkpoint(message)
                     
             elif self.status == AgentStatus.EXECUTING:
                 # Execute plan
@@ -120,13 +172,16 @@ class PlanActFlow(BaseFlow):
                 if not step:
                     logger.info(f"Agent {self._agent_id} has no more steps, state changed from {AgentStatus.EXECUTING} to {AgentStatus.COMPLETED}")
                     self.status = AgentStatus.COMPLETED
+                    await self._checkpoint(message)
                     continue
                 # Execute step
                 logger.info(f"Agent {self._agent_id} started executing step {step.id}: {step.description[:50]}...")
+                await self._checkpoint(message, step.id)
                 async for event in self.executor.execute_step(self.plan, step, message):
                     yield event
                 logger.info(f"Agent {self._agent_id} completed step {step.id}, state changed from {AgentStatus.EXECUTING} to {AgentStatus.UPDATING}")
                 self.status = AgentStatus.UPDATING
+                await self._checkpoint(message, step.id)
             elif self.status == AgentStatus.UPDATING:
                 # Update plan
                 logger.info(f"Agent {self._agent_id} started updating plan")
@@ -134,11 +189,13 @@ class PlanActFlow(BaseFlow):
                     yield event
                 logger.info(f"Agent {self._agent_id} plan update completed, state changed from {AgentStatus.UPDATING} to {AgentStatus.EXECUTING}")
                 self.status = AgentStatus.EXECUTING
+                await self._checkpoint(message)
             elif self.status == AgentStatus.COMPLETED:
                 self.plan.status = ExecutionStatus.COMPLETED
                 logger.info(f"Agent {self._agent_id} plan has been completed")
                 yield PlanEvent(status=PlanStatus.COMPLETED, plan=self.plan)
                 self.status = AgentStatus.IDLE
+                await self.clear_checkpoint()
                 break
         yield DoneEvent()
         
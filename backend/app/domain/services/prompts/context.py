@@ -0,0 +1,38 @@
+# Context window prompts
+SUMMARY_SYSTEM_PROMPT = """
+You condense the working history of an AI agent so it can continue its task with a shorter context.
+
+<summary_rules>
+- Keep facts the agent learned, decisions it made, files it created or changed and their paths, commands that worked or failed, URLs it visited and results it still needs
+- Keep what the user asked for and any preferences they stated
+- Drop greetings, repeated attempts and raw tool output that is no longer needed
+- Write in the working language of the history, as plain prose
+- Keep the summary under {max_words} words
+</summary_rules>
+"""
+
+SUMMARY_PROMPT = """
+Fold the new history below into the existing summary and return only the updated summary.
+
+Existing summary:
+{summary}
+
+New history:
+{history}
+"""
+
+# Sent in place of tool results stored aside or too old to send in full
+TOOL_RESULT_STUB = """<stored_tool_result tool_call_id="{tool_call_id}" bytes="{size}" sha256="{sha256}">
+This tool result was shortened to save context. Call recall_tool_result with this tool_call_id if you need the full result.
+{head}
+...
+{tail}
+</stored_tool_result>"""
+
+# Sent in place of the summarized messages
+SUMMARY_MESSAGE = """
+<conversation_summary>
+Earlier messages of this conversation were condensed into the summary below.
+{summary}
+</conversation_summary>
+"""
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+from app.domain.models.session import SessionStatus, SessionUpdate
+from app.domain.repositories.session_repository import SessionRepository
+
+logger = logging.getLogger(__name__)
+
+
+class SessionUpdater:
+    """
+    Write-behind buffer for the fields of one session.
+
+    Changes are merged in memory and written in a single update at most
+    `flush_interval_seconds` after the first of them, or earlier when
+    flush() is called.
+    """
+
+    def __init__(self, session_repository: SessionRepository, session_id: str, flush_interval_seconds: float):
+        self._session_repository = session_repository
+        self._session_id = session_id
+        self._flush_interval_seconds = flush_interval_seconds
+        self._pending = SessionUpdate()
+        self._flush_timer: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def set_title(self, title: str) -> None:
+        self._pending.title = title
+        self._schedule_flush()
+
+    def set_latest_message(self, message: str, timestamp: datetime) -> None:
+        self._pending.latest_message = message
+        self._pending.latest_message_at = timestamp
+        self._schedule_flush()
+
+    def increment_unread_message_count(self) -> None:
+        self._pending.unread_message_increment += 1
+        self._schedule_flush()
+
+    def set_status(self, status: SessionStatus) -> None:
+        self._pending.status = status
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._flush_timer is None:
+            self._flush_timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self._flush_interval_seconds)
+        # From here on a forced flush must not cancel this one mid-write
+        self._flush_timer = None
+        try:
+            await self.flush()
+        except Exception as e:
+            # The changes stay pending for the next flush
+            logger.error(f"Failed to update Session {self._session_id}: {str(e)}")
+
+    async def flush(self) -> None:
+        """Write the pending changes now
+
+        Raises:
+            Exception: The write failed, the changes are kept for the next flush
+        """
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        async with self._lock:
+            update, self._pending = self._pending, SessionUpdate()
+            if update.is_empty():
+                return
+            try:
+                await self._session_repository.apply_update(self._session_id, update)
+            except Exception:
+                self._pending = update.merge(self._pending)
+                raise
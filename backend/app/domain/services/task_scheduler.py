@@ -0,0 +1,166 @@
+import time
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict, defaultdict, deque
+from typing import AsyncGenerator, Deque, Dict, Optional
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerTicket:
+    """A request to start an agent task, waiting for or holding a run slot"""
+
+    def __init__(self, client_id: str):
+        self.id = uuid.uuid4().hex[:16]
+        self.client_id = client_id
+        self.position = 0
+        self.enqueued_at = time.monotonic()
+        self.admitted_at: Optional[float] = None
+        self.released = False
+        self._changed = asyncio.Event()
+
+    @property
+    def admitted(self) -> bool:
+        return self.admitted_at is not None
+
+    def notify(self) -> None:
+        self._changed.set()
+
+
+class SchedulerStats(BaseModel):
+    """Snapshot of the scheduler's load"""
+    running: int
+    waiting: int
+    max_running: int
+    max_running_per_client: int
+    admitted_total: int
+    cancelled_total: int
+    avg_wait_seconds: float
+    max_wait_seconds: float
+    running_by_client: Dict[str, int]
+    waiting_by_client: Dict[str, int]
+
+
+class TaskScheduler:
+    """
+    Admission control in front of agent task creation.
+
+    At most `max_running` tasks run at once, and at most `max_running_per_client`
+    for a single client. Requests above the limits wait in per-client FIFO queues
+    that are served round-robin, so one busy client cannot starve the others.
+    """
+
+    def __init__(self, max_running: int, max_running_per_client: int):
+        self._max_running = max_running
+        self._max_running_per_client = max_running_per_client
+        self._waiting: "OrderedDict[str, Deque[SchedulerTicket]]" = OrderedDict()
+        self._running: Dict[str, int] = defaultdict(int)
+        self._running_total = 0
+        self._admitted_total = 0
+        self._cancelled_total = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def enqueue(self, client_id: str) -> SchedulerTicket:
+        """Request a run slot for a client, admitted right away when there is capacity"""
+        ticket = SchedulerTicket(client_id)
+        self._waiting.setdefault(client_id, deque()).append(ticket)
+        self._schedule()
+        if not ticket.admitted:
+            logger.info(f"Task request {ticket.id} of client {client_id} queued at position {ticket.position}")
+        return ticket
+
+    async def wait(self, ticket: SchedulerTicket) -> AsyncGenerator[int, None]:
+        """Wait until the ticket is admitted, yielding its queue position whenever it changes"""
+        while not ticket.admitted:
+            ticket._changed.clear()
+            yield ticket.position
+            if not ticket.admitted:
+                await ticket._changed.wait()
+
+    def release(self, ticket: SchedulerTicket) -> None:
+        """Give back the run slot held by an admitted ticket"""
+        if not ticket.admitted or ticket.released:
+            return
+        ticket.released = True
+        self._running_total -= 1
+        self._running[ticket.client_id] -= 1
+        if self._running[ticket.client_id] <= 0:
+            del self._running[ticket.client_id]
+        self._schedule()
+
+    def cancel(self, ticket: SchedulerTicket) -> None:
+        """Withdraw a waiting ticket, or release it if it was already admitted"""
+        if ticket.admitted:
+            self.release(ticket)
+            return
+        queue = self._waiting.get(ticket.client_id)
+        if queue and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del self._waiting[ticket.client_id]
+            self._cancelled_total += 1
+            logger.info(f"Task request {ticket.id} of client {ticket.client_id} left the queue")
+            self._schedule()
+
+    def _schedule(self) -> None:
+        """Admit waiting tickets round-robin across clients while there is capacity"""
+        while self._running_total < self._max_running:
+            client_id = next(
+                (c for c in self._waiting if self._running.get(c, 0) < self._max_running_per_client),
+                None
+            )
+            if client_id is None:
+                break
+            queue = self._waiting[client_id]
+            ticket = queue.popleft()
+            if queue:
+                self._waiting.move_to_end(client_id)
+            else:
+                del self._waiting[client_id]
+            self._admit(ticket)
+        self._update_positions()
+
+    def _admit(self, ticket: SchedulerTicket) -> None:
+        ticket.admitted_at = time.monotonic()
+        ticket.position = 0
+        self._running_total += 1
+        self._running[ticket.client_id] += 1
+        self._admitted_total += 1
+        waited = ticket.admitted_at - ticket.enqueued_at
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        ticket.notify()
+
+    def _update_positions(self) -> None:
+        """Estimate each waiting ticket's position in round-robin order"""
+        clients = list(self._waiting.items())
+        for order, (_, queue) in enumerate(clients):
+            for index, ticket in enumerate(queue):
+                ahead = index
+                for other_order, (_, other_queue) in enumerate(clients):
+                    if other_order == order:
+                        continue
+                    served_before = index + 1 if other_order < order else index
+                    ahead += min(len(other_queue), served_before)
+                position = ahead + 1
+                if position != ticket.position:
+                    ticket.position = position
+                    ticket.notify()
+
+    def get_stats(self) -> SchedulerStats:
+        """Get the current load and wait time metrics"""
+        return SchedulerStats(
+            running=self._running_total,
+            waiting=sum(len(queue) for queue in self._waiting.values()),
+            max_running=self._max_running,
+            max_running_per_client=self._max_running_per_client,
+            admitted_total=self._admitted_total,
+            cancelled_total=self._cancelled_total,
+            avg_wait_seconds=self._wait_total / self._admitted_total if self._admitted_total else 0.0,
+            max_wait_seconds=self._wait_max,
+            running_by_client=dict(self._running),
+            waiting_by_client={client_id: len(queue) for client_id, queue in self._waiting.items()},
+        )
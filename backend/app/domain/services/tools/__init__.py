@@ -4,6 +4,7 @@ from app.domain.services.tools.shell import ShellTool
 from app.domain.services.tools.search import SearchTool
 from app.domain.services.tools.message import MessageTool
 from app.domain.services.tools.file import FileTool
+from app.domain.services.tools.recall import RecallTool
 
 __all__ = [
     'BaseTool',
@@ -12,4 +13,5 @@ __all__ = [
     'SearchTool',
     'MessageTool',
     'FileTool',
+    'RecallTool',
 ]
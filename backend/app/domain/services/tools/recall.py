@@ -0,0 +1,48 @@
+from typing import Awaitable, Callable, Optional
+from app.domain.services.tools.base import tool, BaseTool
+from app.domain.models.tool_result import ToolResult
+
+class RecallTool(BaseTool):
+    """Recall tool class, bringing back tool results shortened in the agent's context"""
+
+    name: str = "recall"
+
+    def __init__(self, recall: Callable[[str], Awaitable[Optional[str]]]):
+        """Initialize recall tool class
+
+        Args:
+            recall: Looks up the stored result of a tool call by its ID
+        """
+        super().__init__()
+        self._recall = recall
+
+    @tool(
+        name="recall_tool_result",
+        description="Get the full result of an earlier tool call that was shortened to a stored_tool_result stub. Use only when the excerpt in the stub is not enough.",
+        parameters={
+            "tool_call_id": {
+                "type": "string",
+                "description": "tool_call_id attribute of the stored_tool_result stub"
+            }
+        },
+        required=["tool_call_id"]
+    )
+    async def recall_tool_result(
+        self,
+        tool_call_id: str
+    ) -> ToolResult:
+        """Get the full result of an earlier tool call
+
+        Args:
+            tool_call_id: ID of the tool call whose result was shortened
+
+        Returns:
+            The original tool result
+        """
+        content = await self._recall(tool_call_id)
+        if content is None:
+            return ToolResult(success=False, message=f"No stored result for tool call {tool_call_id}")
+        try:
+            return ToolResult.model_validate_json(content)
+        except ValueError:
+            return ToolResult(success=True, data=content)
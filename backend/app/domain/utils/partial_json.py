@@ -0,0 +1,50 @@
+import json
+import re
+from typing import Optional
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+def partial_json_string(text: str, key: str) -> Optional[str]:
+    """Decode as much of a string field as a JSON document still being written holds
+
+    The first occurrence of the key is read, whatever object it belongs to.
+    An escape sequence cut off at the end is left out until it is complete.
+
+    Args:
+        text: Start of a JSON document
+        key: Name of the string field
+
+    Returns:
+        The decoded start of the field's value, None if the value has not started
+    """
+    match = re.search(f'"{re.escape(key)}"\\s*:\\s*"', text)
+    if not match:
+        return None
+    chars = []
+    i = match.end()
+    while i < len(text):
+        char = text[i]
+        if char == '"':
+            break
+        if char != "\\":
+            chars.append(char)
+            i += 1
+            continue
+        if i + 1 >= len(text):
+            break
+        escape = text[i + 1]
+        if escape != "u":
+            chars.append(_ESCAPES.get(escape, escape))
+            i += 2
+            continue
+        # A surrogate pair is two escapes, both are needed to decode it
+        end = i + 12 if text[i + 2:i + 4].lower() in ("d8", "d9", "da", "db") else i + 6
+        if end > len(text):
+            break
+        try:
+            chars.append(json.loads(f'"{text[i:end]}"'))
+        except ValueError:
+            break
+        i = end
+    return "".join(chars)
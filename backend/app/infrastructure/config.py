@@ -11,6 +11,18 @@ class Settings(BaseSettings):
     model_name: str = "deepseek-chat"
     temperature: float = 0.7
     max_tokens: int = 2000
+    context_budget_tokens: int = 32000  # Most memory tokens sent per LLM call, older turns are summarized past it, 0 sends the whole memory
+    tool_result_max_bytes: int = 16384  # Larger tool results are stored aside and kept in memory as stubs, 0 keeps them whole
+    tool_result_stale_turns: int = 8  # Tool results older than this many turns are sent as stubs, 0 sends them whole
+    llm_max_retries: int = 2  # Retries of LLM calls failing on connection errors, rate limits and server errors
+    llm_stream_enabled: bool = True  # Stream completions so replies show as they are written, off for providers without streaming
+    llm_usage_enabled: bool = True  # Record the tokens and time of every LLM call in MongoDB
+    llm_usage_flush_interval_seconds: float = 5.0  # How often recorded LLM calls are written
+    llm_cache_backend: str | None = None  # "memory", "redis" or "disk" to answer repeated LLM requests from a cache, None disables it
+    llm_cache_callers: str = "json_repair"  # Comma separated callers whose requests are cached, "*" for all, e.g. for replay and benchmark runs
+    llm_cache_max_entries: int = 1000  # Responses kept by the memory backend of each process
+    llm_cache_ttl_seconds: int = 86400  # Lifetime of responses in the redis backend, 0 keeps them
+    llm_cache_dir: str = "llm_cache"  # Directory of the disk backend
 
     # MongoDB configuration
     mongodb_uri: str = "mongodb://mongodb:27017"
@@ -23,6 +35,46 @@ class Settings(BaseSettings):
     redis_port: int = 6379
     redis_db: int = 0
     redis_password: str | None = None
+    redis_stream_block_ms: int = 5000  # Block time of the shared stream reader
+    redis_stream_read_count: int = 100  # Max messages fetched per stream in one read
+    redis_input_group: str = "agent"  # Consumer group reading task input streams
+    redis_input_claim_idle_ms: int = 60000  # Idle time before a pending input message is reclaimed
+    redis_stream_event_encoding: str = "json"  # "json" or "msgpack" for compact binary events on output streams
+    redis_stream_maxlen: int = 10000  # Approximate cap on entries per task output stream
+    redis_stream_ttl_seconds: int = 86400  # TTL applied to task streams once the task is done
+    redis_stream_archive_after_seconds: int = 600  # Grace period before finished output streams are archived
+    redis_stream_archive_chunk: int = 500  # Stream entries per archive document
+    redis_stream_sweep_interval_seconds: int = 60
+    redis_stream_sweep_batch: int = 100  # Max finished tasks archived per sweep
+
+    # Task registry configuration
+    task_heartbeat_interval_seconds: int = 10
+    task_heartbeat_ttl_seconds: int = 30  # A replica missing heartbeats this long is considered dead
+
+    # Admission control configuration
+    max_running_tasks: int = 20  # Tasks run at once by one API process, 0 disables admission control
+    max_running_tasks_per_client: int = 3
+
+    # Flow recovery configuration
+    flow_recovery_interval_seconds: int = 60  # How often to look for sessions whose task was lost
+    flow_recovery_max_attempts: int = 3  # Resumes of one flow before it is marked as failed
+
+    # Session configuration
+    session_change_batch_ms: int = 200  # Session changes published within this window reach viewers as one update
+    session_cache_size: int = 1000  # Decoded sessions kept per process, 0 disables the cache
+    session_flush_interval_ms: int = 1000  # Max delay before a running task writes title, latest message and unread count
+    session_archive_after_days: int = 30  # Completed sessions idle this long move to cold storage, 0 disables archival
+    session_archive_sweep_interval_seconds: int = 3600
+    session_archive_sweep_batch: int = 100  # Max sessions archived per sweep
+
+    # Agent memory cache configuration
+    memory_cache_max_mb: int = 256  # Cap on agent memories cached by one process, 0 disables the cache
+
+    # Worker configuration
+    agent_worker_mode: bool = False  # Queue agent tasks for worker processes instead of running them in the API
+    worker_concurrency: int = 4  # Tasks run at once by one worker process
+    worker_poll_block_ms: int = 5000
+    worker_shutdown_timeout_seconds: int = 30  # Time running tasks get to finish on worker shutdown
 
     # Sandbox configuration
     sandbox_address: str | None = None
@@ -0,0 +1,339 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta, UTC
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+import bson
+import zstandard
+from beanie import UpdateResponse
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from pydantic import BaseModel
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError
+from app.domain.external.session_archive import SessionArchive
+from app.domain.models.session import SessionStatus
+from app.infrastructure.config import get_settings
+from app.infrastructure.models.documents import AgentDocument, EventDocument, SessionDocument, ToolPayloadDocument
+from app.infrastructure.storage.mongodb import get_mongodb
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_BUCKET = "session_archives"
+ARCHIVE_FORMAT = 1
+ARCHIVE_LEASE_SECONDS = 600  # Claims older than this were left by a crashed process and can be taken over
+ARCHIVING = "archiving"
+ARCHIVED = "archived"
+RESTORING = "restoring"
+_RESTORE_POLL_SECONDS = 0.5
+_ZSTD_LEVEL = 10
+_DUPLICATE_KEY = 11000
+
+
+class _ArchiveState(BaseModel):
+    """Archive fields of a session document"""
+    session_id: str
+    archive_state: Optional[str] = None
+    archive_file_id: Optional[str] = None
+
+
+class SessionArchiveStats(BaseModel):
+    """Counters describing what this process moved in and out of cold storage"""
+    sessions_archived: int = 0
+    sessions_restored: int = 0
+    bytes_archived: int = 0
+    last_sweep_at: Optional[datetime] = None
+
+
+class GridFSSessionArchive(SessionArchive):
+    """Session archive kept as zstd compressed blobs in GridFS
+
+    A blob is a sequence of BSON documents: a header, the stored event
+    documents in order, the memories of the session's agent, then the tool
+    results its agent stored aside. The session document stays behind as a
+    stub pointing to the blob.
+
+    Moving a history in or out takes several writes, so the session document
+    carries a claim while it happens. Restores wait for a running archival to
+    finish first. A claim left behind by a crashed process is taken over once
+    it is older than ARCHIVE_LEASE_SECONDS, and as the blob is recorded before
+    anything is deleted, no step loses data when it is interrupted.
+    """
+
+    def __init__(self):
+        self._settings = get_settings()
+        self._fs: Optional[AsyncIOMotorGridFSBucket] = None
+        self._stats = SessionArchiveStats()
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def _bucket(self) -> AsyncIOMotorGridFSBucket:
+        if self._fs is None:
+            database = get_mongodb().client[self._settings.mongodb_database]
+            self._fs = AsyncIOMotorGridFSBucket(database, bucket_name=ARCHIVE_BUCKET)
+        return self._fs
+
+    @staticmethod
+    def _stale_claim(state: str) -> Dict[str, Any]:
+        return {
+            "archive_state": state,
+            "archive_claimed_at": {"$lt": datetime.now(UTC) - timedelta(seconds=ARCHIVE_LEASE_SECONDS)},
+        }
+
+    async def _claim(self, session_id: str, state: str, condition: Dict[str, Any]) -> Optional[SessionDocument]:
+        """Mark a session as being archived or restored if it meets the condition
+
+        Returns:
+            The session document as claimed, None if the condition was not met
+        """
+        return await SessionDocument.find_one({"session_id": session_id, **condition}).update(
+            {
+                "$set": {
+                    "archive_state": state,
+                    "archive_claim": uuid.uuid4().hex,
+                    "archive_claimed_at": datetime.now(UTC),
+                },
+                "$inc": {"version": 1},
+            },
+            response_type=UpdateResponse.NEW_DOCUMENT
+        )
+
+    async def _release(self, session: SessionDocument, state: Optional[str], **fields: Any) -> bool:
+        """End a claim, leaving the session in the given archive state
+
+        Returns:
+            bool: False if the claim had been taken over
+        """
+        update: Dict[str, Any] = {
+            "$unset": {"archive_claim": "", "archive_claimed_at": ""},
+            "$inc": {"version": 1},
+        }
+        if state is None:
+            update["$unset"].update({"archive_state": "", "archive_file_id": "", "archived_at": ""})
+        else:
+            update["$set"] = {"archive_state": state, **fields}
+        result = await SessionDocument.find_one(
+            {"session_id": session.session_id, "archive_claim": session.archive_claim}
+        ).update(update)
+        return bool(result and result.matched_count)
+
+    async def archive(self, session_id: str, idle_before: datetime) -> bool:
+        """Move the events and agent memories of a completed session to GridFS
+
+        Args:
+            session_id: Session to archive
+            idle_before: Only archive the session if it was last updated before this
+
+        Returns:
+            bool: Whether the session was archived
+        """
+        session = await self._claim(session_id, ARCHIVING, {"$or": [
+            {"archive_state": None, "status": SessionStatus.COMPLETED, "updated_at": {"$lt": idle_before}},
+            # Finish archivals interrupted by a crash
+            self._stale_claim(ARCHIVING),
+        ]})
+        if session is None:
+            return False
+
+        file_id = session.archive_file_id
+        try:
+            if file_id is None:
+                blob = await self._export(session)
+                file_id = str(await self._bucket().upload_from_stream(
+                    f"{session_id}.bson.zst", blob, metadata={"session_id": session_id, "format": ARCHIVE_FORMAT}
+                ))
+                # Record the blob before deleting anything, so an interrupted archival can be finished or undone
+                result = await SessionDocument.find_one(
+                    {"session_id": session_id, "archive_claim": session.archive_claim}
+                ).update({"$set": {"archive_file_id": file_id}})
+                if not result or not result.matched_count:
+                    await self._delete_blob(file_id)
+                    return False
+                self._stats.bytes_archived += len(blob)
+
+            await AgentDocument.get_pymongo_collection().update_one(
+                {"agent_id": session.agent_id}, {"$set": {"memories": {}}}
+            )
+            await EventDocument.find(EventDocument.session_id == session_id).delete()
+            await ToolPayloadDocument.find(ToolPayloadDocument.agent_id == session.agent_id).delete()
+        except Exception as e:
+            logger.error(f"Failed to archive Session {session_id}: {str(e)}")
+            if file_id is None:
+                await self._release(session, None)
+            else:
+                # The blob holds the whole history, restoring from it makes up for whatever was not deleted
+                await self._release(session, ARCHIVED, archive_file_id=file_id, archived_at=datetime.now(UTC))
+            return False
+
+        if not await self._release(session, ARCHIVED, archived_at=datetime.now(UTC)):
+            logger.warning(f"Lost the archive claim of Session {session_id}")
+            return False
+        self._stats.sessions_archived += 1
+        logger.debug(f"Archived Session {session_id} to blob {file_id}")
+        return True
+
+    async def _export(self, session: SessionDocument) -> bytes:
+        """Compressed blob of a session's events and agent memories"""
+        records = [bson.encode({
+            "format": ARCHIVE_FORMAT,
+            "session_id": session.session_id,
+            "agent_id": session.agent_id,
+            "event_seq": session.event_seq,
+        })]
+        # Stored documents are archived as they are, without decoding them into models
+        async for event in EventDocument.get_pymongo_collection().find(
+            {"session_id": session.session_id}, {"_id": 0}
+        ).sort("seq", ASCENDING):
+            records.append(bson.encode({"event": event}))
+        agent = await AgentDocument.get_pymongo_collection().find_one(
+            {"agent_id": session.agent_id}, {"_id": 0, "memories": 1}
+        )
+        records.append(bson.encode({"memories": (agent or {}).get("memories", {})}))
+        async for payload in ToolPayloadDocument.get_pymongo_collection().find(
+            {"agent_id": session.agent_id}, {"_id": 0}
+        ):
+            records.append(bson.encode({"payload": payload}))
+        compressor = zstandard.ZstdCompressor(level=_ZSTD_LEVEL)
+        return await asyncio.to_thread(compressor.compress, b"".join(records))
+
+    async def _import(self, file_id: str) -> List[Dict[str, Any]]:
+        """Decompress a blob back into its BSON documents"""
+        stream = await self._bucket().open_download_stream(ObjectId(file_id))
+        blob = await stream.read()
+        data = await asyncio.to_thread(zstandard.ZstdDecompressor().decompress, blob)
+        return bson.decode_all(data)
+
+    async def restore(self, session_id: str) -> bool:
+        """Bring an archived session's events and agent memories back
+
+        Waits while another process archives or restores the session.
+
+        Returns:
+            bool: Whether anything was restored, False for sessions not archived
+        """
+        while True:
+            session = await self._claim(session_id, RESTORING, {"$or": [
+                {"archive_state": ARCHIVED},
+                self._stale_claim(ARCHIVING),
+                self._stale_claim(RESTORING),
+            ]})
+            if session is not None:
+                break
+            state = await SessionDocument.find_one(
+                SessionDocument.session_id == session_id
+            ).project(_ArchiveState)
+            if state is None or state.archive_state is None:
+                return False
+            await asyncio.sleep(_RESTORE_POLL_SECONDS)
+
+        file_id = session.archive_file_id
+        if file_id is not None:
+            try:
+                header, *records = await self._import(file_id)
+                events = [record["event"] for record in records if "event" in record]
+                memories = next((record["memories"] for record in records if "memories" in record), {})
+                payloads = [record["payload"] for record in records if "payload" in record]
+                # Documents an interrupted archival did not get to delete are still there
+                await self._insert_missing(EventDocument, events)
+                await self._insert_missing(ToolPayloadDocument, payloads)
+                await AgentDocument.get_pymongo_collection().update_one(
+                    {"agent_id": header["agent_id"]}, {"$set": {"memories": memories}}
+                )
+            except Exception as e:
+                logger.error(f"Failed to restore Session {session_id}: {str(e)}")
+                await self._release(session, ARCHIVED)
+                raise
+
+        if not await self._release(session, None):
+            logger.warning(f"Lost the restore claim of Session {session_id}")
+            return False
+        if file_id is not None:
+            await self._delete_blob(file_id)
+        self._stats.sessions_restored += 1
+        logger.debug(f"Restored Session {session_id} from blob {file_id}")
+        return True
+
+    @staticmethod
+    async def _insert_missing(document_class: Any, documents: List[Dict[str, Any]]) -> None:
+        """Insert stored documents, skipping those already there"""
+        if not documents:
+            return
+        try:
+            await document_class.get_pymongo_collection().insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            if any(error["code"] != _DUPLICATE_KEY for error in e.details.get("writeErrors", [])):
+                raise
+
+    async def discard(self, session_id: str) -> None:
+        """Delete the archive of a session, if it has one"""
+        state = await SessionDocument.find_one(
+            SessionDocument.session_id == session_id
+        ).project(_ArchiveState)
+        if state is not None and state.archive_file_id is not None:
+            await self._delete_blob(state.archive_file_id)
+
+    async def _delete_blob(self, file_id: str) -> None:
+        try:
+            await self._bucket().delete(ObjectId(file_id))
+        except Exception as e:
+            logger.warning(f"Failed to delete archive blob {file_id}: {str(e)}")
+
+    async def sweep(self) -> int:
+        """Archive completed sessions idle past the configured period
+
+        Returns:
+            int: Number of sessions archived
+        """
+        idle_before = datetime.now(UTC) - timedelta(days=self._settings.session_archive_after_days)
+        candidates = await SessionDocument.find({"$or": [
+            {"archive_state": None, "status": SessionStatus.COMPLETED, "updated_at": {"$lt": idle_before}},
+            self._stale_claim(ARCHIVING),
+        ]}).limit(self._settings.session_archive_sweep_batch).project(_ArchiveState).to_list()
+        archived = 0
+        for candidate in candidates:
+            try:
+                if await self.archive(candidate.session_id, idle_before):
+                    archived += 1
+            except Exception as e:
+                logger.error(f"Failed to archive Session {candidate.session_id}: {str(e)}")
+        self._stats.last_sweep_at = datetime.now(UTC)
+        if archived:
+            logger.info(f"Archived {archived} sessions, {self._stats.bytes_archived} compressed bytes written so far")
+        return archived
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Session archive sweep failed: {str(e)}")
+            await asyncio.sleep(self._settings.session_archive_sweep_interval_seconds)
+
+    def start(self) -> None:
+        """Start the background sweeper"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+            logger.info("Session archive sweeper started")
+
+    async def shutdown(self) -> None:
+        """Stop the background sweeper"""
+        if self._sweeper is not None and not self._sweeper.done():
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+        self._sweeper = None
+
+    @property
+    def stats(self) -> SessionArchiveStats:
+        """Get the archival statistics of this process"""
+        return self._stats
+
+
+@lru_cache
+def get_session_archive() -> GridFSSessionArchive:
+    """Get the session archive instance."""
+    return GridFSSessionArchive()
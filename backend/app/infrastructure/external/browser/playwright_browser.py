@@ -2,7 +2,8 @@ from typing import Dict, Any, Optional, List
 from playwright.async_api import async_playwright, Browser, Page
 import asyncio
 from markdownify import markdownify
-from app.infrastructure.external.llm.openai_llm import OpenAILLM
+from app.domain.external.llm import llm_call_scope
+from app.infrastructure.external.llm.cached_llm import create_llm
 from app.infrastructure.config import get_settings
 from app.domain.models.tool_result import ToolResult
 import logging
@@ -17,7 +18,7 @@ class PlaywrightBrowser:
         self.browser: Optional[Browser] = None
         self.page: Optional[Page] = None
         self.playwright = None
-        self.llm = OpenAILLM()
+        self.llm = create_llm()
         self.settings = get_settings()
         self.cdp_url = cdp_url
         
@@ -216,15 +217,16 @@ class PlaywrightBrowser:
         markdown_content = markdownify(visible_content)
 
         max_content_length = min(50000, len(markdown_content))
-        response = await self.llm.ask([{
-            "role": "system",
-            "content": "You are a professional web page information extraction assistant. Please extract all information from the current page content and convert it to Markdown format."
-        },
-        {
-            "role": "user",
-            "content": markdown_content[:max_content_length]
-        }
-        ])
+        with llm_call_scope(caller="browser"):
+            response = await self.llm.ask([{
+                "role": "system",
+                "content": "You are a professional web page information extraction assistant. Please extract all information from the current page content and convert it to Markdown format."
+            },
+            {
+                "role": "user",
+                "content": markdown_content[:max_content_length]
+            }
+            ])
         
         return response.get("content", "")
     
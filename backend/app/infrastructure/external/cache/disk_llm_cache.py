@@ -0,0 +1,43 @@
+import asyncio
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+from app.domain.external.llm_cache import LLMCache
+
+
+class DiskLLMCache(LLMCache):
+    """LLM responses kept as JSON files in a directory, one file per request key
+
+    Nothing expires, so a directory filled by one run replays its responses
+    in later runs, or on other machines once copied.
+    """
+
+    def __init__(self, directory: str):
+        self._directory = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        return self._directory / key[:2] / f"{key}.json"
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, message: Dict[str, Any]) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Readers never see a partly written file
+        temp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(message, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._read, key)
+
+    async def put(self, key: str, message: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._write, key, message)
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import logging
+import uuid
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from app.domain.external.memory_cache import MemoryCache
+from app.domain.models.memory import Memory
+from app.infrastructure.config import get_settings
+from app.infrastructure.storage.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+MEMORY_CLAIMS_CHANNEL = "agent:memory:claims"  # Carries "<process ID>|<agent ID>" when a process starts running an agent
+
+
+def _message_size(message: Dict[str, Any]) -> int:
+    return len(json.dumps(message, default=str))
+
+
+class _CachedMemory:
+    def __init__(self, messages: List[Dict[str, Any]], version: int, size: int,
+                 summary: Optional[str] = None, summarized: int = 0):
+        self.messages = messages
+        self.version = version
+        self.size = size
+        self.summary = summary
+        self.summarized = summarized
+
+
+class LocalMemoryCache(MemoryCache):
+    """In-process LRU cache of agent memories, capped in bytes
+
+    The cache of a process is only trusted for the agents it runs. When a
+    process starts running an agent it announces it on Redis pub/sub, and the
+    other processes drop their copies of that agent's memories. If the
+    announcements may have been missed, after a reconnect, the whole cache is
+    dropped.
+    """
+
+    def __init__(self, max_bytes: int):
+        self._redis = get_redis()
+        self._max_bytes = max_bytes
+        self._process_id = uuid.uuid4().hex
+        self._entries: "OrderedDict[Tuple[str, str], _CachedMemory]" = OrderedDict()
+        self._bytes = 0
+        self._listener: Optional[asyncio.Task] = None
+
+    def get(self, agent_id: str, name: str) -> Optional[Memory]:
+        """Get a copy of a cached memory, None on a miss"""
+        entry = self._entries.get((agent_id, name))
+        if entry is None:
+            return None
+        self._entries.move_to_end((agent_id, name))
+        return Memory(
+            messages=list(entry.messages),
+            version=entry.version,
+            summary=entry.summary,
+            summarized=entry.summarized
+        )
+
+    def put(self, agent_id: str, name: str, memory: Memory) -> None:
+        """Cache a memory as it is stored"""
+        self.invalidate(agent_id, name)
+        size = sum(_message_size(message) for message in memory.messages) + len(memory.summary or "")
+        if size > self._max_bytes:
+            return
+        self._entries[(agent_id, name)] = _CachedMemory(
+            list(memory.messages), memory.version, size, memory.summary, memory.summarized
+        )
+        self._bytes += size
+        self._evict()
+
+    def append(self, agent_id: str, name: str, messages: List[Dict[str, Any]], version: int) -> None:
+        """Record messages appended to a stored memory, which is now at `version`"""
+        entry = self._entries.get((agent_id, name))
+        if entry is None:
+            return
+        if entry.version != version - 1:
+            # Some write went unseen, the copy can no longer be completed
+            self.invalidate(agent_id, name)
+            return
+        size = sum(_message_size(message) for message in messages)
+        entry.messages.extend(messages)
+        entry.version = version
+        entry.size += size
+        self._bytes += size
+        self._entries.move_to_end((agent_id, name))
+        self._evict()
+
+    def set_summary(self, agent_id: str, name: str, summary: str, summarized: int) -> None:
+        """Record the summary stored for a memory"""
+        entry = self._entries.get((agent_id, name))
+        if entry is None:
+            return
+        size = len(summary) - len(entry.summary or "")
+        entry.summary = summary
+        entry.summarized = summarized
+        entry.size += size
+        self._bytes += size
+        self._evict()
+
+    def invalidate(self, agent_id: str, name: Optional[str] = None) -> None:
+        """Drop one memory of an agent, or all of them"""
+        keys = [(agent_id, name)] if name is not None else [key for key in self._entries if key[0] == agent_id]
+        for key in keys:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry.size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _evict(self) -> None:
+        while self._bytes > self._max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+
+    async def claim(self, agent_id: str) -> None:
+        """Announce that this process now runs the agent, failures are logged and never raised"""
+        try:
+            await self._redis.client.publish(MEMORY_CLAIMS_CHANNEL, f"{self._process_id}|{agent_id}")
+        except Exception as e:
+            logger.warning(f"Failed to announce claim of Agent {agent_id}: {str(e)}")
+
+    async def _listen_loop(self) -> None:
+        while True:
+            pubsub = self._redis.client.pubsub()
+            try:
+                await pubsub.subscribe(MEMORY_CLAIMS_CHANNEL)
+                # Claims may have been missed while not subscribed
+                self.clear()
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+                    if message is None:
+                        continue
+                    process_id, _, agent_id = message["data"].partition("|")
+                    if process_id != self._process_id:
+                        self.invalidate(agent_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Memory claim subscription failed: {str(e)}")
+                self.clear()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def start(self) -> None:
+        """Start following the claims of other processes"""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen_loop())
+            logger.info("Memory cache claim listener started")
+
+    async def shutdown(self) -> None:
+        """Stop following claims and drop the cache"""
+        if self._listener is not None and not self._listener.done():
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        self._listener = None
+        self.clear()
+
+    @property
+    def size_bytes(self) -> int:
+        """Approximate size of the cached messages"""
+        return self._bytes
+
+
+@lru_cache
+def get_memory_cache() -> LocalMemoryCache:
+    """Get the memory cache instance."""
+    return LocalMemoryCache(get_settings().memory_cache_max_mb * 1024 * 1024)
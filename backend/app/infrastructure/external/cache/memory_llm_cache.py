@@ -0,0 +1,29 @@
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from app.domain.external.llm_cache import LLMCache
+
+
+class MemoryLLMCache(LLMCache):
+    """In-process LRU cache of LLM responses, capped in entries
+
+    Responses are kept serialized, so callers changing what they get back
+    never change the cache.
+    """
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._entries.get(key)
+        if value is None:
+            return None
+        self._entries.move_to_end(key)
+        return json.loads(value)
+
+    async def put(self, key: str, message: Dict[str, Any]) -> None:
+        self._entries[key] = json.dumps(message, ensure_ascii=False)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
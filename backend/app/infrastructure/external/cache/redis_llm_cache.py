@@ -0,0 +1,25 @@
+import json
+from typing import Any, Dict, Optional
+from app.domain.external.llm_cache import LLMCache
+from app.infrastructure.storage.redis import get_redis
+
+LLM_CACHE_KEY_PREFIX = "llm:cache:"
+
+
+class RedisLLMCache(LLMCache):
+    """LLM responses shared by all processes through Redis, expiring after a TTL"""
+
+    def __init__(self, ttl_seconds: int):
+        self._redis = get_redis()
+        self._ttl_seconds = ttl_seconds
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = await self._redis.client.get(f"{LLM_CACHE_KEY_PREFIX}{key}")
+        return json.loads(value) if value is not None else None
+
+    async def put(self, key: str, message: Dict[str, Any]) -> None:
+        await self._redis.client.set(
+            f"{LLM_CACHE_KEY_PREFIX}{key}",
+            json.dumps(message, ensure_ascii=False),
+            ex=self._ttl_seconds or None
+        )
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import logging
+from functools import lru_cache
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional
+from pydantic import BaseModel
+from app.domain.external.llm import LLM, LLMStreamChunk, current_llm_call_scope
+from app.domain.external.llm_cache import LLMCache
+from app.infrastructure.config import get_settings
+from app.infrastructure.external.cache.disk_llm_cache import DiskLLMCache
+from app.infrastructure.external.cache.memory_llm_cache import MemoryLLMCache
+from app.infrastructure.external.cache.redis_llm_cache import RedisLLMCache
+from app.infrastructure.external.llm.openai_llm import OpenAILLM
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_KEY_VERSION = 1  # Bumped whenever what goes into a key changes, so old entries are no longer hit
+
+
+def _canonical(value: Any) -> Any:
+    """Drop unset fields, so a request hashes the same whether they are left out or null"""
+    if isinstance(value, dict):
+        return {key: _canonical(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        return [_canonical(item) for item in value]
+    return value
+
+
+def llm_cache_key(
+    model_name: str,
+    temperature: float,
+    max_tokens: int,
+    messages: List[Dict[str, Any]],
+    tools: Optional[List[Dict[str, Any]]] = None,
+    response_format: Optional[Dict[str, Any]] = None
+) -> str:
+    """Hash of everything that shapes the response to a request"""
+    request = _canonical({
+        "version": LLM_CACHE_KEY_VERSION,
+        "model": model_name,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "messages": messages,
+        "tools": tools or None,
+        "response_format": response_format,
+    })
+    data = json.dumps(request, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class LLMCacheCounters(BaseModel):
+    """Lookups of cached LLM responses"""
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    errors: int = 0  # Failed reads and writes, the request then goes to the LLM as on a miss
+
+
+class LLMCacheStats(LLMCacheCounters):
+    """Counters of the LLM response cache of this process, in total and by caller"""
+    backend: Optional[str] = None
+    by_caller: Dict[str, LLMCacheCounters] = {}
+
+    def count(self, caller: str, field: str) -> None:
+        setattr(self, field, getattr(self, field) + 1)
+        counters = self.by_caller.setdefault(caller, LLMCacheCounters())
+        setattr(counters, field, getattr(counters, field) + 1)
+
+
+class CachedLLM(LLM):
+    """LLM answering repeated requests from a cache of earlier responses
+
+    Only requests made in the LLM call scope of one of the given callers are
+    cached, "*" caching them all. Other requests, and cache failures, go to
+    the wrapped LLM. Responses served from the cache cost no tokens and are
+    not recorded as LLM calls.
+    """
+
+    def __init__(self, llm: LLM, cache: LLMCache, callers: List[str], stats: LLMCacheStats):
+        """
+        Args:
+            llm: LLM sending the requests not answered from the cache
+            cache: Where responses are kept
+            callers: Callers whose requests are cached, "*" for all of them
+            stats: Counters updated by each lookup
+        """
+        self._llm = llm
+        self._cache = cache
+        self._callers = set(callers)
+        self._stats = stats
+
+    def _cached_caller(self) -> Optional[str]:
+        """Caller of the request being made, None when its requests are not cached"""
+        caller = current_llm_call_scope().caller or "unknown"
+        return caller if "*" in self._callers or caller in self._callers else None
+
+    def _key(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]],
+        response_format: Optional[Dict[str, Any]]
+    ) -> str:
+        return llm_cache_key(
+            self._llm.model_name, self._llm.temperature, self._llm.max_tokens,
+            messages, tools, response_format
+        )
+
+    async def _get(self, caller: str, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            message = await self._cache.get(key)
+        except Exception as e:
+            logger.warning(f"Failed to read cached LLM response {key[:16]}: {str(e)}")
+            self._stats.count(caller, "errors")
+            return None
+        self._stats.count(caller, "hits" if message is not None else "misses")
+        if message is not None:
+            logger.debug(f"LLM response {key[:16]} of {caller} served from cache")
+        return message
+
+    async def _put(self, caller: str, key: str, message: Dict[str, Any]) -> None:
+        try:
+            await self._cache.put(key, message)
+        except Exception as e:
+            logger.warning(f"Failed to cache LLM response {key[:16]}: {str(e)}")
+            self._stats.count(caller, "errors")
+            return
+        self._stats.count(caller, "writes")
+
+    async def ask(self, messages: List[Dict[str, str]],
+                  tools: Optional[List[Dict[str, Any]]] = None,
+                  response_format: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        caller = self._cached_caller()
+        if caller is None:
+            return await self._llm.ask(messages, tools=tools, response_format=response_format)
+        key = self._key(messages, tools, response_format)
+        message = await self._get(caller, key)
+        if message is None:
+            message = await self._llm.ask(messages, tools=tools, response_format=response_format)
+            await self._put(caller, key, message)
+        return message
+
+    def ask_stream(self, messages: List[Dict[str, str]],
+                   tools: Optional[List[Dict[str, Any]]] = None,
+                   response_format: Optional[Dict[str, Any]] = None) -> AsyncIterator[LLMStreamChunk]:
+        # Like the wrapped LLM, the request belongs to the scope current now, not when chunks are read
+        caller = self._cached_caller()
+        stream = self._llm.ask_stream(messages, tools=tools, response_format=response_format)
+        if caller is None:
+            return stream
+        return self._ask_stream(caller, self._key(messages, tools, response_format), stream)
+
+    async def _ask_stream(
+        self,
+        caller: str,
+        key: str,
+        stream: AsyncIterator[LLMStreamChunk]
+    ) -> AsyncGenerator[LLMStreamChunk, None]:
+        message = await self._get(caller, key)
+        if message is not None:
+            # Replayed whole, as one chunk of content and tool calls
+            yield LLMStreamChunk(content=message.get("content"), tool_calls=message.get("tool_calls") or [])
+            yield LLMStreamChunk(message=message)
+            return
+        async for chunk in stream:
+            if chunk.message is not None:
+                await self._put(caller, key, chunk.message)
+            yield chunk
+
+    @property
+    def model_name(self) -> str:
+        return self._llm.model_name
+
+    @property
+    def temperature(self) -> float:
+        return self._llm.temperature
+
+    @property
+    def max_tokens(self) -> int:
+        return self._llm.max_tokens
+
+
+@lru_cache
+def get_llm_cache() -> Optional[LLMCache]:
+    """Get the LLM response cache instance, None when no backend is configured."""
+    settings = get_settings()
+    backend = (settings.llm_cache_backend or "").lower()
+    if not backend:
+        return None
+    if backend == "memory":
+        return MemoryLLMCache(settings.llm_cache_max_entries)
+    if backend == "redis":
+        return RedisLLMCache(settings.llm_cache_ttl_seconds)
+    if backend == "disk":
+        return DiskLLMCache(settings.llm_cache_dir)
+    raise ValueError(f"Unknown LLM cache backend: {settings.llm_cache_backend}")
+
+
+@lru_cache
+def get_llm_cache_stats() -> LLMCacheStats:
+    """Get the LLM response cache counters of this process."""
+    return LLMCacheStats(backend=(get_settings().llm_cache_backend or "").lower() or None)
+
+
+def create_llm() -> LLM:
+    """Create an LLM client, answering from the response cache when one is configured"""
+    llm = OpenAILLM()
+    cache = get_llm_cache()
+    if cache is None:
+        return llm
+    callers = [caller.strip() for caller in get_settings().llm_cache_callers.split(",") if caller.strip()]
+    return CachedLLM(llm, cache, callers, get_llm_cache_stats())
@@ -1,23 +1,47 @@
-from typing import List, Dict, Any, Optional
-from openai import AsyncOpenAI
-from app.domain.external.llm import LLM
+from typing import List, Dict, Any, AsyncGenerator, AsyncIterator, Optional
+import asyncio
+import time
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError
+from app.domain.external.llm import LLM, LLMCallScope, LLMStreamChunk, current_llm_call_scope
+from app.domain.models.llm_usage import LLMCall
 from app.infrastructure.config import get_settings
+from app.infrastructure.external.llm.usage_recorder import get_llm_usage_recorder
 import logging
 
 
 logger = logging.getLogger(__name__)
 
+RETRY_INITIAL_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+_RETRYABLE_STATUS = {408, 409, 429}
+
+
+class _CallTracker:
+    """What a call cost so far"""
+
+    def __init__(self, scope: LLMCallScope):
+        self.scope = scope
+        self.started = time.perf_counter()
+        self.retries = 0
+        self.usage: Any = None
+
+
 class OpenAILLM(LLM):
     def __init__(self):
         settings = get_settings()
+        # Retries are done here, so they are counted with the call
         self.client = AsyncOpenAI(
             api_key=settings.api_key,
-            base_url=settings.api_base
+            base_url=settings.api_base,
+            max_retries=0
         )
         
         self._model_name = settings.model_name
         self._temperature = settings.temperature
         self._max_tokens = settings.max_tokens
+        self._max_retries = settings.llm_max_retries
+        self._stream = settings.llm_stream_enabled
+        self._usage_recorder = get_llm_usage_recorder() if settings.llm_usage_enabled else None
         logger.info(f"Initialized OpenAI LLM with model: {self._model_name}")
     
     @property
@@ -31,33 +55,138 @@ class OpenAILLM(LLM):
     @property
     def max_tokens(self) -> int:
         return self._max_tokens
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, APIConnectionError):
+            return True
+        return isinstance(error, APIStatusError) and \
+            (error.status_code in _RETRYABLE_STATUS or error.status_code >= 500)
+
+    def _record_call(self, tracker: _CallTracker, success: bool) -> None:
+        """Account the tokens and time of a call to the scope it was made in"""
+        if not self._usage_recorder:
+            return
+        usage = tracker.usage
+        cached_tokens = 0
+        if usage is not None:
+            details = getattr(usage, "prompt_tokens_details", None)
+            # DeepSeek reports prompt cache hits in a field of its own
+            cached_tokens = getattr(details, "cached_tokens", None) or \
+                (usage.model_extra or {}).get("prompt_cache_hit_tokens") or 0
+        scope = tracker.scope
+        self._usage_recorder.record(LLMCall(
+            session_id=scope.session_id,
+            agent_id=scope.agent_id,
+            caller=scope.caller or "unknown",
+            model=self._model_name,
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+            cached_tokens=cached_tokens,
+            duration_ms=(time.perf_counter() - tracker.started) * 1000,
+            retries=tracker.retries,
+            success=success,
+        ))
+    
+    def _params(
+        self,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, Any]]],
+        response_format: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        params: Dict[str, Any] = {
+            "model": self._model_name,
+            "temperature": self._temperature,
+            "max_tokens": self._max_tokens,
+            "messages": messages,
+            "response_format": response_format,
+        }
+        if tools:
+            logger.debug(f"Sending request to OpenAI with tools, model: {self._model_name}")
+            params["tools"] = tools
+        else:
+            logger.debug(f"Sending request to OpenAI without tools, model: {self._model_name}")
+        return params
+
+    async def _create(self, params: Dict[str, Any], tracker: _CallTracker) -> Any:
+        """Create a chat completion, retrying failures that may pass"""
+        while True:
+            try:
+                return await self.client.chat.completions.create(**params)
+            except Exception as e:
+                if tracker.retries >= self._max_retries or not self._is_retryable(e):
+                    raise
+                tracker.retries += 1
+                logger.warning(f"OpenAI API call failed, retry {tracker.retries}/{self._max_retries}: {str(e)}")
+                await asyncio.sleep(min(RETRY_INITIAL_DELAY * 2 ** (tracker.retries - 1), RETRY_MAX_DELAY))
     
     async def ask(self, messages: List[Dict[str, str]], 
                             tools: Optional[List[Dict[str, Any]]] = None,
                             response_format: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Send chat request to OpenAI API"""
+        tracker = _CallTracker(current_llm_call_scope())
         response = None
         try:
-            if tools:
-                logger.debug(f"Sending request to OpenAI with tools, model: {self._model_name}")
-                response = await self.client.chat.completions.create(
-                    model=self._model_name,
-                    temperature=self._temperature,
-                    max_tokens=self._max_tokens,
-                    messages=messages,
-                    tools=tools,
-                    response_format=response_format,
-                )
-            else:
-                logger.debug(f"Sending request to OpenAI without tools, model: {self._model_name}")
-                response = await self.client.chat.completions.create(
-                    model=self._model_name,
-                    temperature=self._temperature,
-                    max_tokens=self._max_tokens,
-                    messages=messages,
-                    response_format=response_format
-                )
+            response = await self._create(self._params(messages, tools, response_format), tracker)
+            tracker.usage = response.usage
             return response.choices[0].message.model_dump()
         except Exception as e:
             logger.error(f"Error calling OpenAI API: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+        finally:
+            self._record_call(tracker, response is not None)
+
+    def ask_stream(self, messages: List[Dict[str, str]],
+                   tools: Optional[List[Dict[str, Any]]] = None,
+                   response_format: Optional[Dict[str, Any]] = None) -> AsyncIterator[LLMStreamChunk]:
+        """Send chat request to OpenAI API and stream the response"""
+        # The chunks may be read from other tasks, so the scope is taken now
+        return self._ask_stream(self._params(messages, tools, response_format), _CallTracker(current_llm_call_scope()))
+
+    async def _ask_stream(self, params: Dict[str, Any], tracker: _CallTracker) -> AsyncGenerator[LLMStreamChunk, None]:
+        success = False
+        try:
+            if not self._stream:
+                response = await self._create(params, tracker)
+                tracker.usage = response.usage
+                message = response.choices[0].message.model_dump()
+                success = True
+                yield LLMStreamChunk(content=message.get("content"), tool_calls=message.get("tool_calls") or [])
+                yield LLMStreamChunk(message=message)
+                return
+
+            # Only opening the stream is retried, chunks already handed out cannot be taken back
+            stream = await self._create({**params, "stream": True, "stream_options": {"include_usage": True}}, tracker)
+            content: List[str] = []
+            tool_calls: List[Dict[str, Any]] = []
+            async for chunk in stream:
+                if chunk.usage:
+                    tracker.usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                for fragment in delta.tool_calls or []:
+                    index = fragment.index or 0
+                    while len(tool_calls) <= index:
+                        tool_calls.append({"id": None, "type": "function", "function": {"name": "", "arguments": ""}})
+                    tool_call = tool_calls[index]
+                    if fragment.id:
+                        tool_call["id"] = fragment.id
+                    if fragment.function:
+                        tool_call["function"]["name"] += fragment.function.name or ""
+                        tool_call["function"]["arguments"] += fragment.function.arguments or ""
+                if delta.content:
+                    content.append(delta.content)
+                if delta.content or delta.tool_calls:
+                    yield LLMStreamChunk(content=delta.content or None, tool_calls=tool_calls if delta.tool_calls else [])
+            success = True
+            yield LLMStreamChunk(message={
+                "role": "assistant",
+                "content": "".join(content) or None,
+                "tool_calls": tool_calls or None,
+            })
+        except Exception as e:
+            logger.error(f"Error streaming from OpenAI API: {str(e)}")
+            raise
+        finally:
+            self._record_call(tracker, success)
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from collections import deque
+from functools import lru_cache
+from typing import Deque, List, Optional
+from pydantic import BaseModel
+from app.domain.models.llm_usage import LLMCall
+from app.domain.repositories.llm_usage_repository import LLMUsageRepository
+from app.infrastructure.config import get_settings
+from app.infrastructure.repositories.mongo_llm_usage_repository import MongoLLMUsageRepository
+
+logger = logging.getLogger(__name__)
+
+MAX_BUFFERED_CALLS = 10000  # Oldest records are dropped past this while the database is unreachable
+
+
+class LLMUsageRecorderStats(BaseModel):
+    """Counters describing the LLM call records of this process"""
+    recorded: int = 0
+    written: int = 0
+    dropped: int = 0
+    buffered: int = 0
+
+
+class LLMUsageRecorder:
+    """Collects LLM call records and writes them in batches
+
+    Recording only appends to a buffer, so LLM calls never wait on the
+    database. A background task flushes the buffer every
+    llm_usage_flush_interval_seconds and once more on shutdown; records
+    that fail to be written are kept for the next flush.
+    """
+
+    def __init__(self, repository: LLMUsageRepository):
+        self._repository = repository
+        self._settings = get_settings()
+        self._buffer: Deque[LLMCall] = deque()
+        self._stats = LLMUsageRecorderStats()
+        self._flusher: Optional[asyncio.Task] = None
+
+    def record(self, call: LLMCall) -> None:
+        """Queue the record of an LLM call for writing"""
+        if len(self._buffer) >= MAX_BUFFERED_CALLS:
+            self._buffer.popleft()
+            self._stats.dropped += 1
+        self._buffer.append(call)
+        self._stats.recorded += 1
+
+    async def flush(self) -> int:
+        """Write the buffered records
+
+        Returns:
+            int: Number of records written
+        """
+        calls: List[LLMCall] = list(self._buffer)
+        if not calls:
+            return 0
+        self._buffer.clear()
+        try:
+            await self._repository.add_calls(calls)
+        except Exception:
+            # Put them back ahead of the records made meanwhile
+            self._buffer.extendleft(reversed(calls))
+            while len(self._buffer) > MAX_BUFFERED_CALLS:
+                self._buffer.popleft()
+                self._stats.dropped += 1
+            raise
+        self._stats.written += len(calls)
+        return len(calls)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._settings.llm_usage_flush_interval_seconds)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to write {len(self._buffer)} LLM call records: {str(e)}")
+
+    def start(self) -> None:
+        """Start the background flusher"""
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+            logger.info("LLM usage recorder started")
+
+    async def shutdown(self) -> None:
+        """Stop the background flusher and write what is left"""
+        if self._flusher is not None and not self._flusher.done():
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+        self._flusher = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Failed to write {len(self._buffer)} LLM call records on shutdown: {str(e)}")
+
+    @property
+    def stats(self) -> LLMUsageRecorderStats:
+        """Get the recording statistics of this process"""
+        self._stats.buffered = len(self._buffer)
+        return self._stats
+
+
+@lru_cache
+def get_llm_usage_recorder() -> LLMUsageRecorder:
+    """Get the LLM usage recorder instance."""
+    return LLMUsageRecorder(MongoLLMUsageRepository())
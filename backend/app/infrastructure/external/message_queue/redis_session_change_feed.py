@@ -0,0 +1,67 @@
+import asyncio
+import logging
+from functools import lru_cache
+from typing import AsyncGenerator, List, Optional
+from app.domain.external.session_change_feed import SessionChangeFeed
+from app.infrastructure.config import get_settings
+from app.infrastructure.storage.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+SESSION_CHANGES_CHANNEL = "session:changes"
+
+
+class RedisSessionChangeFeed(SessionChangeFeed):
+    """Session change notifications over Redis pub/sub
+
+    Repositories publish the ID of every session they change. Subscribers get
+    the IDs in batches, changes arriving within `session_change_batch_ms` of
+    each other are delivered together and deduplicated.
+    """
+
+    def __init__(self):
+        self._redis = get_redis()
+        self._batch_seconds = get_settings().session_change_batch_ms / 1000
+
+    async def publish(self, session_id: str) -> None:
+        """Announce that a session changed, failures are logged and never raised"""
+        try:
+            await self._redis.client.publish(SESSION_CHANGES_CHANNEL, session_id)
+        except Exception as e:
+            logger.warning(f"Failed to publish change of Session {session_id}: {str(e)}")
+
+    async def subscribe(self) -> AsyncGenerator[Optional[List[str]], None]:
+        """Follow the changes, yielding None after a reconnect since changes may have been missed"""
+        loop = asyncio.get_running_loop()
+        reconnecting = False
+        while True:
+            pubsub = self._redis.client.pubsub()
+            try:
+                await pubsub.subscribe(SESSION_CHANGES_CHANNEL)
+                if reconnecting:
+                    yield None
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+                    if message is None:
+                        continue
+                    batch = {message["data"]}
+                    deadline = loop.time() + self._batch_seconds
+                    while (remaining := deadline - loop.time()) > 0:
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+                        if message is not None:
+                            batch.add(message["data"])
+                    yield list(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Session change subscription failed: {str(e)}")
+                reconnecting = True
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+
+@lru_cache
+def get_session_change_feed() -> RedisSessionChangeFeed:
+    """Get the session change feed instance."""
+    return RedisSessionChangeFeed()
@@ -0,0 +1,147 @@
+import uuid
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+from app.infrastructure.config import get_settings
+from app.infrastructure.storage.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+def parse_stream_id(stream_id: str) -> Tuple[int, int]:
+    """Parse a Redis stream ID ("<ms>-<seq>") into a comparable tuple"""
+    ms, _, seq = str(stream_id).partition("-")
+    return int(ms), int(seq or 0)
+
+
+class StreamSubscription:
+    """A single subscriber's position in a stream and its pending messages"""
+
+    def __init__(self, stream_name: str, start_id: Optional[str] = None):
+        self.stream_name = stream_name
+        self.last_id = start_id or "0"
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    def deliver(self, messages: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Queue the messages this subscriber has not seen yet"""
+        last = parse_stream_id(self.last_id)
+        for message_id, message_data in messages:
+            if parse_stream_id(message_id) <= last:
+                continue
+            last = parse_stream_id(message_id)
+            self.last_id = message_id
+            self.queue.put_nowait((message_id, message_data.get("data")))
+
+
+class RedisStreamDispatcher:
+    """Process-wide stream reader that fans events out to subscribers
+
+    A single blocking XREAD covers every subscribed stream, so the number of
+    Redis connections and round trips no longer grows with the number of viewers.
+    Each stream is read from the oldest position among its subscribers and every
+    subscriber filters out the messages it has already seen.
+    """
+
+    def __init__(self):
+        self._redis = get_redis()
+        self._settings = get_settings()
+        self._subscriptions: Dict[str, List[StreamSubscription]] = {}
+        self._reader: Optional[asyncio.Task] = None
+        # Private stream used to interrupt the blocking read when subscriptions change
+        self._wakeup_stream = f"dispatcher:wakeup:{uuid.uuid4().hex}"
+        self._wakeup_id = "0"
+
+    async def subscribe(self, stream_name: str, start_id: Optional[str] = None) -> AsyncGenerator[Tuple[str, Any], None]:
+        """Subscribe to a stream
+
+        Args:
+            stream_name: Stream to follow
+            start_id: Message ID to start after, defaults to "0" meaning from the earliest message
+
+        Yields:
+            Tuple[str, Any]: (Message ID, Message content)
+        """
+        subscription = StreamSubscription(stream_name, start_id)
+        self._subscriptions.setdefault(stream_name, []).append(subscription)
+        logger.debug(f"Subscribed to stream ({stream_name}) from {subscription.last_id}")
+        self._ensure_reader()
+        await self._wakeup()
+        try:
+            while True:
+                yield await subscription.queue.get()
+        finally:
+            self._unsubscribe(subscription)
+
+    def _unsubscribe(self, subscription: StreamSubscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.stream_name, [])
+        if subscription in subscriptions:
+            subscriptions.remove(subscription)
+        if not subscriptions:
+            self._subscriptions.pop(subscription.stream_name, None)
+        logger.debug(f"Unsubscribed from stream ({subscription.stream_name})")
+
+    def _ensure_reader(self) -> None:
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read_loop())
+
+    async def _wakeup(self) -> None:
+        """Interrupt the in-flight blocking read so new subscriptions are picked up"""
+        try:
+            async with self._redis.client.pipeline(transaction=False) as pipe:
+                pipe.xadd(self._wakeup_stream, {"data": ""}, maxlen=1)
+                pipe.expire(self._wakeup_stream, 3600)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to wake up stream dispatcher: {str(e)}")
+
+    def _read_positions(self) -> Dict[str, str]:
+        streams = {
+            stream_name: min((s.last_id for s in subscriptions), key=parse_stream_id)
+            for stream_name, subscriptions in self._subscriptions.items()
+        }
+        streams[self._wakeup_stream] = self._wakeup_id
+        return streams
+
+    async def _read_loop(self) -> None:
+        logger.info("Stream dispatcher started")
+        while self._subscriptions:
+            try:
+                response = await self._redis.client.xread(
+                    self._read_positions(),
+                    count=self._settings.redis_stream_read_count,
+                    block=self._settings.redis_stream_block_ms,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Stream dispatcher read failed: {str(e)}")
+                await asyncio.sleep(1)
+                continue
+
+            for stream_name, messages in response or []:
+                if not messages:
+                    continue
+                if stream_name == self._wakeup_stream:
+                    self._wakeup_id = messages[-1][0]
+                    continue
+                for subscription in list(self._subscriptions.get(stream_name, [])):
+                    subscription.deliver(messages)
+        logger.info("Stream dispatcher stopped, no active subscriptions")
+
+    async def shutdown(self) -> None:
+        """Stop the reader task"""
+        if self._reader is not None and not self._reader.done():
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+        self._reader = None
+        get_stream_dispatcher.cache_clear()
+
+
+@lru_cache
+def get_stream_dispatcher() -> RedisStreamDispatcher:
+    """Get the stream dispatcher instance."""
+    return RedisStreamDispatcher()
@@ -0,0 +1,177 @@
+import asyncio
+import os
+import socket
+import logging
+from typing import Any, Optional, Set, Tuple
+from redis.exceptions import ResponseError
+from app.infrastructure.config import get_settings
+from app.infrastructure.external.message_queue.redis_stream_queue import RedisStreamQueue
+
+logger = logging.getLogger(__name__)
+
+
+def default_consumer_name() -> str:
+    """Consumer name identifying this process within a consumer group"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class RedisStreamGroupQueue(RedisStreamQueue):
+    """Redis Stream queue consumed through a consumer group
+
+    Messages are delivered with XREADGROUP, so popping is blocking and lock-free.
+    A popped message stays pending until it is acknowledged; pending messages whose
+    consumer went silent for longer than the claim idle time are reclaimed with
+    XAUTOCLAIM, which gives at-least-once delivery. Messages this consumer is
+    still processing are claimed again by it from time to time, so they never
+    look idle however long they take.
+    """
+
+    def __init__(self, stream_name: str, group_name: Optional[str] = None, consumer_name: Optional[str] = None):
+        super().__init__(stream_name)
+        settings = get_settings()
+        self._group_name = group_name or settings.redis_input_group
+        self._consumer_name = consumer_name or default_consumer_name()
+        self._claim_idle_ms = settings.redis_input_claim_idle_ms
+        self._group_ready = False
+        self._held: Set[str] = set()  # Messages popped by this consumer and not acknowledged yet
+        self._keeper: Optional[asyncio.Task] = None
+
+    async def _ensure_group(self) -> None:
+        """Create the consumer group (and the stream) if they do not exist yet"""
+        if self._group_ready:
+            return
+        try:
+            await self._redis.client.xgroup_create(self._stream_name, self._group_name, id="0", mkstream=True)
+            logger.debug(f"Created consumer group {self._group_name} on stream ({self._stream_name})")
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    def _hold(self, message_id: str) -> None:
+        self._held.add(message_id)
+        if self._keeper is None or self._keeper.done():
+            self._keeper = asyncio.create_task(self._keep_alive_loop())
+
+    async def _keep_alive_loop(self) -> None:
+        """Reset the idle time of held messages well before they could be reclaimed"""
+        interval = max(self._claim_idle_ms / 3000, 0.1)
+        while self._held:
+            await asyncio.sleep(interval)
+            held = list(self._held)
+            if not held:
+                break
+            try:
+                await self._redis.client.xclaim(
+                    self._stream_name,
+                    self._group_name,
+                    self._consumer_name,
+                    min_idle_time=0,
+                    message_ids=held,
+                    justid=True,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Failed to keep {len(held)} pending messages of stream ({self._stream_name}) alive: {str(e)}")
+
+    async def _claim_stale(self) -> Tuple[str, Any]:
+        """Take over the oldest message left pending by an unresponsive consumer"""
+        response = await self._redis.client.xautoclaim(
+            self._stream_name,
+            self._group_name,
+            self._consumer_name,
+            min_idle_time=self._claim_idle_ms,
+            start_id="0-0",
+            count=1,
+        )
+        claimed = response[1] if response else []
+        for message_id, message_data in claimed:
+            if message_data is None:
+                # Entry was deleted while pending, drop it from the pending list
+                await self._redis.client.xack(self._stream_name, self._group_name, message_id)
+                continue
+            logger.warning(f"Reclaimed pending message {message_id} from stream ({self._stream_name})")
+            self._hold(message_id)
+            return message_id, message_data.get("data")
+        return None, None
+
+    async def pop(self, block_ms: Optional[int] = None) -> Tuple[str, Any]:
+        """Deliver the next message to this consumer
+
+        The message is not removed until ack() is called with its ID.
+
+        Args:
+            block_ms: Block time in milliseconds, defaults to None meaning no blocking
+
+        Returns:
+            Tuple[str, Any]: (Message ID, Message content), returns (None, None) if stream is empty
+        """
+        logger.debug(f"Popping message from stream ({self._stream_name}) as {self._consumer_name}")
+        await self._ensure_group()
+
+        message_id, message = await self._claim_stale()
+        if message_id is not None:
+            return message_id, message
+
+        messages = await self._redis.client.xreadgroup(
+            self._group_name,
+            self._consumer_name,
+            {self._stream_name: ">"},
+            count=1,
+            block=block_ms,
+        )
+        if not messages or not messages[0][1]:
+            return None, None
+
+        message_id, message_data = messages[0][1][0]
+        self._hold(message_id)
+        return message_id, message_data.get("data")
+
+    async def ack(self, message_id: str) -> bool:
+        """Acknowledge a processed message and remove it from the stream
+
+        Args:
+            message_id: ID of the popped message
+
+        Returns:
+            bool: True if message was acknowledged successfully, False otherwise
+        """
+        self._held.discard(message_id)
+        if not self._held and self._keeper is not None and not self._keeper.done():
+            self._keeper.cancel()
+        try:
+            async with self._redis.client.pipeline(transaction=False) as pipe:
+                pipe.xack(self._stream_name, self._group_name, message_id)
+                pipe.xdel(self._stream_name, message_id)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to acknowledge message {message_id} on stream ({self._stream_name}): {str(e)}")
+            return False
+
+    async def is_empty(self) -> bool:
+        """Check whether there is nothing left to deliver
+
+        Messages already delivered and still being processed do not count, but
+        pending messages old enough to be reclaimed do, unless this consumer
+        holds them.
+        """
+        await self._ensure_group()
+        groups = await self._redis.client.xinfo_groups(self._stream_name)
+        group = next((g for g in groups if g.get("name") == self._group_name), None)
+        last_delivered_id = group.get("last-delivered-id", "0-0") if group else "0-0"
+
+        undelivered = await self._redis.client.xrange(self._stream_name, f"({last_delivered_id}", "+", count=1)
+        if undelivered:
+            return False
+
+        stale = await self._redis.client.xpending_range(
+            self._stream_name,
+            self._group_name,
+            min="-",
+            max="+",
+            count=len(self._held) + 1,
+            idle=self._claim_idle_ms,
+        )
+        return all(entry["message_id"] in self._held for entry in stale)
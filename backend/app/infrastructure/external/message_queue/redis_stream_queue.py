@@ -1,20 +1,32 @@
 import json
 import uuid
 import asyncio
-from typing import Any, AsyncGenerator, Optional, Tuple
+from typing import Any, AsyncGenerator, List, Optional, Tuple
 import logging
 from app.infrastructure.storage.redis import get_redis
 from app.domain.external.message_queue import MessageQueue
+from app.infrastructure.external.message_queue.redis_stream_dispatcher import get_stream_dispatcher
 
 logger = logging.getLogger(__name__)
 
+# Lua script for atomic lock release
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+else
+    return 0
+end
+"""
+
 class RedisStreamQueue(MessageQueue):
     """Redis Stream implementation of message queue"""
     
-    def __init__(self, stream_name: str):
+    def __init__(self, stream_name: str, maxlen: Optional[int] = None):
         self._stream_name = stream_name
+        self._maxlen = maxlen  # Approximate trim length applied on every XADD
         self._redis = get_redis()
         self._lock_expire_seconds = 10  # Lock expiration time
+        self._release_script = None  # Registered once, then invoked by SHA
     
     async def _acquire_lock(self, lock_key: str, timeout_seconds: int = 5) -> Optional[str]:
         """Acquire distributed lock
@@ -57,18 +69,10 @@ class RedisStreamQueue(MessageQueue):
         Returns:
             bool: True if lock released successfully, False otherwise
         """
-        # Lua script for atomic lock release
-        release_script = """
-        if redis.call("GET", KEYS[1]) == ARGV[1] then
-            return redis.call("DEL", KEYS[1])
-        else
-            return 0
-        end
-        """
-        
         try:
-            script = self._redis.client.register_script(release_script)
-            result = await script(keys=[lock_key], args=[lock_value])
+            if self._release_script is None:
+                self._release_script = self._redis.client.register_script(RELEASE_LOCK_SCRIPT)
+            result = await self._release_script(keys=[lock_key], args=[lock_value])
             return result == 1
         except Exception:
             return False
@@ -83,9 +87,26 @@ class RedisStreamQueue(MessageQueue):
             str: Message ID
         """
         logger.debug(f"Putting message into stream ({self._stream_name}): {message}")
-        message_id = await self._redis.client.xadd(self._stream_name, {"data": message})
+        message_id = await self._redis.client.xadd(self._stream_name, {"data": message}, maxlen=self._maxlen, approximate=True)
         return message_id
     
+    async def put_many(self, messages: List[Any]) -> List[str]:
+        """Add several messages to the stream with pipelined XADDs
+        
+        Args:
+            messages: Messages to be sent, in order
+            
+        Returns:
+            List[str]: Message IDs, in the same order as the messages
+        """
+        if not messages:
+            return []
+        logger.debug(f"Putting {len(messages)} messages into stream ({self._stream_name})")
+        async with self._redis.client.pipeline(transaction=False) as pipe:
+            for message in messages:
+                pipe.xadd(self._stream_name, {"data": message}, maxlen=self._maxlen, approximate=True)
+            return await pipe.execute()
+    
     async def get(self, start_id: str = "0", block_ms: Optional[int] = None) -> Tuple[str, Any]:
         """Get a message from the stream
         
@@ -124,6 +145,39 @@ class RedisStreamQueue(MessageQueue):
         except (KeyError, json.JSONDecodeError):
             return None, None
     
+    async def get_batch(self, start_id: Optional[str] = None, count: int = 100, block_ms: Optional[int] = None) -> List[Tuple[str, Any]]:
+        """Get up to count messages from the stream in one read
+        
+        Args:
+            start_id: Message ID to start reading from, defaults to "0" meaning from the earliest message
+            count: Maximum number of messages to return
+            block_ms: Block time in milliseconds, defaults to None meaning no blocking
+            
+        Returns:
+            List[Tuple[str, Any]]: (Message ID, Message content) pairs, empty if no message
+        """
+        logger.debug(f"Getting up to {count} messages from stream ({self._stream_name}): {start_id}")
+        messages = await self._redis.client.xread(
+            {self._stream_name: start_id or "0"},
+            count=count,
+            block=block_ms
+        )
+        if not messages:
+            return []
+        return [(message_id, message_data.get("data")) for message_id, message_data in messages[0][1]]
+    
+    async def listen(self, start_id: Optional[str] = None) -> AsyncGenerator[Tuple[str, Any], None]:
+        """Follow the stream through the process-wide dispatcher
+        
+        Args:
+            start_id: Message ID to start after, defaults to "0" meaning from the earliest message
+            
+        Yields:
+            Tuple[str, Any]: (Message ID, Message content)
+        """
+        async for message_id, message in get_stream_dispatcher().subscribe(self._stream_name, start_id):
+            yield message_id, message
+    
     async def get_range(self, start_id: str = "-", end_id: str = "+", count: int = 100) -> AsyncGenerator[Tuple[str, Any], None]:
         """Get messages within a specified range
         
@@ -187,9 +241,22 @@ class RedisStreamQueue(MessageQueue):
         except Exception:
             return False
 
-    async def pop(self) -> Tuple[str, Any]:
+    async def ack(self, message_id: str) -> bool:
+        """Acknowledge a popped message
+        
+        Popped messages are already removed from the stream, so there is nothing to do.
+        
+        Returns:
+            bool: Always True
+        """
+        return True
+
+    async def pop(self, block_ms: Optional[int] = None) -> Tuple[str, Any]:
         """Get and remove the first message from the stream using distributed lock
         
+        Args:
+            block_ms: Ignored, the lock acquisition already waits up to its timeout
+            
         Returns:
             Tuple[str, Any]: (Message ID, Message content), returns (None, None) if stream is empty
         """
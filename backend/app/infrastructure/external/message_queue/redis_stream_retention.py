@@ -0,0 +1,179 @@
+import time
+import asyncio
+import logging
+from datetime import datetime, UTC
+from functools import lru_cache
+from typing import Optional, Union
+from pydantic import BaseModel
+from app.infrastructure.config import get_settings
+from app.infrastructure.storage.redis import get_redis
+from app.infrastructure.models.documents import StreamArchiveDocument
+
+logger = logging.getLogger(__name__)
+
+TASK_INPUT_STREAM = "task:input:{}"
+TASK_OUTPUT_STREAM = "task:output:{}"
+FINISHED_TASKS_KEY = "task:finished"  # Sorted set of finished task IDs scored by finish time
+RETENTION_STATS_KEY = "task:retention:stats"  # Hash of the counters shared by every process sweeping
+
+
+class StreamRetentionStats(BaseModel):
+    """Counters describing what the sweepers of all processes have reclaimed so far"""
+    streams_archived: int = 0
+    entries_archived: int = 0
+    bytes_reclaimed: int = 0
+    pending_streams: int = 0
+    last_sweep_at: Optional[datetime] = None
+
+
+class RedisStreamRetention:
+    """Retention for task streams
+
+    Finished tasks get a TTL on their streams as a safety net. A background
+    sweeper archives finished output streams to MongoDB once their grace period
+    is over and deletes the streams from Redis.
+    """
+
+    def __init__(self):
+        self._redis = get_redis()
+        self._settings = get_settings()
+        self._sweeper: Optional[asyncio.Task] = None
+
+    async def on_task_done(self, task_id: str) -> None:
+        """Apply the TTL to the task's streams and queue them for archival"""
+        ttl = self._settings.redis_stream_ttl_seconds
+        try:
+            async with self._redis.client.pipeline(transaction=False) as pipe:
+                pipe.expire(TASK_INPUT_STREAM.format(task_id), ttl)
+                pipe.expire(TASK_OUTPUT_STREAM.format(task_id), ttl)
+                pipe.zadd(FINISHED_TASKS_KEY, {task_id: time.time()})
+                await pipe.execute()
+            logger.debug(f"Task {task_id} streams expire in {ttl}s")
+        except Exception as e:
+            logger.error(f"Failed to apply retention to task {task_id} streams: {str(e)}")
+
+    async def sweep(self) -> int:
+        """Archive and delete the streams of tasks past their grace period
+
+        Returns:
+            int: Number of output streams archived
+        """
+        cutoff = time.time() - self._settings.redis_stream_archive_after_seconds
+        task_ids = await self._redis.client.zrangebyscore(
+            FINISHED_TASKS_KEY, "-inf", cutoff, start=0, num=self._settings.redis_stream_sweep_batch
+        )
+        archived = 0
+        for task_id in task_ids:
+            try:
+                await self._archive_task(task_id)
+                archived += 1
+            except Exception as e:
+                logger.error(f"Failed to archive streams of task {task_id}: {str(e)}")
+        await self._redis.client.hset(RETENTION_STATS_KEY, "last_sweep_at", datetime.now(UTC).timestamp())
+        if archived:
+            logger.info(f"Archived {archived} task output streams")
+        return archived
+
+    async def _archive_task(self, task_id: str) -> None:
+        input_stream = TASK_INPUT_STREAM.format(task_id)
+        output_stream = TASK_OUTPUT_STREAM.format(task_id)
+        bytes_used = 0
+        for stream_name in (input_stream, output_stream):
+            bytes_used += await self._redis.client.memory_usage(stream_name) or 0
+
+        chunk_size = self._settings.redis_stream_archive_chunk
+        chunk = 0
+        entries_archived = 0
+        start_id = "-"
+        while True:
+            messages = await self._redis.client.xrange(output_stream, start_id, "+", count=chunk_size)
+            if not messages:
+                break
+            entries = [{"id": message_id, "data": self._to_archived(message_data.get("data"))} for message_id, message_data in messages]
+            # Upserted, so a sweep retrying a task that was partly archived, or racing another replica, rewrites the same chunks
+            fields = {"stream_name": output_stream, "entries": entries, "archived_at": datetime.now(UTC)}
+            await StreamArchiveDocument.find_one(
+                StreamArchiveDocument.task_id == task_id,
+                StreamArchiveDocument.chunk == chunk
+            ).upsert(
+                {"$set": fields},
+                on_insert=StreamArchiveDocument(task_id=task_id, chunk=chunk, **fields)
+            )
+            entries_archived += len(entries)
+            chunk += 1
+            start_id = f"({messages[-1][0]}"
+        # Chunks left by an earlier attempt with another chunk size
+        await StreamArchiveDocument.find(
+            StreamArchiveDocument.task_id == task_id,
+            StreamArchiveDocument.chunk >= chunk
+        ).delete()
+
+        async with self._redis.client.pipeline(transaction=False) as pipe:
+            pipe.delete(input_stream, output_stream)
+            pipe.zrem(FINISHED_TASKS_KEY, task_id)
+            # Counted with the deletion, so a task archived again after a failure is counted once
+            pipe.hincrby(RETENTION_STATS_KEY, "streams_archived", 1)
+            pipe.hincrby(RETENTION_STATS_KEY, "entries_archived", entries_archived)
+            pipe.hincrby(RETENTION_STATS_KEY, "bytes_reclaimed", bytes_used)
+            await pipe.execute()
+
+        logger.debug(f"Archived task {task_id} output stream in {chunk} chunks, reclaimed {bytes_used} bytes")
+
+    @staticmethod
+    def _to_archived(data: Optional[str]) -> Optional[Union[str, bytes]]:
+        """Keep text payloads as is and store binary ones as bytes"""
+        if data is None:
+            return None
+        try:
+            data.encode("utf-8")
+            return data
+        except UnicodeEncodeError:
+            return data.encode("utf-8", "surrogateescape")
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Stream retention sweep failed: {str(e)}")
+            await asyncio.sleep(self._settings.redis_stream_sweep_interval_seconds)
+
+    def start(self) -> None:
+        """Start the background sweeper"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+            logger.info("Stream retention sweeper started")
+
+    async def shutdown(self) -> None:
+        """Stop the background sweeper"""
+        if self._sweeper is not None and not self._sweeper.done():
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+        self._sweeper = None
+        get_stream_retention.cache_clear()
+
+    async def get_stats(self) -> StreamRetentionStats:
+        """Get the reclaim statistics of all processes, kept in Redis"""
+        async with self._redis.client.pipeline(transaction=False) as pipe:
+            pipe.hgetall(RETENTION_STATS_KEY)
+            pipe.zcard(FINISHED_TASKS_KEY)
+            counters, pending_streams = await pipe.execute()
+        last_sweep_at = counters.get("last_sweep_at")
+        return StreamRetentionStats(
+            streams_archived=int(counters.get("streams_archived", 0)),
+            entries_archived=int(counters.get("entries_archived", 0)),
+            bytes_reclaimed=int(counters.get("bytes_reclaimed", 0)),
+            pending_streams=pending_streams,
+            last_sweep_at=datetime.fromtimestamp(float(last_sweep_at), UTC) if last_sweep_at else None
+        )
+
+
+@lru_cache
+def get_stream_retention() -> RedisStreamRetention:
+    """Get the stream retention instance."""
+    return RedisStreamRetention()
@@ -5,6 +5,14 @@ from typing import Optional, Dict
 
 from app.domain.external.task import Task, TaskRunner
 from app.infrastructure.external.message_queue.redis_stream_queue import RedisStreamQueue, MessageQueue
+from app.infrastructure.external.message_queue.redis_stream_group_queue import RedisStreamGroupQueue
+from app.infrastructure.external.message_queue.redis_stream_retention import (
+    TASK_INPUT_STREAM,
+    TASK_OUTPUT_STREAM,
+    get_stream_retention,
+)
+from app.infrastructure.external.task.redis_task_registry import get_task_registry
+from app.infrastructure.config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -14,21 +22,22 @@ class RedisStreamTask(Task):
     
     _task_registry: Dict[str, 'RedisStreamTask'] = {}
     
-    def __init__(self, runner: TaskRunner):
+    def __init__(self, runner: TaskRunner, task_id: Optional[str] = None):
         """Initialize Redis Stream task with a task runner.
         
         Args:
             runner: The TaskRunner instance that will execute this task
+            task_id: ID of a queued task claimed by a worker, a new ID is generated if not provided
         """
         self._runner = runner
-        self._id = str(uuid.uuid4())
+        self._id = task_id or str(uuid.uuid4())
         self._execution_task: Optional[asyncio.Task] = None
         
         # Create input/output streams based on task ID
-        input_stream_name = f"task:input:{self._id}"
-        output_stream_name = f"task:output:{self._id}"
-        self._input_stream = RedisStreamQueue(input_stream_name)
-        self._output_stream = RedisStreamQueue(output_stream_name)
+        input_stream_name = TASK_INPUT_STREAM.format(self._id)
+        output_stream_name = TASK_OUTPUT_STREAM.format(self._id)
+        self._input_stream = RedisStreamGroupQueue(input_stream_name)
+        self._output_stream = RedisStreamQueue(output_stream_name, maxlen=get_settings().redis_stream_maxlen)
         
         # Register task instance
         RedisStreamTask._task_registry[self._id] = self
@@ -52,9 +61,15 @@ class RedisStreamTask(Task):
     async def run(self) -> None:
         """Run the task using the provided TaskRunner."""
         if self.done:
+            await get_task_registry().register(self._id)
             self._execution_task = asyncio.create_task(self._execute_task())
             logger.info(f"Task {self._id} execution started")
     
+    async def wait(self) -> None:
+        """Wait until the task execution is done."""
+        if self._execution_task is not None:
+            await asyncio.wait([self._execution_task])
+
     def cancel(self) -> bool:
         """Cancel the task.
 
@@ -85,6 +100,8 @@ class RedisStreamTask(Task):
         self._task_done = True
         if self._runner:
             asyncio.create_task(self._runner.on_done(self))
+        asyncio.create_task(get_task_registry().finish(self._id))
+        asyncio.create_task(get_stream_retention().on_task_done(self._id))
         self._cleanup_registry()
     
     def _cleanup_registry(self) -> None:
@@ -105,13 +122,36 @@ class RedisStreamTask(Task):
             self._on_task_done()
     
     @classmethod
-    def get(cls, task_id: str) -> Optional['RedisStreamTask']:
+    async def get(cls, task_id: str) -> Optional[Task]:
         """Get a task by its ID.
 
+        Tasks owned by another replica are returned as a RemoteRedisStreamTask
+        as long as the owner is alive.
+
         Returns:
-            Optional[RedisStreamTask]: Task instance if found, None otherwise
+            Optional[Task]: Task instance if found, None otherwise
         """
-        return cls._task_registry.get(task_id)
+        task = cls._task_registry.get(task_id)
+        if task:
+            return task
+        ownership = await get_task_registry().lookup(task_id)
+        if not ownership or not ownership.active:
+            return None
+        return RemoteRedisStreamTask(task_id, ownership.owner)
+
+    @classmethod
+    async def on_control(cls, action: str, task_id: str) -> None:
+        """Handle a control request routed to this replica by a RemoteRedisStreamTask"""
+        task = cls._task_registry.get(task_id)
+        if not task:
+            logger.warning(f"Received {action} for unknown Task {task_id}")
+            return
+        if action == "run":
+            await task.run()
+        elif action == "cancel":
+            task.cancel()
+        else:
+            logger.warning(f"Received unknown control action {action} for Task {task_id}")
     
     @classmethod
     def create(cls, runner: TaskRunner) -> "RedisStreamTask":
@@ -125,6 +165,18 @@ class RedisStreamTask(Task):
         """
         return cls(runner)
 
+    @classmethod
+    def create_queued(cls, session_id: str) -> Task:
+        """Create a task that a worker process will claim and run.
+
+        Args:
+            session_id: Session the worker builds the task runner for
+
+        Returns:
+            Task: Handle on the task, the work item is queued on first run
+        """
+        return RemoteRedisStreamTask(str(uuid.uuid4()), session_id=session_id)
+
     @classmethod
     async def destroy(cls) -> None:
         """Destroy all task instances."""
@@ -137,4 +189,75 @@ class RedisStreamTask(Task):
     
     def __repr__(self) -> str:
         """String representation of the task."""
-        return f"RedisStreamTask(id={self._id}, done={self.done})"
\ No newline at end of file
+        return f"RedisStreamTask(id={self._id}, done={self.done})"
+
+
+class RemoteRedisStreamTask(Task):
+    """Handle on a task running on another replica.
+
+    Streams are shared through Redis, so they are used directly. Run and cancel
+    requests are routed to the owning replica.
+    """
+
+    def __init__(self, task_id: str, owner: Optional[str] = None, session_id: Optional[str] = None):
+        self._id = task_id
+        self._owner = owner
+        self._session_id = session_id
+        self._done = False
+        self._input_stream = RedisStreamGroupQueue(TASK_INPUT_STREAM.format(task_id))
+        self._output_stream = RedisStreamQueue(TASK_OUTPUT_STREAM.format(task_id), maxlen=get_settings().redis_stream_maxlen)
+
+    @property
+    def id(self) -> str:
+        """Task ID."""
+        return self._id
+
+    @property
+    def done(self) -> bool:
+        """Whether the task was seen done, the owner reports completion through the output stream."""
+        return self._done
+
+    @property
+    def input_stream(self) -> MessageQueue:
+        """Input stream."""
+        return self._input_stream
+
+    @property
+    def output_stream(self) -> MessageQueue:
+        """Output stream."""
+        return self._output_stream
+
+    async def run(self) -> None:
+        """Queue the task for a worker, or ask the owner to pick up newly queued input."""
+        registry = get_task_registry()
+        if not self._owner:
+            ownership = await registry.lookup(self._id)
+            if ownership is None and self._session_id:
+                await registry.submit(self._id, self._session_id)
+                return
+            self._owner = ownership.owner if ownership else None
+            if not self._owner:
+                # Still queued, the worker reads the input once it claims the task
+                return
+        if not await registry.send_control(self._owner, "run", self._id):
+            logger.warning(f"Owner {self._owner} of Task {self._id} did not receive run request")
+
+    def cancel(self) -> bool:
+        """Ask the owner to cancel the task.
+
+        Returns:
+            bool: Always True, the request is delivered asynchronously
+        """
+        registry = get_task_registry()
+        if self._owner:
+            asyncio.create_task(registry.send_control(self._owner, "cancel", self._id))
+        else:
+            # Not claimed yet, marking it done makes workers skip it
+            asyncio.create_task(registry.finish(self._id))
+        self._done = True
+        logger.info(f"Task {self._id} cancellation routed to replica {self._owner}")
+        return True
+
+    def __repr__(self) -> str:
+        """String representation of the task."""
+        return f"RemoteRedisStreamTask(id={self._id}, owner={self._owner})"
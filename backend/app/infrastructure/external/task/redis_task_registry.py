@@ -0,0 +1,197 @@
+import json
+import uuid
+import socket
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional
+from app.infrastructure.config import get_settings
+from app.infrastructure.storage.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+TASK_REGISTRY_KEY = "task:registry:{}"  # Hash holding a task's owner and status
+REPLICA_HEARTBEAT_KEY = "task:replica:{}"  # Expiring key proving a replica is alive
+REPLICA_CONTROL_CHANNEL = "task:control:{}"  # Pub/sub channel for requests routed to a replica
+TASK_WORK_STREAM = "task:work"  # Tasks waiting to be claimed by a worker
+TASK_WORK_GROUP = "worker"
+
+ControlHandler = Callable[[str, str], Awaitable[None]]
+
+
+class TaskOwnership:
+    """Registry entry of a task"""
+
+    def __init__(self, task_id: str, owner: Optional[str], status: str, alive: bool):
+        self.task_id = task_id
+        self.owner = owner
+        self.status = status
+        self.alive = alive
+
+    @property
+    def queued(self) -> bool:
+        """Whether the task is waiting for a worker"""
+        return self.status == "queued"
+
+    @property
+    def running(self) -> bool:
+        """Whether the task is running on a live replica"""
+        return self.alive and self.status == "running"
+
+    @property
+    def active(self) -> bool:
+        """Whether the task is queued or running"""
+        return self.queued or self.running
+
+
+class RedisTaskRegistry:
+    """Cluster-wide registry of running tasks
+
+    Each backend replica registers the tasks it runs under its replica ID and keeps
+    a heartbeat key alive. Other replicas use the registry to find a task's owner,
+    check that the owner is still alive and route control requests (run, cancel)
+    to it over pub/sub. Tasks meant for the worker pool are queued here until a
+    worker claims them.
+    """
+
+    def __init__(self):
+        self._redis = get_redis()
+        self._settings = get_settings()
+        self._replica_id = f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._control_handler: Optional[ControlHandler] = None
+
+    @property
+    def replica_id(self) -> str:
+        """ID of this replica"""
+        return self._replica_id
+
+    async def register(self, task_id: str) -> None:
+        """Record this replica as the owner of a running task"""
+        key = TASK_REGISTRY_KEY.format(task_id)
+        async with self._redis.client.pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping={"owner": self._replica_id, "status": "running"})
+            pipe.persist(key)
+            await pipe.execute()
+        logger.debug(f"Task {task_id} registered to replica {self._replica_id}")
+
+    async def submit(self, task_id: str, session_id: str) -> None:
+        """Queue a task for the worker pool"""
+        async with self._redis.client.pipeline(transaction=False) as pipe:
+            pipe.hset(TASK_REGISTRY_KEY.format(task_id), mapping={"owner": "", "status": "queued"})
+            pipe.xadd(TASK_WORK_STREAM, {"data": json.dumps({"task_id": task_id, "session_id": session_id})})
+            await pipe.execute()
+        logger.info(f"Task {task_id} of Session {session_id} queued for workers")
+
+    async def finish(self, task_id: str) -> None:
+        """Mark a task as done, keeping the entry around as long as its streams"""
+        key = TASK_REGISTRY_KEY.format(task_id)
+        try:
+            async with self._redis.client.pipeline(transaction=False) as pipe:
+                pipe.hset(key, "status", "done")
+                pipe.expire(key, self._settings.redis_stream_ttl_seconds)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to mark task {task_id} as done in registry: {str(e)}")
+
+    async def lookup(self, task_id: str) -> Optional[TaskOwnership]:
+        """Find the owner of a task and whether it is still alive"""
+        entry = await self._redis.client.hgetall(TASK_REGISTRY_KEY.format(task_id))
+        if not entry:
+            return None
+        owner = entry.get("owner") or None
+        if owner is None or owner == self._replica_id:
+            alive = True
+        else:
+            alive = bool(await self._redis.client.exists(REPLICA_HEARTBEAT_KEY.format(owner)))
+        return TaskOwnership(task_id, owner, entry.get("status", "done"), alive)
+
+    async def send_control(self, owner: str, action: str, task_id: str) -> bool:
+        """Route a control request to the replica owning a task
+
+        Returns:
+            bool: True if at least one replica received the request
+        """
+        receivers = await self._redis.client.publish(
+            REPLICA_CONTROL_CHANNEL.format(owner),
+            json.dumps({"action": action, "task_id": task_id})
+        )
+        logger.debug(f"Sent {action} for task {task_id} to replica {owner}, {receivers} receivers")
+        return receivers > 0
+
+    async def _beat(self) -> None:
+        await self._redis.client.set(
+            REPLICA_HEARTBEAT_KEY.format(self._replica_id),
+            "1",
+            ex=self._settings.task_heartbeat_ttl_seconds
+        )
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            try:
+                await self._beat()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Replica {self._replica_id} heartbeat failed: {str(e)}")
+            await asyncio.sleep(self._settings.task_heartbeat_interval_seconds)
+
+    async def _listen_loop(self) -> None:
+        channel = REPLICA_CONTROL_CHANNEL.format(self._replica_id)
+        while True:
+            pubsub = self._redis.client.pubsub()
+            try:
+                await pubsub.subscribe(channel)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    await self._dispatch_control(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Replica {self._replica_id} control listener failed: {str(e)}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def _dispatch_control(self, data: Any) -> None:
+        try:
+            request: Dict[str, str] = json.loads(data)
+            if self._control_handler:
+                await self._control_handler(request["action"], request["task_id"])
+        except Exception as e:
+            logger.error(f"Failed to handle control request {data}: {str(e)}")
+
+    async def start(self, control_handler: ControlHandler) -> None:
+        """Start the heartbeat and listen for control requests routed to this replica"""
+        self._control_handler = control_handler
+        await self._beat()
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen_loop())
+        logger.info(f"Task registry started for replica {self._replica_id}")
+
+    async def shutdown(self) -> None:
+        """Stop the heartbeat and the control listener"""
+        for background in (self._heartbeat, self._listener):
+            if background is not None and not background.done():
+                background.cancel()
+                try:
+                    await background
+                except asyncio.CancelledError:
+                    pass
+        self._heartbeat = None
+        self._listener = None
+        try:
+            await self._redis.client.delete(REPLICA_HEARTBEAT_KEY.format(self._replica_id))
+        except Exception as e:
+            logger.warning(f"Failed to clear heartbeat of replica {self._replica_id}: {str(e)}")
+        get_task_registry.cache_clear()
+
+
+@lru_cache
+def get_task_registry() -> RedisTaskRegistry:
+    """Get the task registry instance."""
+    return RedisTaskRegistry()
@@ -0,0 +1,97 @@
+import json
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional, Set
+from app.domain.external.task import TaskRunner
+from app.infrastructure.config import get_settings
+from app.infrastructure.external.message_queue.redis_stream_group_queue import RedisStreamGroupQueue
+from app.infrastructure.external.task.redis_task import RedisStreamTask
+from app.infrastructure.external.task.redis_task_registry import (
+    TASK_WORK_GROUP,
+    TASK_WORK_STREAM,
+    get_task_registry,
+)
+
+logger = logging.getLogger(__name__)
+
+TaskRunnerFactory = Callable[[str], Awaitable[TaskRunner]]
+
+
+class RedisTaskWorker:
+    """Worker claiming queued tasks from the Redis work stream and running them
+
+    Up to `concurrency` tasks run at once. A work item is acknowledged once the
+    claimed task is registered to this worker, from then on the task registry
+    tracks its liveness.
+    """
+
+    def __init__(self, runner_factory: TaskRunnerFactory, concurrency: Optional[int] = None):
+        settings = get_settings()
+        self._runner_factory = runner_factory
+        self._concurrency = concurrency or settings.worker_concurrency
+        self._slots = asyncio.Semaphore(self._concurrency)
+        self._queue = RedisStreamGroupQueue(
+            TASK_WORK_STREAM,
+            group_name=TASK_WORK_GROUP,
+            consumer_name=get_task_registry().replica_id,
+        )
+        self._block_ms = settings.worker_poll_block_ms
+        self._running_tasks: Set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+
+    async def run(self) -> None:
+        """Claim and run tasks until stop() is called"""
+        logger.info(f"Worker {get_task_registry().replica_id} started with concurrency {self._concurrency}")
+        while not self._stopping.is_set():
+            await self._slots.acquire()
+            try:
+                message_id, message = await self._queue.pop(block_ms=self._block_ms)
+            except Exception as e:
+                self._slots.release()
+                logger.error(f"Failed to claim work item: {str(e)}")
+                await asyncio.sleep(1)
+                continue
+            if message_id is None:
+                self._slots.release()
+                continue
+            execution = asyncio.create_task(self._run_item(message_id, message))
+            self._running_tasks.add(execution)
+            execution.add_done_callback(self._running_tasks.discard)
+        logger.info(f"Worker {get_task_registry().replica_id} stopped claiming tasks")
+
+    async def _run_item(self, message_id: str, message: str) -> None:
+        try:
+            item = json.loads(message)
+            task_id, session_id = item["task_id"], item["session_id"]
+            ownership = await get_task_registry().lookup(task_id)
+            if ownership and not ownership.queued:
+                logger.info(f"Skipping Task {task_id}, it is no longer queued ({ownership.status})")
+                await self._queue.ack(message_id)
+                return
+
+            try:
+                runner = await self._runner_factory(session_id)
+            except Exception:
+                logger.exception(f"Failed to create runner for Task {task_id} of Session {session_id}")
+                await get_task_registry().finish(task_id)
+                await self._queue.ack(message_id)
+                return
+
+            task = RedisStreamTask(runner, task_id=task_id)
+            await task.run()
+            await self._queue.ack(message_id)
+            logger.info(f"Worker claimed Task {task_id} of Session {session_id}")
+            await task.wait()
+        except Exception:
+            logger.exception(f"Worker failed to run work item {message_id}")
+        finally:
+            self._slots.release()
+
+    def stop(self) -> None:
+        """Stop claiming new tasks"""
+        self._stopping.set()
+
+    async def drain(self) -> None:
+        """Wait for the tasks currently running on this worker"""
+        if self._running_tasks:
+            await asyncio.wait(self._running_tasks)
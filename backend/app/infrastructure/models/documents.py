@@ -1,9 +1,14 @@
-from typing import Dict, Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime, timezone
 from beanie import Document
+from pydantic import Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from app.domain.models.memory import Memory
 from app.domain.events.agent_events import AgentEvent
 from app.domain.models.session import SessionStatus
+from app.domain.models.plan import Plan
+
+LEGACY_EVENTS_INDEX = "legacy_events"
 
 class AgentDocument(Document):
     """MongoDB document for Agent"""
@@ -18,7 +23,7 @@ class AgentDocument(Document):
     class Settings:
         name = "agents"
         indexes = [
-            "agent_id",
+            IndexModel([("agent_id", ASCENDING)], unique=True),
         ]
 
 
@@ -34,13 +39,43 @@ class SessionDocument(Document):
     latest_message_at: Optional[datetime] = None
     created_at: datetime = datetime.now(timezone.utc)
     updated_at: datetime = datetime.now(timezone.utc)
-    events: List[AgentEvent]
+    event_seq: int = 0  # Sequence number of the last event appended to the session
+    version: int = 0  # Incremented by every change to the session fields, not by appended events
     status: SessionStatus
+    # Cold storage of the events and agent memories, see GridFSSessionArchive
+    archive_state: Optional[str] = None  # "archiving", "archived" or "restoring", None while the history is stored here
+    archive_claim: Optional[str] = None  # Process archiving or restoring the session
+    archive_claimed_at: Optional[datetime] = None
+    archive_file_id: Optional[str] = None  # GridFS blob holding the archived history
+    archived_at: Optional[datetime] = None
 
     class Settings:
         name = "sessions"
         indexes = [
-            "session_id",
+            IndexModel([("session_id", ASCENDING)], unique=True),
+            # Session list pages, most recently active first
+            IndexModel([("latest_message_at", DESCENDING), ("session_id", DESCENDING)]),
+            # Archival sweeps, idle completed sessions first
+            IndexModel([("archive_state", ASCENDING), ("status", ASCENDING), ("updated_at", ASCENDING)]),
+            # Sessions still holding embedded events, empty once they are migrated
+            IndexModel(
+                [("created_at", ASCENDING)],
+                name=LEGACY_EVENTS_INDEX,
+                partialFilterExpression={"events": {"$exists": True}}
+            ),
+        ]
+
+class EventDocument(Document):
+    """MongoDB model for an event of a session, append-only"""
+    session_id: str
+    seq: int
+    event: AgentEvent
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "events"
+        indexes = [
+            IndexModel([("session_id", ASCENDING), ("seq", ASCENDING)], unique=True),
         ]
 
 class AttachmentDocument(Document):
@@ -58,6 +93,93 @@ class AttachmentDocument(Document):
     class Settings:
         name = "attachments"
         indexes = [
-            "attachment_id",
-            "task_id"
-        ]
\ No newline at end of file
+            IndexModel([("attachment_id", ASCENDING)], unique=True),
+            IndexModel([("session_id", ASCENDING)]),
+        ]
+
+class StreamArchiveDocument(Document):
+    """Archived chunk of a finished task's output stream"""
+    task_id: str
+    stream_name: str
+    chunk: int = 0
+    entries: List[Dict[str, Any]] = []
+    archived_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "stream_archives"
+        indexes = [
+            IndexModel([("task_id", ASCENDING), ("chunk", ASCENDING)], unique=True),
+        ]
+
+class FlowCheckpointDocument(Document):
+    """Checkpoint of a session's flow state machine"""
+    session_id: str
+    agent_id: str
+    status: str
+    message: str
+    plan: Optional[Plan] = None
+    step_id: Optional[str] = None
+    recovery_count: int = 0
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "flow_checkpoints"
+        indexes = [
+            IndexModel([("session_id", ASCENDING)], unique=True),
+            # Recovery sweeps, oldest first
+            IndexModel([("updated_at", ASCENDING)]),
+        ]
+
+
+class ToolPayloadDocument(Document):
+    """Full result of a tool call, kept out of the agent's memory for its size"""
+    agent_id: str
+    tool_call_id: str
+    content: str
+    size: int
+    sha256: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "tool_payloads"
+        indexes = [
+            IndexModel([("agent_id", ASCENDING), ("tool_call_id", ASCENDING)], unique=True),
+        ]
+
+
+class LLMCallDocument(Document):
+    """Tokens and time spent on one LLM call"""
+    id: Optional[str] = None  # LLMCall.id, so re-inserting a call is a duplicate key rather than a second call
+    session_id: Optional[str] = None
+    agent_id: Optional[str] = None
+    caller: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    duration_ms: float = 0.0
+    retries: int = 0
+    success: bool = True
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "llm_calls"
+        indexes = [
+            IndexModel([("session_id", ASCENDING), ("created_at", ASCENDING)]),
+            IndexModel([("agent_id", ASCENDING), ("created_at", ASCENDING)]),
+            # Deployment wide totals over a period
+            IndexModel([("created_at", ASCENDING)]),
+        ]
+
+
+# Documents registered with Beanie, in the API and worker processes alike
+DOCUMENT_MODELS = [
+    AgentDocument,
+    SessionDocument,
+    EventDocument,
+    AttachmentDocument,
+    StreamArchiveDocument,
+    FlowCheckpointDocument,
+    ToolPayloadDocument,
+    LLMCallDocument,
+]
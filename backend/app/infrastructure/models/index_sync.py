@@ -0,0 +1,93 @@
+import logging
+from typing import Any, Dict, List, Sequence, Type
+from beanie import Document
+from pymongo import IndexModel
+
+logger = logging.getLogger(__name__)
+
+# Index options that change what an index does, others are left to the server
+_COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+
+def _declared_indexes(document_model: Type[Document]) -> List[IndexModel]:
+    return [index_field.index for index_field in document_model.get_settings().indexes or []]
+
+
+def _matches(index: IndexModel, info: Dict[str, Any]) -> bool:
+    """Whether an existing index, as described by index_information(), is the declared one"""
+    declared_keys = [(field, direction) for field, direction in index.document["key"].items()]
+    existing_keys = [
+        (field, int(direction) if isinstance(direction, float) else direction)
+        for field, direction in info["key"]
+    ]
+    if declared_keys != existing_keys:
+        return False
+    return all(
+        (index.document.get(option) or None) == (info.get(option) or None)
+        for option in _COMPARED_OPTIONS
+    )
+
+
+def _existing_index(name: str, info: Dict[str, Any]) -> IndexModel:
+    """Declaration of an existing index, as described by index_information(), to build it again"""
+    options = {option: value for option, value in info.items() if option not in ("v", "key", "ns")}
+    return IndexModel(info["key"], name=name, **options)
+
+
+async def sync_indexes(document_models: Sequence[Type[Document]]) -> None:
+    """Make the indexes of each collection match the ones its document declares
+
+    Missing indexes are created and ones whose options changed are rebuilt.
+    A rebuild that fails puts the previous index back, so a lookup key is
+    never left unindexed. Indexes no longer declared are dropped last, and
+    only once every declared index of the collection is in place. Failures
+    are logged and do not stop startup, queries still work without their
+    index, only slower.
+
+    Args:
+        document_models: Initialized Beanie documents
+    """
+    for document_model in document_models:
+        collection = document_model.get_pymongo_collection()
+        declared = {index.document["name"]: index for index in _declared_indexes(document_model)}
+        try:
+            existing = await collection.index_information()
+        except Exception as e:
+            logger.error(f"Failed to read the indexes of {collection.name}: {str(e)}")
+            continue
+
+        complete = True
+        for name, index in declared.items():
+            if name in existing and _matches(index, existing[name]):
+                continue
+            if name in existing:
+                # Same name, so the old index has to go before the new one is built
+                try:
+                    await collection.drop_index(name)
+                except Exception as e:
+                    logger.error(f"Failed to drop index {collection.name}.{name} to rebuild it: {str(e)}")
+                    complete = False
+                    continue
+            try:
+                await collection.create_indexes([index])
+                logger.info(f"{'Rebuilt' if name in existing else 'Created'} index {collection.name}.{name}")
+            except Exception as e:
+                complete = False
+                logger.error(f"Failed to create index {collection.name}.{name}: {str(e)}")
+                if name in existing:
+                    try:
+                        await collection.create_indexes([_existing_index(name, existing[name])])
+                        logger.warning(f"Kept the previous definition of index {collection.name}.{name}")
+                    except Exception as e:
+                        logger.error(f"Failed to restore index {collection.name}.{name}: {str(e)}")
+
+        obsolete = [name for name in existing if name != "_id_" and name not in declared]
+        if obsolete and not complete:
+            logger.warning(f"Kept indexes {', '.join(obsolete)} of {collection.name} until its declared indexes are built")
+            continue
+        for name in obsolete:
+            try:
+                await collection.drop_index(name)
+                logger.info(f"Dropped index {collection.name}.{name}")
+            except Exception as e:
+                logger.error(f"Failed to drop index {collection.name}.{name}: {str(e)}")
@@ -1,9 +1,12 @@
-from typing import Optional, List
+import hashlib
+from typing import Any, Dict, Optional, List
 from datetime import datetime, UTC
+from beanie import UpdateResponse
 from app.domain.models.agent import Agent
 from app.domain.models.memory import Memory
 from app.domain.repositories.agent_repository import AgentRepository
-from app.infrastructure.models.documents import AgentDocument
+from app.domain.external.memory_cache import MemoryCache
+from app.infrastructure.models.documents import AgentDocument, ToolPayloadDocument
 import logging
 
 
@@ -12,6 +15,9 @@ logger = logging.getLogger(__name__)
 class MongoAgentRepository(AgentRepository):
     """MongoDB implementation of AgentRepository"""
 
+    def __init__(self, memory_cache: Optional[MemoryCache] = None):
+        self._memory_cache = memory_cache  # Written through, so agents read their memories from Mongo once
+
     async def save(self, agent: Agent) -> None:
         """Save or update an agent"""
         mongo_agent = await AgentDocument.find_one(
@@ -30,6 +36,8 @@ class MongoAgentRepository(AgentRepository):
         mongo_agent.memories=agent.memories
         mongo_agent.updated_at=datetime.now(UTC)
         await mongo_agent.save()
+        if self._memory_cache:
+            self._memory_cache.invalidate(agent.id)
 
     async def find_by_id(self, agent_id: str) -> Optional[Agent]:
         """Find an agent by its ID"""
@@ -49,25 +57,128 @@ class MongoAgentRepository(AgentRepository):
         )
         if not result:
             raise ValueError(f"Agent {agent_id} not found")
+        if self._memory_cache:
+            self._memory_cache.invalidate(agent_id, name)
 
     async def get_memory(self, agent_id: str, name: str) -> Memory:
         """Get memory by name from agent, create if not exists"""
+        if self._memory_cache:
+            memory = self._memory_cache.get(agent_id, name)
+            if memory is not None:
+                return memory
         mongo_agent = await AgentDocument.find_one(
             AgentDocument.agent_id == agent_id
         )
         if not mongo_agent:
             raise ValueError(f"Agent {agent_id} not found")
-        return mongo_agent.memories.get(name, Memory(messages=[]))
+        memory = mongo_agent.memories.get(name, Memory(messages=[]))
+        if self._memory_cache:
+            # The document holds the memories of all sub-agents, keep them all
+            for memory_name, stored_memory in mongo_agent.memories.items():
+                self._memory_cache.put(agent_id, memory_name, stored_memory)
+            if name not in mongo_agent.memories:
+                self._memory_cache.put(agent_id, name, memory)
+        return memory
     
-    async def save_memory(self, agent_id: str, name: str, memory: Memory) -> None:
-        """Update the messages of a memory"""
+    async def save_memory(self, agent_id: str, name: str, memory: Memory) -> int:
+        """Replace the messages of a memory"""
+        mongo_agent = await AgentDocument.find_one(
+            AgentDocument.agent_id == agent_id
+        ).update(
+            {
+                "$set": {
+                    f"memories.{name}.messages": memory.messages,
+                    # The summary described the messages replaced
+                    f"memories.{name}.summary": None,
+                    f"memories.{name}.summarized": 0,
+                    "updated_at": datetime.now(UTC),
+                },
+                "$inc": {f"memories.{name}.version": 1},
+            },
+            response_type=UpdateResponse.NEW_DOCUMENT
+        )
+        if not mongo_agent:
+            raise ValueError(f"Agent {agent_id} not found")
+        stored_memory = mongo_agent.memories[name]
+        if self._memory_cache:
+            self._memory_cache.put(agent_id, name, stored_memory)
+        return stored_memory.version
+
+    async def append_memory(
+        self,
+        agent_id: str,
+        name: str,
+        messages: List[Dict[str, Any]],
+        expected_version: int
+    ) -> Optional[int]:
+        """Append messages to a memory without rewriting the stored ones"""
+        version_field = f"memories.{name}.version"
+        # Memories written before versioning have no version field
+        version_filter = {version_field: expected_version} if expected_version else \
+            {"$or": [{version_field: 0}, {version_field: {"$exists": False}}]}
+        result = await AgentDocument.find_one(
+            AgentDocument.agent_id == agent_id,
+            version_filter
+        ).update(
+            {
+                "$push": {f"memories.{name}.messages": {"$each": messages}},
+                "$inc": {version_field: 1},
+                "$set": {"updated_at": datetime.now(UTC)},
+            }
+        )
+        if result and result.modified_count == 1:
+            if self._memory_cache:
+                self._memory_cache.append(agent_id, name, messages, expected_version + 1)
+            return expected_version + 1
+        if self._memory_cache:
+            self._memory_cache.invalidate(agent_id, name)
+        if not await AgentDocument.find_one(AgentDocument.agent_id == agent_id):
+            raise ValueError(f"Agent {agent_id} not found")
+        return None
+
+    async def save_memory_summary(self, agent_id: str, name: str, summary: str, summarized: int) -> None:
+        """Record the rolling summary of the first `summarized` messages of a memory"""
+        # Messages are only appended, so the summary stays valid whatever the version
         result = await AgentDocument.find_one(
             AgentDocument.agent_id == agent_id
         ).update(
-            {"$set": {f"memories.{name}": memory, "updated_at": datetime.now(UTC)}}
+            {
+                "$set": {
+                    f"memories.{name}.summary": summary,
+                    f"memories.{name}.summarized": summarized,
+                    "updated_at": datetime.now(UTC),
+                },
+            }
         )
-        if not result:
+        if not result or not result.matched_count:
             raise ValueError(f"Agent {agent_id} not found")
+        if self._memory_cache:
+            self._memory_cache.set_summary(agent_id, name, summary, summarized)
+
+    async def save_tool_payload(self, agent_id: str, tool_call_id: str, content: str) -> None:
+        """Store the full result of a tool call kept out of memory"""
+        data = content.encode()
+        fields = {"content": content, "size": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+        await ToolPayloadDocument.find_one(
+            ToolPayloadDocument.agent_id == agent_id,
+            ToolPayloadDocument.tool_call_id == tool_call_id
+        ).upsert(
+            {"$set": fields},
+            on_insert=ToolPayloadDocument(agent_id=agent_id, tool_call_id=tool_call_id, **fields)
+        )
+
+    async def get_tool_payload(self, agent_id: str, tool_call_id: str) -> Optional[str]:
+        """Get the stored full result of a tool call"""
+        payload = await ToolPayloadDocument.find_one(
+            ToolPayloadDocument.agent_id == agent_id,
+            ToolPayloadDocument.tool_call_id == tool_call_id
+        )
+        return payload.content if payload else None
+
+    async def claim_memories(self, agent_id: str) -> None:
+        """Announce that this process now runs the agent"""
+        if self._memory_cache:
+            await self._memory_cache.claim(agent_id)
 
     def _to_domain_agent(self, mongo_agent: AgentDocument) -> Agent:
         """Convert MongoDB document to domain model"""
@@ -0,0 +1,77 @@
+from typing import Optional, List
+from datetime import datetime, UTC
+from app.domain.models.checkpoint import FlowCheckpoint
+from app.domain.repositories.checkpoint_repository import CheckpointRepository
+from app.infrastructure.models.documents import FlowCheckpointDocument
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+class MongoCheckpointRepository(CheckpointRepository):
+    """MongoDB implementation of CheckpointRepository"""
+
+    async def save(self, checkpoint: FlowCheckpoint) -> None:
+        """Save or replace the checkpoint of a session, keeping its recovery count"""
+        state = checkpoint.model_dump(exclude={"session_id", "recovery_count"})
+        state["updated_at"] = datetime.now(UTC)
+        await FlowCheckpointDocument.find_one(
+            FlowCheckpointDocument.session_id == checkpoint.session_id
+        ).upsert(
+            {"$set": state},
+            on_insert=self._to_mongo_checkpoint(checkpoint)
+        )
+
+    async def find_by_session_id(self, session_id: str) -> Optional[FlowCheckpoint]:
+        """Find the checkpoint of a session"""
+        mongo_checkpoint = await FlowCheckpointDocument.find_one(
+            FlowCheckpointDocument.session_id == session_id
+        )
+        return self._to_domain_checkpoint(mongo_checkpoint) if mongo_checkpoint else None
+
+    async def get_all(self) -> List[FlowCheckpoint]:
+        """Get the checkpoints of all flows in progress, least recently updated first"""
+        mongo_checkpoints = await FlowCheckpointDocument.find_all().sort("+updated_at").to_list()
+        return [self._to_domain_checkpoint(mongo_checkpoint) for mongo_checkpoint in mongo_checkpoints]
+
+    async def claim_recovery(self, session_id: str, recovery_count: int) -> bool:
+        """Claim the recovery of a session's flow"""
+        result = await FlowCheckpointDocument.find_one(
+            FlowCheckpointDocument.session_id == session_id,
+            FlowCheckpointDocument.recovery_count == recovery_count
+        ).update(
+            {"$inc": {"recovery_count": 1}, "$set": {"updated_at": datetime.now(UTC)}}
+        )
+        return bool(result and result.modified_count == 1)
+
+    async def delete(self, session_id: str) -> None:
+        """Delete the checkpoint of a session"""
+        await FlowCheckpointDocument.find(
+            FlowCheckpointDocument.session_id == session_id
+        ).delete()
+
+    def _to_domain_checkpoint(self, mongo_checkpoint: FlowCheckpointDocument) -> FlowCheckpoint:
+        """Convert MongoDB document to domain model"""
+        return FlowCheckpoint(
+            session_id=mongo_checkpoint.session_id,
+            agent_id=mongo_checkpoint.agent_id,
+            status=mongo_checkpoint.status,
+            message=mongo_checkpoint.message,
+            plan=mongo_checkpoint.plan,
+            step_id=mongo_checkpoint.step_id,
+            recovery_count=mongo_checkpoint.recovery_count,
+            updated_at=mongo_checkpoint.updated_at
+        )
+
+    def _to_mongo_checkpoint(self, checkpoint: FlowCheckpoint) -> FlowCheckpointDocument:
+        """Create a new MongoDB checkpoint from domain checkpoint"""
+        return FlowCheckpointDocument(
+            session_id=checkpoint.session_id,
+            agent_id=checkpoint.agent_id,
+            status=checkpoint.status,
+            message=checkpoint.message,
+            plan=checkpoint.plan,
+            step_id=checkpoint.step_id,
+            recovery_count=checkpoint.recovery_count,
+            updated_at=checkpoint.updated_at
+        )
@@ -0,0 +1,69 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.domain.models.llm_usage import LLMCall, LLMUsage, LLMUsageTotals
+from app.domain.repositories.llm_usage_repository import LLMUsageRepository
+from app.infrastructure.models.documents import LLMCallDocument
+from pymongo.errors import BulkWriteError
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class _CallerTotals(LLMUsageTotals):
+    """Totals of one caller as grouped by the aggregation"""
+    caller: str
+
+
+class MongoLLMUsageRepository(LLMUsageRepository):
+    """MongoDB implementation of LLMUsageRepository"""
+
+    async def add_calls(self, calls: List[LLMCall]) -> None:
+        """Record LLM calls, those already recorded are skipped"""
+        if not calls:
+            return
+        try:
+            await LLMCallDocument.insert_many([LLMCallDocument(**call.model_dump()) for call in calls], ordered=False)
+        except BulkWriteError as e:
+            # A retried batch whose earlier attempt was partly written
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])) \
+                    or e.details.get("writeConcernErrors"):
+                raise
+
+    async def get_usage(
+        self,
+        session_id: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        since: Optional[datetime] = None
+    ) -> LLMUsage:
+        """Sum the recorded LLM calls matching all the given filters"""
+        match: Dict[str, Any] = {}
+        if session_id is not None:
+            match["session_id"] = session_id
+        if agent_id is not None:
+            match["agent_id"] = agent_id
+        if since is not None:
+            match["created_at"] = {"$gte": since}
+        pipeline = [
+            {"$match": match},
+            {"$group": {
+                "_id": "$caller",
+                "calls": {"$sum": 1},
+                "failures": {"$sum": {"$cond": ["$success", 0, 1]}},
+                "prompt_tokens": {"$sum": "$prompt_tokens"},
+                "completion_tokens": {"$sum": "$completion_tokens"},
+                "cached_tokens": {"$sum": "$cached_tokens"},
+                "duration_ms": {"$sum": "$duration_ms"},
+                "retries": {"$sum": "$retries"},
+            }},
+            {"$project": {"_id": 0, "caller": "$_id", "calls": 1, "failures": 1, "prompt_tokens": 1,
+                          "completion_tokens": 1, "cached_tokens": 1, "duration_ms": 1, "retries": 1}},
+        ]
+        rows = await LLMCallDocument.aggregate(pipeline, projection_model=_CallerTotals).to_list()
+        usage = LLMUsage()
+        for row in rows:
+            totals = LLMUsageTotals(**row.model_dump(exclude={"caller"}))
+            usage.by_caller[row.caller] = totals
+            for field in LLMUsageTotals.model_fields:
+                setattr(usage.total, field, getattr(usage.total, field) + getattr(totals, field))
+        return usage
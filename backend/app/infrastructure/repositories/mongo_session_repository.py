@@ -1,120 +1,378 @@
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List, Tuple
+from collections import OrderedDict
 from datetime import datetime, UTC
-from app.domain.models.session import Session, SessionStatus
+from beanie import UpdateResponse
+from pydantic import BaseModel
+from pymongo import DESCENDING
+from pymongo.errors import BulkWriteError
+from app.domain.models.session import Session, SessionEventPage, SessionStatus, SessionSummary, SessionUpdate
 from app.domain.repositories.session_repository import SessionRepository
-from app.domain.events.agent_events import BaseEvent
-from app.infrastructure.models.documents import SessionDocument
+from app.domain.external.session_change_feed import SessionChangeFeed
+from app.domain.external.session_archive import SessionArchive
+from app.domain.events.agent_events import AgentEvent, BaseEvent
+from app.infrastructure.models.documents import SessionDocument, EventDocument, LEGACY_EVENTS_INDEX
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+class _SessionSummaryProjection(BaseModel):
+    """Fields of a session document needed by session lists"""
+    session_id: str
+    title: Optional[str] = None
+    status: SessionStatus
+    unread_message_count: int = 0
+    latest_message: Optional[str] = None
+    latest_message_at: Optional[datetime] = None
+
+
+class _SessionVersion(BaseModel):
+    """Version stamp of a session document"""
+    version: int = 0
+
+
+class _EmbeddedEvents(BaseModel):
+    """Events stored inside a session document before they had their own collection"""
+    session_id: str
+    events: List[AgentEvent]
+
+
+class _SequencedEvent(BaseModel):
+    """An event of the events collection with its position in the session"""
+    seq: int
+    event: AgentEvent
+
+
+class _SessionCache:
+    """Decoded sessions by ID with the document version they were read at, least recently used evicted first"""
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[int, Session]]" = OrderedDict()
+
+    def get(self, session_id: str) -> Optional[Tuple[int, Session]]:
+        entry = self._entries.get(session_id)
+        if entry is not None:
+            self._entries.move_to_end(session_id)
+        return entry
+
+    def put(self, session_id: str, version: int, session: Session) -> None:
+        if self._max_size <= 0:
+            return
+        self._entries[session_id] = (version, session)
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def evict(self, session_id: str) -> None:
+        self._entries.pop(session_id, None)
+
+
 class MongoSessionRepository(SessionRepository):
     """MongoDB implementation of SessionRepository"""
+
+    def __init__(
+        self,
+        change_feed: Optional[SessionChangeFeed] = None,
+        cache_size: int = 0,
+        archive: Optional[SessionArchive] = None
+    ):
+        self._change_feed = change_feed  # Told about every change to the fields shown in session lists
+        self._archive = archive  # Holds the history of archived sessions, restored when they are loaded
+        # Sessions already decoded, revalidated against the document version on every read
+        self._cache = _SessionCache(cache_size)
+
+    async def _notify_change(self, session_id: str) -> None:
+        self._cache.evict(session_id)
+        if self._change_feed:
+            await self._change_feed.publish(session_id)
     
     async def save(self, session: Session) -> None:
         """Save or update a session"""
-        mongo_session = await SessionDocument.find_one(
+        result = await SessionDocument.find_one(
             SessionDocument.session_id == session.id
+        ).update(
+            {
+                "$set": {
+                    "sandbox_id": session.sandbox_id,
+                    "agent_id": session.agent_id,
+                    "task_id": session.task_id,
+                    "title": session.title,
+                    "latest_message": session.latest_message,
+                    "latest_message_at": session.latest_message_at,
+                    "status": session.status,
+                    "unread_message_count": session.unread_message_count,
+                    "updated_at": datetime.now(UTC),
+                },
+                "$inc": {"version": 1},
+            }
         )
-        
-        if not mongo_session:
+        if not result or not result.matched_count:
             mongo_session = self._to_mongo_session(session)
             await mongo_session.save()
-            return
-        
-        # Use generic update method from base class
-        mongo_session.sandbox_id=session.sandbox_id
-        mongo_session.agent_id=session.agent_id
-        mongo_session.task_id=session.task_id
-        mongo_session.title=session.title
-        mongo_session.latest_message=session.latest_message
-        mongo_session.latest_message_at=session.latest_message_at
-        mongo_session.events=session.events
-        mongo_session.status=session.status
-        mongo_session.unread_message_count=session.unread_message_count
-        mongo_session.updated_at=datetime.now(UTC)
-        await mongo_session.save()
-
+        await self._notify_change(session.id)
 
     async def find_by_id(self, session_id: str) -> Optional[Session]:
         """Find a session by its ID"""
+        cached = self._cache.get(session_id)
+        if cached is not None:
+            # Reading the version stamp is far cheaper than decoding the document
+            stamp = await SessionDocument.find_one(
+                SessionDocument.session_id == session_id
+            ).project(_SessionVersion)
+            if stamp is not None and stamp.version == cached[0]:
+                return cached[1].model_copy()
+            self._cache.evict(session_id)
+            if stamp is None:
+                return None
         mongo_session = await SessionDocument.find_one(
             SessionDocument.session_id == session_id
         )
-        return self._to_domain_session(mongo_session) if mongo_session else None
+        if mongo_session and mongo_session.archive_state is not None and self._archive:
+            await self._archive.restore(session_id)
+            mongo_session = await SessionDocument.find_one(
+                SessionDocument.session_id == session_id
+            )
+        if not mongo_session:
+            return None
+        session = self._to_domain_session(mongo_session)
+        self._cache.put(session_id, mongo_session.version, session)
+        return session.model_copy()
     
     async def update_title(self, session_id: str, title: str) -> None:
         """Update the title of a session"""
         result = await SessionDocument.find_one(
             SessionDocument.session_id == session_id
         ).update(
-            {"$set": {"title": title, "updated_at": datetime.now(UTC)}}
+            {"$set": {"title": title, "updated_at": datetime.now(UTC)}, "$inc": {"version": 1}}
         )
         if not result:
             raise ValueError(f"Session {session_id} not found")
+        await self._notify_change(session_id)
 
     async def update_latest_message(self, session_id: str, message: str, timestamp: datetime) -> None:
         """Update the latest message of a session"""
         result = await SessionDocument.find_one(
             SessionDocument.session_id == session_id
         ).update(
-            {"$set": {"latest_message": message, "latest_message_at": timestamp, "updated_at": datetime.now(UTC)}}
+            {
+                "$set": {"latest_message": message, "latest_message_at": timestamp, "updated_at": datetime.now(UTC)},
+                "$inc": {"version": 1},
+            }
         )
         if not result:
             raise ValueError(f"Session {session_id} not found")
+        await self._notify_change(session_id)
 
     async def add_event(self, session_id: str, event: BaseEvent) -> None:
-        """Add an event to a session"""
-        result = await SessionDocument.find_one(
+        """Append an event to a session"""
+        await self.add_events(session_id, [event])
+
+    async def add_events(self, session_id: str, events: List[BaseEvent]) -> None:
+        """Append events to a session in order"""
+        if not events:
+            return
+        # Reserve a range of sequence numbers, then append the events under it
+        mongo_session = await SessionDocument.find_one(
             SessionDocument.session_id == session_id
         ).update(
-            {"$push": {"events": event}, "$set": {"updated_at": datetime.now(UTC)}}
+            {"$inc": {"event_seq": len(events)}, "$set": {"updated_at": datetime.now(UTC)}},
+            response_type=UpdateResponse.NEW_DOCUMENT
         )
+        if not mongo_session:
+            raise ValueError(f"Session {session_id} not found")
+        first_seq = mongo_session.event_seq - len(events) + 1
+        await EventDocument.insert_many([
+            EventDocument(session_id=session_id, seq=seq, event=event)
+            for seq, event in enumerate(events, start=first_seq)
+        ])
+
+    async def apply_update(self, session_id: str, update: SessionUpdate) -> None:
+        """Apply several field changes to a session in a single write"""
+        fields = update.model_dump(exclude_unset=True, exclude={"unread_message_increment"})
+        mongo_update = {"$set": {**fields, "updated_at": datetime.now(UTC)}, "$inc": {"version": 1}}
+        if update.unread_message_increment:
+            mongo_update["$inc"]["unread_message_count"] = update.unread_message_increment
+        result = await SessionDocument.find_one(
+            SessionDocument.session_id == session_id
+        ).update(mongo_update)
         if not result:
             raise ValueError(f"Session {session_id} not found")
+        await self._notify_change(session_id)
+
+    async def get_events(self, session_id: str) -> AsyncIterator[AgentEvent]:
+        """Iterate over the events of a session in order, fetching them lazily"""
+        async for mongo_event in EventDocument.find(
+            EventDocument.session_id == session_id
+        ).sort("+seq"):
+            yield mongo_event.event
+
+    async def get_event_page(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+        before_seq: Optional[int] = None,
+        after_seq: Optional[int] = None,
+        compact: bool = False
+    ) -> SessionEventPage:
+        """Get consecutive events of a session, the latest ones without a cursor"""
+        if before_seq is not None and after_seq is not None:
+            raise ValueError("Only one of before_seq and after_seq can be given")
+        match = {"session_id": session_id}
+        if before_seq is not None:
+            match["seq"] = {"$lt": before_seq}
+        elif after_seq is not None:
+            match["seq"] = {"$gt": after_seq}
+        # Pages are read from the cursor outwards, the tail and backward pages newest first
+        backwards = after_seq is None
+        pipeline = [
+            {"$match": match},
+            {"$sort": {"seq": -1 if backwards else 1}},
+        ]
+        if limit is not None:
+            # One extra event tells whether there are more beyond the page
+            pipeline.append({"$limit": limit + 1})
+        unset = ["event.function_result"]
+        if compact:
+            unset.append("event.tool_content")
+        pipeline.append({"$project": {field: 0 for field in unset}})
+
+        records = await EventDocument.aggregate(pipeline, projection_model=_SequencedEvent).to_list()
+        has_more = limit is not None and len(records) > limit
+        records = records[:limit] if has_more else records
+        if backwards:
+            records.reverse()
+
+        page = SessionEventPage(
+            events=[record.event for record in records],
+            first_seq=records[0].seq if records else None,
+            last_seq=records[-1].seq if records else None,
+        )
+        if backwards:
+            page.has_before = has_more
+            page.has_after = before_seq is not None
+        else:
+            page.has_before = after_seq > 0
+            page.has_after = has_more
+        return page
+
+    async def get_latest_event(self, session_id: str, event_type: str) -> Optional[AgentEvent]:
+        """Get the most recent event of a type in a session"""
+        mongo_event = await EventDocument.find(
+            EventDocument.session_id == session_id,
+            {"event.type": event_type}
+        ).sort("-seq").first_or_none()
+        return mongo_event.event if mongo_event else None
+
+    async def migrate_embedded_events(self) -> int:
+        """Move events still embedded in session documents to the events collection
+
+        Safe to run concurrently and repeatedly, events already moved are skipped.
+
+        Returns:
+            int: Number of sessions migrated
+        """
+        migrated = 0
+        # The index keeps this from scanning every session, but it may have failed to build
+        indexes = await SessionDocument.get_pymongo_collection().index_information()
+        async for legacy_session in SessionDocument.find(
+            {"events": {"$exists": True}},
+            hint=LEGACY_EVENTS_INDEX if LEGACY_EVENTS_INDEX in indexes else None
+        ).project(_EmbeddedEvents):
+            if legacy_session.events:
+                try:
+                    await EventDocument.insert_many([
+                        EventDocument(session_id=legacy_session.session_id, seq=seq, event=event)
+                        for seq, event in enumerate(legacy_session.events, start=1)
+                    ], ordered=False)
+                except BulkWriteError:
+                    # Another replica moved some of them first
+                    pass
+            await SessionDocument.find_one(
+                SessionDocument.session_id == legacy_session.session_id
+            ).update(
+                {"$unset": {"events": ""}, "$max": {"event_seq": len(legacy_session.events)}}
+            )
+            migrated += 1
+        if migrated:
+            logger.info(f"Moved the embedded events of {migrated} sessions to the events collection")
+        return migrated
 
     async def delete(self, session_id: str) -> None:
         """Delete a session"""
+        if self._archive:
+            await self._archive.discard(session_id)
         mongo_session = await SessionDocument.find_one(
             SessionDocument.session_id == session_id
         )
         if mongo_session:
             await mongo_session.delete()
+        await EventDocument.find(EventDocument.session_id == session_id).delete()
+        await self._notify_change(session_id)
 
     async def get_all(self) -> List[Session]:
         """Get all sessions"""
         mongo_sessions = await SessionDocument.find().sort("-latest_message_at").to_list()
         return [self._to_domain_session(mongo_session) for mongo_session in mongo_sessions]
     
+    async def get_summaries(
+        self,
+        limit: int,
+        before: Optional[Tuple[datetime, str]] = None
+    ) -> List[SessionSummary]:
+        """Get a page of session summaries, most recently active first"""
+        query = SessionDocument.find()
+        if before:
+            latest_message_at, session_id = before
+            query = SessionDocument.find({"$or": [
+                {"latest_message_at": {"$lt": latest_message_at}},
+                {"latest_message_at": latest_message_at, "session_id": {"$lt": session_id}},
+            ]})
+        projections = await query.sort(
+            [("latest_message_at", DESCENDING), ("session_id", DESCENDING)]
+        ).limit(limit).project(_SessionSummaryProjection).to_list()
+        return [self._to_session_summary(projection) for projection in projections]
+
+    async def get_summaries_by_ids(self, session_ids: List[str]) -> List[SessionSummary]:
+        """Get the summaries of the given sessions, deleted sessions are left out"""
+        projections = await SessionDocument.find(
+            {"session_id": {"$in": session_ids}}
+        ).project(_SessionSummaryProjection).to_list()
+        return [self._to_session_summary(projection) for projection in projections]
+
     async def update_status(self, session_id: str, status: SessionStatus) -> None:
         """Update the status of a session"""
         result = await SessionDocument.find_one(
             SessionDocument.session_id == session_id
         ).update(
-            {"$set": {"status": status, "updated_at": datetime.now(UTC)}}
+            {"$set": {"status": status, "updated_at": datetime.now(UTC)}, "$inc": {"version": 1}}
         )
         if not result:
             raise ValueError(f"Session {session_id} not found")
+        await self._notify_change(session_id)
 
     async def update_unread_message_count(self, session_id: str, count: int) -> None:
         """Update the unread message count of a session"""
+        # Viewers reset the count on every event they receive, only write actual changes
         result = await SessionDocument.find_one(
-            SessionDocument.session_id == session_id
+            SessionDocument.session_id == session_id,
+            SessionDocument.unread_message_count != count
         ).update(
-            {"$set": {"unread_message_count": count, "updated_at": datetime.now(UTC)}}
+            {"$set": {"unread_message_count": count, "updated_at": datetime.now(UTC)}, "$inc": {"version": 1}}
         )
-        if not result:
-            raise ValueError(f"Session {session_id} not found")
+        if result and result.modified_count:
+            await self._notify_change(session_id)
 
     async def increment_unread_message_count(self, session_id: str) -> None:
         """Atomically increment the unread message count of a session"""
         result = await SessionDocument.find_one(
             SessionDocument.session_id == session_id
         ).update(
-            {"$inc": {"unread_message_count": 1}, "$set": {"updated_at": datetime.now(UTC)}}
+            {"$inc": {"unread_message_count": 1, "version": 1}, "$set": {"updated_at": datetime.now(UTC)}}
         )
         if not result:
             raise ValueError(f"Session {session_id} not found")
+        await self._notify_change(session_id)
 
     def _to_domain_session(self, mongo_session: SessionDocument) -> Session:
         """Convert MongoDB document to domain model"""
@@ -128,11 +386,21 @@ class MongoSessionRepository(SessionRepository):
             latest_message_at=mongo_session.latest_message_at,
             created_at=mongo_session.created_at,
             updated_at=mongo_session.updated_at,
-            events=mongo_session.events,
             status=mongo_session.status,
             unread_message_count=mongo_session.unread_message_count
         )
     
+    def _to_session_summary(self, projection: _SessionSummaryProjection) -> SessionSummary:
+        """Convert a projected session document to a summary"""
+        return SessionSummary(
+            id=projection.session_id,
+            title=projection.title,
+            status=projection.status,
+            unread_message_count=projection.unread_message_count,
+            latest_message=projection.latest_message,
+            latest_message_at=projection.latest_message_at
+        )
+
     def _to_mongo_session(self, session: Session) -> SessionDocument:
         """Convert domain session to MongoDB document"""
         return SessionDocument(
@@ -145,7 +413,6 @@ class MongoSessionRepository(SessionRepository):
             latest_message_at=session.latest_message_at,
             created_at=session.created_at,
             updated_at=session.updated_at,
-            events=session.events,
             status=session.status,
             unread_message_count=session.unread_message_count
         )
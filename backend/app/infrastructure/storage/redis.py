@@ -22,7 +22,9 @@ class RedisClient:
                 port=self._settings.redis_port,
                 db=self._settings.redis_db,
                 password=self._settings.redis_password,
-                decode_responses=True
+                decode_responses=True,
+                # Binary stream payloads survive decoding and are restored with the same error handler
+                encoding_errors="surrogateescape"
             )
             # Verify the connection
             await self._client.ping()
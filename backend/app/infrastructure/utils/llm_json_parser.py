@@ -5,7 +5,8 @@ from enum import Enum
 import logging
 
 from app.domain.utils.json_parser import JsonParser
-from app.infrastructure.external.llm.openai_llm import OpenAILLM
+from app.domain.external.llm import llm_call_scope
+from app.infrastructure.external.llm.cached_llm import create_llm
 
 
 logger = logging.getLogger(__name__)
@@ -27,7 +28,7 @@ class LLMJsonParser(JsonParser):
     """
     
     def __init__(self):
-        self.llm = OpenAILLM()
+        self.llm = create_llm()
         self.strategies = [
             self._try_direct_parse,
             self._try_markdown_block_parse,
@@ -179,10 +180,11 @@ JSON:"""
         ]
         
         try:
-            response = await self.llm.ask(
-                messages=messages,
-                response_format={"type": "json_object"}
-            )
+            with llm_call_scope(caller="json_repair"):
+                response = await self.llm.ask(
+                    messages=messages,
+                    response_format={"type": "json_object"}
+                )
             
             content = response.get("content", "").strip()
             if content and content != "null":
@@ -1,20 +1,24 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, UploadFile, File, Body
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, UploadFile, File, Body, Request, Query
 from sse_starlette.sse import EventSourceResponse
 from typing import AsyncGenerator, Optional, io
 from sse_starlette.event import ServerSentEvent
-from datetime import datetime
+from datetime import datetime, UTC
 import asyncio
 import websockets
 import logging
 
 from app.application.services.agent_service import AgentService
+from app.domain.models.session import SessionSummary
 from app.application.services.attachment_service import AttachmentService
 from app.infrastructure.repositories.mongo_attachment_repository import AttachmentRepository
 from app.infrastructure.storage.file_storage import StorageFactory
+from app.infrastructure.external.message_queue.redis_stream_retention import get_stream_retention
+from app.infrastructure.external.llm.cached_llm import get_llm_cache, get_llm_cache_stats
 from app.interfaces.schemas.request import ChatRequest, FileViewRequest, ShellViewRequest, CreateSessionRequest
 from app.interfaces.schemas.response import APIResponse, CreateSessionResponse, GetSessionResponse, ListSessionItem, \
-    ListSessionResponse, AttachmentUploadResponse, \
-    SessionAttachmentsResponse
+    ListSessionResponse, SessionChangesResponse, AttachmentUploadResponse, \
+    SessionAttachmentsResponse, StreamRetentionStatsResponse, SchedulerStatsResponse, LLMUsageResponse, \
+    LLMCacheStatsResponse
 from app.interfaces.schemas.event import SSEEventFactory
 from starlette.responses import StreamingResponse
 
@@ -23,6 +27,9 @@ logger = logging.getLogger(__name__)
 
 TOOL_POLL_INTERVAL = 5
 SESSION_POLL_INTERVAL = 5
+SESSION_PAGE_SIZE = 100
+SESSION_MAX_PAGE_SIZE = 500
+SESSION_EVENT_MAX_PAGE_SIZE = 1000
 
 
 def get_agent_service() -> AgentService:
@@ -54,13 +61,27 @@ async def create_session(
 @router.get("/sessions/{session_id}", response_model=APIResponse[GetSessionResponse])
 async def get_session(
         session_id: str,
+        before: Optional[int] = Query(None, ge=1),
+        after: Optional[int] = Query(None, ge=0),
+        limit: Optional[int] = Query(None, ge=1, le=SESSION_EVENT_MAX_PAGE_SIZE),
+        compact: bool = False,
         agent_service: AgentService = Depends(get_agent_service)
 ) -> APIResponse[GetSessionResponse]:
+    """Get a session with its event history
+
+    Without `limit` the whole history is returned. With it, the latest events
+    are returned and `prev_cursor` pages backwards through older ones, while
+    `after` pages forwards. `compact` leaves tool content out of the events.
+    """
     session = await agent_service.get_session(session_id)
+    page, latest_plan = await agent_service.get_session_event_page(session.id, limit, before, after, compact)
     return APIResponse.success(GetSessionResponse(
         session_id=session.id,
         title=session.title,
-        events=SSEEventFactory.from_events(session.events)
+        events=SSEEventFactory.from_events(page.events),
+        prev_cursor=page.first_seq if page.has_before else None,
+        next_cursor=page.last_seq if page.has_after else None,
+        latest_plan=SSEEventFactory.from_event(latest_plan) if latest_plan else None
     ))
 
 
@@ -83,22 +104,28 @@ async def stop_session(
     return APIResponse.success()
 
 
+def _to_list_session_item(summary: SessionSummary) -> ListSessionItem:
+    return ListSessionItem(
+        session_id=summary.id,
+        title=summary.title,
+        status=summary.status,
+        unread_message_count=summary.unread_message_count,
+        latest_message=summary.latest_message,
+        latest_message_at=int(summary.latest_message_at.timestamp()) if summary.latest_message_at else None
+    )
+
+
 @router.get("/sessions", response_model=APIResponse[ListSessionResponse])
 async def get_all_sessions(
+        limit: int = Query(SESSION_PAGE_SIZE, ge=1, le=SESSION_MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
         agent_service: AgentService = Depends(get_agent_service)
 ) -> APIResponse[ListSessionResponse]:
-    sessions = await agent_service.get_all_sessions()
-    session_items = [
-        ListSessionItem(
-            session_id=session.id,
-            title=session.title,
-            status=session.status,
-            unread_message_count=session.unread_message_count,
-            latest_message=session.latest_message,
-            latest_message_at=int(session.latest_message_at.timestamp()) if session.latest_message_at else None
-        ) for session in sessions
-    ]
-    return APIResponse.success(ListSessionResponse(sessions=session_items))
+    summaries, next_cursor = await agent_service.get_session_summaries(limit, cursor)
+    return APIResponse.success(ListSessionResponse(
+        sessions=[_to_list_session_item(summary) for summary in summaries],
+        next_cursor=next_cursor
+    ))
 
 
 @router.post("/sessions")
@@ -106,23 +133,23 @@ async def get_all_sessions(
         agent_service: AgentService = Depends(get_agent_service)
 ) -> EventSourceResponse:
     async def event_generator() -> AsyncGenerator[ServerSentEvent, None]:
-        while True:
-            sessions = await agent_service.get_all_sessions()
-            session_items = [
-                ListSessionItem(
-                    session_id=session.id,
-                    title=session.title,
-                    status=session.status,
-                    unread_message_count=session.unread_message_count,
-                    latest_message=session.latest_message,
-                    latest_message_at=int(session.latest_message_at.timestamp()) if session.latest_message_at else None
-                ) for session in sessions
-            ]
-            yield ServerSentEvent(
-                event="sessions",
-                data=ListSessionResponse(sessions=session_items).model_dump_json()
-            )
-            await asyncio.sleep(SESSION_POLL_INTERVAL)
+        async for changes, next_cursor in agent_service.watch_sessions(SESSION_PAGE_SIZE, SESSION_POLL_INTERVAL):
+            if changes.resync:
+                yield ServerSentEvent(
+                    event="sessions",
+                    data=ListSessionResponse(
+                        sessions=[_to_list_session_item(summary) for summary in changes.sessions],
+                        next_cursor=next_cursor
+                    ).model_dump_json()
+                )
+            else:
+                yield ServerSentEvent(
+                    event="session_changes",
+                    data=SessionChangesResponse(
+                        sessions=[_to_list_session_item(summary) for summary in changes.sessions],
+                        deleted_session_ids=changes.deleted_session_ids
+                    ).model_dump_json()
+                )
 
     return EventSourceResponse(event_generator())
 
@@ -131,14 +158,18 @@ async def get_all_sessions(
 async def chat(
         session_id: str,
         request: ChatRequest,
+        http_request: Request,
         agent_service: AgentService = Depends(get_agent_service)
 ) -> EventSourceResponse:
+    client_id = http_request.client.host if http_request.client else None
+
     async def event_generator() -> AsyncGenerator[ServerSentEvent, None]:
         async for event in agent_service.chat(
                 session_id=session_id,
                 message=request.message,
                 timestamp=datetime.fromtimestamp(request.timestamp) if request.timestamp else None,
-                event_id=request.event_id
+                event_id=request.event_id,
+                client_id=client_id
         ):
             logger.debug(f"Received event from chat: {event}")
             sse_event = SSEEventFactory.from_event(event)
@@ -348,3 +379,58 @@ async def get_session_attachments(
         session_id=session_id,
         attachments=attachment_list
     ))
+
+
+@router.get("/streams/retention", response_model=APIResponse[StreamRetentionStatsResponse])
+async def get_stream_retention_stats() -> APIResponse[StreamRetentionStatsResponse]:
+    stats = await get_stream_retention().get_stats()
+    return APIResponse.success(StreamRetentionStatsResponse(
+        streams_archived=stats.streams_archived,
+        entries_archived=stats.entries_archived,
+        bytes_reclaimed=stats.bytes_reclaimed,
+        pending_streams=stats.pending_streams,
+        last_sweep_at=int(stats.last_sweep_at.timestamp()) if stats.last_sweep_at else None
+    ))
+
+
+@router.get("/sessions/{session_id}/usage", response_model=APIResponse[LLMUsageResponse])
+async def get_session_llm_usage(
+    session_id: str,
+    agent_service: AgentService = Depends(get_agent_service)
+) -> APIResponse[LLMUsageResponse]:
+    usage = await agent_service.get_session_llm_usage(session_id)
+    if not usage:
+        return APIResponse.success(LLMUsageResponse(enabled=False))
+    return APIResponse.success(LLMUsageResponse(enabled=True, **usage.model_dump()))
+
+
+@router.get("/llm/usage", response_model=APIResponse[LLMUsageResponse])
+async def get_llm_usage(
+    agent_id: Optional[str] = Query(None, description="Only count the calls of this agent"),
+    since: Optional[int] = Query(None, ge=0, description="Only count calls made from this Unix timestamp on"),
+    agent_service: AgentService = Depends(get_agent_service)
+) -> APIResponse[LLMUsageResponse]:
+    usage = await agent_service.get_llm_usage(
+        agent_id=agent_id,
+        since=datetime.fromtimestamp(since, UTC) if since is not None else None
+    )
+    if not usage:
+        return APIResponse.success(LLMUsageResponse(enabled=False))
+    return APIResponse.success(LLMUsageResponse(enabled=True, **usage.model_dump()))
+
+
+@router.get("/llm/cache", response_model=APIResponse[LLMCacheStatsResponse])
+async def get_llm_cache_metrics() -> APIResponse[LLMCacheStatsResponse]:
+    if get_llm_cache() is None:
+        return APIResponse.success(LLMCacheStatsResponse(enabled=False))
+    return APIResponse.success(LLMCacheStatsResponse(enabled=True, **get_llm_cache_stats().model_dump()))
+
+
+@router.get("/scheduler/stats", response_model=APIResponse[SchedulerStatsResponse])
+async def get_scheduler_stats(
+    agent_service: AgentService = Depends(get_agent_service)
+) -> APIResponse[SchedulerStatsResponse]:
+    stats = agent_service.get_scheduler_stats()
+    if not stats:
+        return APIResponse.success(SchedulerStatsResponse(enabled=False))
+    return APIResponse.success(SchedulerStatsResponse(enabled=True, **stats.model_dump()))
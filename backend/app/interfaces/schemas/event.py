@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Any, Union, Literal, Dict, Optional, List
+from typing import Any, Callable, Union, Literal, Dict, Optional, List
 import time
 from app.domain.models.plan import ExecutionStatus
 from app.domain.events.agent_events import ToolStatus
@@ -9,10 +9,12 @@ from app.domain.events.agent_events import (
     ErrorEvent,
     PlanEvent,
     MessageEvent,
+    MessageDeltaEvent,
     TitleEvent,
     ToolEvent,
     StepEvent,
     WaitEvent,
+    QueueEvent,
 )
 
 
@@ -24,6 +26,11 @@ class MessageEventData(BaseEventData):
     role: Literal["user", "assistant"]
     content: str
 
+class MessageDeltaEventData(BaseEventData):
+    role: Literal["assistant"]
+    message_id: str
+    delta: str
+
 class ToolEventData(BaseEventData):
     tool_call_id: str
     name: str
@@ -47,6 +54,9 @@ class ErrorEventData(BaseEventData):
 class TitleEventData(BaseEventData):
     title: str
 
+class QueueEventData(BaseEventData):
+    position: int
+
 class BaseSSEEvent(BaseModel):
     event: str
     data: Optional[Union[str, BaseEventData]]
@@ -55,6 +65,10 @@ class MessageSSEEvent(BaseSSEEvent):
     event: Literal["message"] = "message"
     data: MessageEventData
 
+class MessageDeltaSSEEvent(BaseSSEEvent):
+    event: Literal["message_delta"] = "message_delta"
+    data: MessageDeltaEventData
+
 class ToolSSEEvent(BaseSSEEvent):
     event: Literal["tool"] = "tool"
     data: ToolEventData
@@ -83,19 +97,118 @@ class PlanSSEEvent(BaseSSEEvent):
     event: Literal["plan"] = "plan"
     data: PlanEventData
 
+class QueueSSEEvent(BaseSSEEvent):
+    event: Literal["queue"] = "queue"
+    data: QueueEventData
+
 AgentSSEEvent = Union[
     BaseSSEEvent,
     PlanSSEEvent,
     MessageSSEEvent,
+    MessageDeltaSSEEvent,
     TitleSSEEvent,
     ToolSSEEvent,
     StepSSEEvent,
     DoneSSEEvent,
     ErrorSSEEvent,
-    WaitSSEEvent
+    WaitSSEEvent,
+    QueueSSEEvent
 ]
 
+def _plan_sse_event(event: PlanEvent, event_id: Optional[str], timestamp: int) -> PlanSSEEvent:
+    return PlanSSEEvent(data=PlanEventData(
+        event_id=event_id,
+        timestamp=timestamp,
+        # Plain dicts let the steps validate along with their parent
+        steps=[{
+            "event_id": None,
+            "timestamp": timestamp,
+            "status": step.status,
+            "id": step.id,
+            "description": step.description
+        } for step in event.plan.steps]
+    ))
+
+def _message_sse_event(event: MessageEvent, event_id: Optional[str], timestamp: int) -> MessageSSEEvent:
+    return MessageSSEEvent(data=MessageEventData(
+        event_id=event_id,
+        timestamp=timestamp,
+        content=event.message,
+        role=event.role
+    ))
+
+def _message_delta_sse_event(event: MessageDeltaEvent, event_id: Optional[str], timestamp: int) -> MessageDeltaSSEEvent:
+    return MessageDeltaSSEEvent(data=MessageDeltaEventData(
+        event_id=event_id,
+        timestamp=timestamp,
+        role=event.role,
+        message_id=event.message_id,
+        delta=event.delta
+    ))
+
+def _title_sse_event(event: TitleEvent, event_id: Optional[str], timestamp: int) -> TitleSSEEvent:
+    return TitleSSEEvent(data=TitleEventData(
+        event_id=event_id,
+        timestamp=timestamp,
+        title=event.title
+    ))
+
+def _tool_sse_event(event: ToolEvent, event_id: Optional[str], timestamp: int) -> ToolSSEEvent:
+    return ToolSSEEvent(data=ToolEventData(
+        event_id=event_id,
+        timestamp=timestamp,
+        tool_call_id=event.tool_call_id,
+        name=event.tool_name,
+        function=event.function_name,
+        args=event.function_args,
+        status=event.status,
+        content=event.tool_content
+    ))
+
+def _step_sse_event(event: StepEvent, event_id: Optional[str], timestamp: int) -> StepSSEEvent:
+    return StepSSEEvent(data=StepEventData(
+        event_id=event_id,
+        timestamp=timestamp,
+        status=event.step.status,
+        id=event.step.id,
+        description=event.step.description
+    ))
+
+def _done_sse_event(event: DoneEvent, event_id: Optional[str], timestamp: int) -> DoneSSEEvent:
+    return DoneSSEEvent(data=BaseEventData(event_id=event_id, timestamp=timestamp))
+
+def _error_sse_event(event: ErrorEvent, event_id: Optional[str], timestamp: int) -> ErrorSSEEvent:
+    return ErrorSSEEvent(data=ErrorEventData(
+        event_id=event_id,
+        timestamp=timestamp,
+        error=event.error
+    ))
+
+def _wait_sse_event(event: WaitEvent, event_id: Optional[str], timestamp: int) -> WaitSSEEvent:
+    return WaitSSEEvent(data=BaseEventData(event_id=event_id, timestamp=timestamp))
+
+def _queue_sse_event(event: QueueEvent, event_id: Optional[str], timestamp: int) -> QueueSSEEvent:
+    return QueueSSEEvent(data=QueueEventData(
+        event_id=event_id,
+        timestamp=timestamp,
+        position=event.position
+    ))
+
 class SSEEventFactory:
+    # Builders keyed on the event class, each validates its SSE event once
+    _builders: Dict[type, Callable[[Any, Optional[str], int], AgentSSEEvent]] = {
+        PlanEvent: _plan_sse_event,
+        MessageEvent: _message_sse_event,
+        MessageDeltaEvent: _message_delta_sse_event,
+        TitleEvent: _title_sse_event,
+        ToolEvent: _tool_sse_event,
+        StepEvent: _step_sse_event,
+        DoneEvent: _done_sse_event,
+        ErrorEvent: _error_sse_event,
+        WaitEvent: _wait_sse_event,
+        QueueEvent: _queue_sse_event,
+    }
+
     @staticmethod
     def from_events(events: List[AgentEvent]) -> List[AgentSSEEvent]:
         return list(filter(lambda x: x is not None, [
@@ -104,66 +217,7 @@ class SSEEventFactory:
     
     @staticmethod
     def from_event(event: AgentEvent) -> Optional[AgentSSEEvent]:
-        base_event = BaseEventData(
-            event_id=event.id,
-            timestamp=int(event.timestamp.timestamp())
-        )
-        
-        if isinstance(event, PlanEvent):
-            return PlanSSEEvent(
-                data=PlanEventData(
-                    **base_event.model_dump(),
-                    steps=[StepEventData(
-                        status=step.status,
-                        id=step.id, 
-                        description=step.description
-                    ) for step in event.plan.steps]
-                )
-            )
-        elif isinstance(event, MessageEvent):
-            return MessageSSEEvent(
-                data=MessageEventData(
-                    **base_event.model_dump(),
-                    content=event.message,
-                    role=event.role
-                )
-            )
-        elif isinstance(event, TitleEvent):
-            return TitleSSEEvent(
-                data=TitleEventData(
-                    **base_event.model_dump(),
-                    title=event.title
-                )
-            )
-        elif isinstance(event, ToolEvent):
-            return ToolSSEEvent(
-                data=ToolEventData(
-                    **base_event.model_dump(),
-                    tool_call_id=event.tool_call_id,
-                    name=event.tool_name,
-                    function=event.function_name,
-                    args=event.function_args,
-                    status=event.status,
-                    content=event.tool_content
-                )
-            )
-        elif isinstance(event, StepEvent):
-            return StepSSEEvent(
-                data=StepEventData(
-                    **base_event.model_dump(),
-                    status=event.step.status,
-                    id=event.step.id, 
-                    description=event.step.description
-                )
-            )
-        elif isinstance(event, DoneEvent):
-            return DoneSSEEvent(data=base_event)
-        elif isinstance(event, ErrorEvent):
-            return ErrorSSEEvent(
-                data=ErrorEventData(
-                    **base_event.model_dump(),
-                    error=event.error
-                )
-            )
-        elif isinstance(event, WaitEvent):
-            return WaitSSEEvent(data=base_event)
\ No newline at end of file
+        builder = SSEEventFactory._builders.get(type(event))
+        if builder is None:
+            return None
+        return builder(event, event.id, int(event.timestamp.timestamp()))
@@ -1,7 +1,7 @@
-from typing import Any, Generic, Optional, TypeVar, List
+from typing import Any, Dict, Generic, Optional, TypeVar, List
 from datetime import datetime
 from pydantic import BaseModel
-from app.interfaces.schemas.event import AgentSSEEvent
+from app.interfaces.schemas.event import AgentSSEEvent, PlanSSEEvent
 from app.domain.models.session import SessionStatus
 
 T = TypeVar('T')
@@ -29,6 +29,9 @@ class GetSessionResponse(BaseModel):
     session_id: str
     title: Optional[str] = None
     events: List[AgentSSEEvent] = []
+    prev_cursor: Optional[int] = None  # Pass as `before` for older events, None when the page starts the history
+    next_cursor: Optional[int] = None  # Pass as `after` for newer events, None when the page ends the history
+    latest_plan: Optional[PlanSSEEvent] = None  # Set when the plan may be in older pages
 
 
 class ListSessionItem(BaseModel):
@@ -42,6 +45,12 @@ class ListSessionItem(BaseModel):
 
 class ListSessionResponse(BaseModel):
     sessions: List[ListSessionItem]
+    next_cursor: Optional[str] = None
+
+
+class SessionChangesResponse(BaseModel):
+    sessions: List[ListSessionItem]  # Created or updated sessions
+    deleted_session_ids: List[str]
 
 
 class ConsoleRecord(BaseModel):
@@ -80,3 +89,54 @@ class AttachmentDownloadResponse(BaseModel):
 class SessionAttachmentsResponse(BaseModel):
     session_id: str
     attachments: List[dict]
+
+
+class StreamRetentionStatsResponse(BaseModel):
+    streams_archived: int
+    entries_archived: int
+    bytes_reclaimed: int
+    pending_streams: int
+    last_sweep_at: Optional[int] = None
+
+
+class LLMUsageTotalsResponse(BaseModel):
+    calls: int = 0
+    failures: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    duration_ms: float = 0.0
+    retries: int = 0
+
+
+class LLMUsageResponse(BaseModel):
+    enabled: bool
+    total: LLMUsageTotalsResponse = LLMUsageTotalsResponse()
+    by_caller: Dict[str, LLMUsageTotalsResponse] = {}
+
+
+class LLMCacheCountersResponse(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    errors: int = 0
+
+
+class LLMCacheStatsResponse(LLMCacheCountersResponse):
+    enabled: bool
+    backend: Optional[str] = None
+    by_caller: Dict[str, LLMCacheCountersResponse] = {}
+
+
+class SchedulerStatsResponse(BaseModel):
+    enabled: bool
+    running: int = 0
+    waiting: int = 0
+    max_running: int = 0
+    max_running_per_client: int = 0
+    admitted_total: int = 0
+    cancelled_total: int = 0
+    avg_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    running_by_client: Dict[str, int] = {}
+    waiting_by_client: Dict[str, int] = {}
@@ -15,13 +15,26 @@ from app.interfaces.errors.exception_handlers import register_exception_handlers
 from app.infrastructure.storage.mongodb import get_mongodb
 from app.infrastructure.storage.redis import get_redis
 from app.infrastructure.external.search.google_search import GoogleSearchEngine
-from app.infrastructure.external.llm.openai_llm import OpenAILLM
+from app.infrastructure.external.llm.cached_llm import create_llm
 from app.infrastructure.external.sandbox.docker_sandbox import DockerSandbox
 from app.infrastructure.repositories.mongo_agent_repository import MongoAgentRepository
 from app.infrastructure.repositories.mongo_session_repository import MongoSessionRepository
+from app.infrastructure.repositories.mongo_checkpoint_repository import MongoCheckpointRepository
+from app.infrastructure.repositories.mongo_llm_usage_repository import MongoLLMUsageRepository
 from app.infrastructure.external.task.redis_task import RedisStreamTask
+from app.domain.services.task_scheduler import TaskScheduler
+from app.domain.events.event_codec import EventEncoding
+from app.domain.models.memory import ContextLimits
+from app.infrastructure.external.message_queue.redis_stream_dispatcher import get_stream_dispatcher
+from app.infrastructure.external.message_queue.redis_stream_retention import get_stream_retention
+from app.infrastructure.external.message_queue.redis_session_change_feed import get_session_change_feed
+from app.infrastructure.external.cache.local_memory_cache import get_memory_cache
+from app.infrastructure.external.archive.gridfs_session_archive import get_session_archive
+from app.infrastructure.external.llm.usage_recorder import get_llm_usage_recorder
+from app.infrastructure.external.task.redis_task_registry import get_task_registry
 from app.interfaces.api.routes import get_agent_service
-from app.infrastructure.models.documents import AgentDocument, SessionDocument, AttachmentDocument
+from app.infrastructure.models.documents import DOCUMENT_MODELS
+from app.infrastructure.models.index_sync import sync_indexes
 from app.infrastructure.utils.llm_json_parser import LLMJsonParser
 from beanie import init_beanie
 
@@ -45,14 +58,41 @@ def create_agent_service() -> AgentService:
     else:
         logger.warning("Google Search Engine not initialized: missing API key or engine ID")
 
+    task_scheduler = None
+    if settings.max_running_tasks > 0:
+        task_scheduler = TaskScheduler(
+            max_running=settings.max_running_tasks,
+            max_running_per_client=settings.max_running_tasks_per_client
+        )
+
+    session_change_feed = get_session_change_feed()
     return AgentService(
-        llm=OpenAILLM(),
-        agent_repository=MongoAgentRepository(),
-        session_repository=MongoSessionRepository(),
+        llm=create_llm(),
+        agent_repository=MongoAgentRepository(
+            memory_cache=get_memory_cache() if settings.memory_cache_max_mb > 0 else None
+        ),
+        session_repository=MongoSessionRepository(
+            change_feed=session_change_feed,
+            cache_size=settings.session_cache_size,
+            archive=get_session_archive()
+        ),
         sandbox_cls=DockerSandbox,
         task_cls=RedisStreamTask,
         json_parser=LLMJsonParser(),
         search_engine=search_engine,
+        use_workers=settings.agent_worker_mode,
+        task_scheduler=task_scheduler,
+        checkpoint_repository=MongoCheckpointRepository(),
+        max_recovery_attempts=settings.flow_recovery_max_attempts,
+        event_encoding=EventEncoding(settings.redis_stream_event_encoding),
+        session_change_feed=session_change_feed,
+        session_flush_interval_seconds=settings.session_flush_interval_ms / 1000,
+        context_limits=ContextLimits(
+            budget_tokens=settings.context_budget_tokens,
+            tool_result_max_bytes=settings.tool_result_max_bytes,
+            tool_result_stale_turns=settings.tool_result_stale_turns,
+        ),
+        llm_usage_repository=MongoLLMUsageRepository() if settings.llm_usage_enabled else None,
     )
 
 # Create agent service instance
@@ -80,32 +120,72 @@ async def shutdown() -> None:
     except Exception as e:
         logger.error(f"Error during shutdown: {str(e)}")
 
-# Create lifespan context manager
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Code executed on startup
-    logger.info("Application startup - Manus AI Agent initializing")
-    
+async def initialize_infrastructure() -> None:
+    """Connect to MongoDB and Redis, shared by the API and worker processes"""
     # Initialize MongoDB and Beanie
     await get_mongodb().initialize()
 
     # Initialize Beanie
     await init_beanie(
         database=get_mongodb().client[settings.mongodb_database],
-        document_models=[AgentDocument, SessionDocument,AttachmentDocument]
+        document_models=DOCUMENT_MODELS,
+        skip_indexes=True
     )
     logger.info("Successfully initialized Beanie")
+
+    # Bring collection indexes in line with the declared ones
+    await sync_indexes(DOCUMENT_MODELS)
+
+    # Sessions created before events had their own collection
+    await MongoSessionRepository().migrate_embedded_events()
     
     # Initialize Redis
     await get_redis().initialize()
+
+# Create lifespan context manager
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Code executed on startup
+    logger.info("Application startup - Manus AI Agent initializing")
+    
+    await initialize_infrastructure()
+
+    # Start archiving finished task streams
+    get_stream_retention().start()
+
+    # Move the history of long idle sessions to cold storage
+    if settings.session_archive_after_days > 0:
+        get_session_archive().start()
+
+    # Drop cached memories of agents other replicas start running
+    if settings.memory_cache_max_mb > 0:
+        get_memory_cache().start()
+
+    # Write the records of LLM calls in batches
+    if settings.llm_usage_enabled:
+        get_llm_usage_recorder().start()
+
+    # Announce this replica and accept requests for the tasks it owns
+    await get_task_registry().start(RedisStreamTask.on_control)
+
+    # Resume sessions interrupted by a crashed API or worker process
+    agent_service.start_flow_recovery(settings.flow_recovery_interval_seconds)
     
     try:
         yield
     finally:
         # Code executed on shutdown
         logger.info("Application shutdown - Manus AI Agent terminating")
+        await agent_service.stop_flow_recovery()
+        await get_session_archive().shutdown()
+        await get_llm_usage_recorder().shutdown()
         # Disconnect from MongoDB
         await get_mongodb().shutdown()
+        # Stop the shared stream reader and the retention sweeper before Redis goes away
+        await get_stream_dispatcher().shutdown()
+        await get_stream_retention().shutdown()
+        await get_task_registry().shutdown()
+        await get_memory_cache().shutdown()
         # Disconnect from Redis
         await get_redis().shutdown()
         await shutdown()
@@ -0,0 +1,50 @@
+import signal
+import asyncio
+import logging
+
+from app.main import agent_service, initialize_infrastructure, settings
+from app.infrastructure.storage.mongodb import get_mongodb
+from app.infrastructure.storage.redis import get_redis
+from app.infrastructure.external.task.redis_task import RedisStreamTask
+from app.infrastructure.external.task.redis_task_registry import get_task_registry
+from app.infrastructure.external.task.redis_task_worker import RedisTaskWorker
+from app.infrastructure.external.cache.local_memory_cache import get_memory_cache
+from app.infrastructure.external.llm.usage_recorder import get_llm_usage_recorder
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    """Worker process entry: claim queued agent tasks and run them"""
+    logger.info("Worker startup - Manus AI Agent worker initializing")
+    await initialize_infrastructure()
+    await get_task_registry().start(RedisStreamTask.on_control)
+    if settings.memory_cache_max_mb > 0:
+        get_memory_cache().start()
+    if settings.llm_usage_enabled:
+        get_llm_usage_recorder().start()
+
+    worker = RedisTaskWorker(agent_service.create_task_runner, settings.worker_concurrency)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    try:
+        await worker.run()
+        try:
+            # Give running tasks a chance to finish before they are cancelled
+            await asyncio.wait_for(worker.drain(), timeout=settings.worker_shutdown_timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.warning("Worker drain timed out, cancelling remaining tasks")
+    finally:
+        logger.info("Worker shutdown - Manus AI Agent worker terminating")
+        await agent_service.shutdown()
+        await get_task_registry().shutdown()
+        await get_memory_cache().shutdown()
+        await get_llm_usage_recorder().shutdown()
+        await get_redis().shutdown()
+        await get_mongodb().shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
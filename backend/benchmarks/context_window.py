@@ -0,0 +1,186 @@
+"""Prompt sizes with and without the context window, on replayed agent memories
+
+Every LLM call of a memory is replayed in order: the prompt of the call that
+produced the assistant message at position i is the memory up to i. For each
+call the whole memory and the window sent under the limits are measured, as
+is the time the window takes to count tokens and build the prompt.
+Summaries are written by a stand-in that keeps the first words of the
+history, so no LLM is called and summarizer latency is not included.
+Tool results over the size limit are stubbed in memory as the agent does,
+without storing them anywhere.
+
+Memories come from the agents collection of a MongoDB database, or are
+generated when no URI is given. Token counts are estimates.
+
+Run from the backend directory:
+    python -m benchmarks.context_window [--budget 32000] [--max-bytes 16384] [--stale-turns 8]
+        [--mongodb-uri mongodb://localhost:27017 --database manus]
+
+Pass 0 to a limit to leave it out.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from app.domain.models.memory import ContextLimits, Memory
+from app.domain.models.tool_result import ToolResult
+from app.domain.services.agents.context_window import ContextWindow, estimate_message_tokens, tool_result_stub
+from benchmarks.memory_writes import step_messages
+
+
+class StandInSummarizer:
+    """Answers summary requests with the first words of the history"""
+
+    def __init__(self, words: int):
+        self.words = words
+        self.calls = 0
+
+    async def ask(self, messages: List[Dict[str, Any]], tools=None, response_format=None) -> Dict[str, Any]:
+        self.calls += 1
+        history = messages[-1]["content"]
+        return {"role": "assistant", "content": " ".join(history.split()[:self.words])}
+
+
+def page_messages(i: int) -> List[Dict[str, Any]]:
+    """A browser call returning a whole page"""
+    page = f"Section {i}. " + "The quick brown fox jumps over the lazy dog. " * 600
+    return [
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{
+                "id": f"page_{i}",
+                "type": "function",
+                "function": {"name": "browser_view", "arguments": json.dumps({"page": i})},
+            }],
+        },
+        {
+            "role": "tool",
+            "tool_call_id": f"page_{i}",
+            "content": ToolResult(success=True, data={"content": page}).model_dump_json(),
+        },
+    ]
+
+
+def generated_memories(count: int, calls_per_step: int = 12) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """Execution memories of tasks of 4, 8, 12... steps of tool calls, one in four viewing a page"""
+    memories = []
+    for m in range(count):
+        messages = [{"role": "system", "content": "You are a task execution agent. " * 20}]
+        steps = 4 * (m + 1)
+        for s in range(steps):
+            messages.append({"role": "user", "content": f"Goal: research topic {m}\nStep {s + 1}: gather sources " * 3})
+            for c in range(calls_per_step):
+                i = s * calls_per_step + c
+                messages.extend(page_messages(i) if c % 4 == 3 else step_messages(i))
+            messages.append({"role": "assistant", "content": f"Step {s + 1} done. " * 30})
+        memories.append((f"generated-{steps}-steps", messages))
+    return memories
+
+
+async def stored_memories(uri: str, database: str, limit: int) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    from pymongo import AsyncMongoClient
+    client = AsyncMongoClient(uri)
+    try:
+        memories = []
+        async for agent in client[database]["agents"].find({}, {"agent_id": 1, "memories": 1}).limit(limit):
+            for name, memory in (agent.get("memories") or {}).items():
+                if memory.get("messages"):
+                    memories.append((f"{agent['agent_id']}/{name}", memory["messages"]))
+        return memories
+    finally:
+        await client.close()
+
+
+async def replay(messages: List[Dict[str, Any]], limits: ContextLimits) -> Dict[str, Any]:
+    """Replay the LLM calls of one memory through a context window"""
+    summarizer = StandInSummarizer(words=max(200, limits.budget_tokens // 10))
+    window = ContextWindow(summarizer, limits)
+    memory = Memory()
+    memory_tokens = 0
+    stored = 0
+    full_tokens: List[int] = []
+    sent_tokens: List[int] = []
+    overhead_ms: List[float] = []
+    for message in messages:
+        if message.get("role") == "assistant" and memory.messages:
+            started = time.perf_counter()
+            summary = await window.summarize(memory)
+            if summary:
+                memory.summary, memory.summarized = summary
+            prompt = window.build(memory)
+            overhead_ms.append((time.perf_counter() - started) * 1000)
+            full_tokens.append(memory_tokens)
+            sent_tokens.append(sum(estimate_message_tokens(m) for m in prompt))
+        memory_tokens += estimate_message_tokens(message)
+        content = message.get("content")
+        if message.get("role") == "tool" and isinstance(content, str) and \
+                0 < limits.tool_result_max_bytes < len(content.encode()):
+            window.hold(message["tool_call_id"], content)
+            message = {**message, "content": tool_result_stub(message["tool_call_id"], content)}
+            stored += 1
+        memory.add_message(message)
+    return {
+        "calls": len(full_tokens),
+        "full": sum(full_tokens),
+        "sent": sum(sent_tokens),
+        "max_full": max(full_tokens, default=0),
+        "max_sent": max(sent_tokens, default=0),
+        "summaries": summarizer.calls,
+        "stored": stored,
+        "overhead_ms": overhead_ms,
+    }
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run(limits: ContextLimits, uri: Optional[str], database: str, limit: int) -> None:
+    memories = await stored_memories(uri, database, limit) if uri else generated_memories(limit)
+    print(f"{'memory':<40}{'calls':>7}{'full tokens':>13}{'sent tokens':>13}{'saved':>7}"
+          f"{'max full':>10}{'max sent':>10}{'summaries':>11}{'stored':>8}{'p50 ms':>8}{'p95 ms':>8}")
+    totals = {"calls": 0, "full": 0, "sent": 0, "summaries": 0, "stored": 0}
+    all_overhead: List[float] = []
+    for name, messages in memories:
+        result = await replay(messages, limits)
+        if not result["calls"]:
+            continue
+        saved = 1 - result["sent"] / result["full"] if result["full"] else 0
+        print(f"{name[:39]:<40}{result['calls']:>7}{result['full']:>13,}{result['sent']:>13,}{saved:>7.0%}"
+              f"{result['max_full']:>10,}{result['max_sent']:>10,}{result['summaries']:>11}{result['stored']:>8}"
+              f"{statistics.median(result['overhead_ms']):>8.2f}{percentile(result['overhead_ms'], 0.95):>8.2f}")
+        for key in totals:
+            totals[key] += result[key]
+        all_overhead.extend(result["overhead_ms"])
+    if totals["full"]:
+        print(f"\n{totals['calls']} calls, {totals['full']:,} prompt tokens without the window, {totals['sent']:,} with it "
+              f"({1 - totals['sent'] / totals['full']:.0%} fewer), {totals['summaries']} summaries, "
+              f"{totals['stored']} tool results stored aside, "
+              f"window overhead p50 {statistics.median(all_overhead):.2f} ms, p95 {percentile(all_overhead, 0.95):.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=int, default=32000, help="Context budget in tokens")
+    parser.add_argument("--max-bytes", type=int, default=16384, help="Tool results larger than this are stored aside")
+    parser.add_argument("--stale-turns", type=int, default=8, help="Tool results older than this many turns are stubbed")
+    parser.add_argument("--mongodb-uri", help="Replay the memories stored in this MongoDB instead of generated ones")
+    parser.add_argument("--database", default="manus", help="Database holding the agents collection")
+    parser.add_argument("--limit", type=int, default=5, help="Agents to replay, or memories to generate")
+    args = parser.parse_args()
+    limits = ContextLimits(
+        budget_tokens=args.budget,
+        tool_result_max_bytes=args.max_bytes,
+        tool_result_stale_turns=args.stale_turns,
+    )
+    asyncio.run(run(limits, args.mongodb_uri, args.database, args.limit))
+
+
+if __name__ == "__main__":
+    main()
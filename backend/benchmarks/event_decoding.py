@@ -0,0 +1,132 @@
+"""Events per second through AgentEventFactory.from_json and SSEEventFactory.from_event
+
+Both sit on the path of every event sent to every viewer. Each is measured
+per event type against the implementation it replaced: a BaseEvent pass
+followed by an if/elif chain for from_json, and validated construction of
+the SSE models through an intermediate BaseEventData for from_event.
+
+Run from the backend directory:
+    python -m benchmarks.event_decoding [--rounds 2000]
+"""
+import argparse
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+from app.domain.events.agent_events import (
+    AgentEvent,
+    AgentEventFactory,
+    BaseEvent,
+    DoneEvent,
+    ErrorEvent,
+    MessageEvent,
+    PlanEvent,
+    QueueEvent,
+    StepEvent,
+    TitleEvent,
+    ToolEvent,
+    WaitEvent,
+)
+from app.interfaces.schemas.event import (
+    AgentSSEEvent,
+    BaseEventData,
+    DoneSSEEvent,
+    ErrorEventData,
+    ErrorSSEEvent,
+    MessageEventData,
+    MessageSSEEvent,
+    PlanEventData,
+    PlanSSEEvent,
+    QueueEventData,
+    QueueSSEEvent,
+    SSEEventFactory,
+    StepEventData,
+    StepSSEEvent,
+    TitleEventData,
+    TitleSSEEvent,
+    ToolEventData,
+    ToolSSEEvent,
+    WaitSSEEvent,
+)
+from benchmarks.event_encoding import sample_events
+
+_LEGACY_EVENT_CLASSES = [PlanEvent, StepEvent, ToolEvent, MessageEvent, ErrorEvent, DoneEvent, TitleEvent, WaitEvent]
+
+
+def legacy_from_json(event_str: str) -> AgentEvent:
+    event = BaseEvent.model_validate_json(event_str)
+    for event_cls in _LEGACY_EVENT_CLASSES:
+        if event.type == event_cls.model_fields["type"].default:
+            return event_cls.model_validate_json(event_str)
+    return event
+
+
+def legacy_from_event(event: AgentEvent) -> Optional[AgentSSEEvent]:
+    base_event = BaseEventData(event_id=event.id, timestamp=int(event.timestamp.timestamp()))
+    if isinstance(event, PlanEvent):
+        return PlanSSEEvent(data=PlanEventData(**base_event.model_dump(), steps=[
+            StepEventData(status=step.status, id=step.id, description=step.description) for step in event.plan.steps
+        ]))
+    elif isinstance(event, MessageEvent):
+        return MessageSSEEvent(data=MessageEventData(**base_event.model_dump(), content=event.message, role=event.role))
+    elif isinstance(event, TitleEvent):
+        return TitleSSEEvent(data=TitleEventData(**base_event.model_dump(), title=event.title))
+    elif isinstance(event, ToolEvent):
+        return ToolSSEEvent(data=ToolEventData(
+            **base_event.model_dump(),
+            tool_call_id=event.tool_call_id,
+            name=event.tool_name,
+            function=event.function_name,
+            args=event.function_args,
+            status=event.status,
+            content=event.tool_content
+        ))
+    elif isinstance(event, StepEvent):
+        return StepSSEEvent(data=StepEventData(
+            **base_event.model_dump(), status=event.step.status, id=event.step.id, description=event.step.description
+        ))
+    elif isinstance(event, DoneEvent):
+        return DoneSSEEvent(data=base_event)
+    elif isinstance(event, ErrorEvent):
+        return ErrorSSEEvent(data=ErrorEventData(**base_event.model_dump(), error=event.error))
+    elif isinstance(event, WaitEvent):
+        return WaitSSEEvent(data=base_event)
+    elif isinstance(event, QueueEvent):
+        return QueueSSEEvent(data=QueueEventData(**base_event.model_dump(), position=event.position))
+
+
+def events_per_second(fn: Callable, inputs: List, rounds: int, repeat: int = 5) -> float:
+    """Throughput of fn over inputs, best of `repeat` runs to filter out noise"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for item in inputs:
+                fn(item)
+        best = min(best, time.perf_counter() - start)
+    return rounds * len(inputs) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=2000, help="Times each event is decoded and converted")
+    args = parser.parse_args()
+
+    events_by_type: Dict[str, List[BaseEvent]] = OrderedDict()
+    for event in sample_events() + [ErrorEvent(error="Task error: sandbox unavailable"), QueueEvent(position=3)]:
+        events_by_type.setdefault(event.type, []).append(event)
+
+    print(f"{'type':<10}{'from_json old':>16}{'from_json new':>16}{'speedup':>9}{'from_event old':>17}{'from_event new':>17}{'speedup':>9}")
+    for event_type, events in events_by_type.items():
+        payloads = [event.model_dump_json() for event in events]
+        json_old = events_per_second(legacy_from_json, payloads, args.rounds)
+        json_new = events_per_second(AgentEventFactory.from_json, payloads, args.rounds)
+        sse_old = events_per_second(legacy_from_event, events, args.rounds)
+        sse_new = events_per_second(SSEEventFactory.from_event, events, args.rounds)
+        print(
+            f"{event_type:<10}{json_old:>16,.0f}{json_new:>16,.0f}{json_new / json_old:>8.2f}x"
+            f"{sse_old:>17,.0f}{sse_new:>17,.0f}{sse_new / sse_old:>8.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Compare the JSON and msgpack encodings of task stream events
+
+Reports bytes on the wire and encode/decode CPU time per event for a
+representative mix of agent events.
+
+Run from the backend directory:
+    python -m benchmarks.event_encoding [--rounds 500]
+"""
+import argparse
+import time
+from typing import Callable, List, Tuple
+from app.domain.events.agent_events import (
+    BaseEvent,
+    DoneEvent,
+    MessageEvent,
+    PlanEvent,
+    PlanStatus,
+    SearchToolContent,
+    ShellToolContent,
+    FileToolContent,
+    StepEvent,
+    StepStatus,
+    TitleEvent,
+    ToolEvent,
+    ToolStatus,
+    WaitEvent,
+)
+from app.domain.events.event_codec import AgentEventCodec, EventEncoding
+from app.domain.models.plan import Plan, Step
+from app.domain.models.tool_result import ToolResult
+
+
+def sample_events() -> List[BaseEvent]:
+    """Events in the proportions a typical task writes them"""
+    steps = [Step(id=str(i), description=f"Step {i}: collect and summarize the sources about topic {i}") for i in range(1, 6)]
+    plan = Plan(id="plan-1", title="Research report", goal="Write a short report on the topic", steps=steps, message="I will research the topic and write a report.")
+    events: List[BaseEvent] = [
+        TitleEvent(title=plan.title),
+        MessageEvent(message=plan.message),
+        PlanEvent(status=PlanStatus.CREATED, plan=plan),
+    ]
+    for step in steps:
+        events.append(StepEvent(status=StepStatus.STARTED, step=step))
+        events.append(ToolEvent(
+            tool_call_id="call_search", tool_name="search", function_name="info_search_web",
+            function_args={"query": step.description}, status=ToolStatus.CALLING,
+        ))
+        results = [{"title": f"Result {i}", "link": f"https://example.com/{i}", "snippet": "Lorem ipsum dolor sit amet " * 4} for i in range(8)]
+        events.append(ToolEvent(
+            tool_call_id="call_search", tool_name="search", function_name="info_search_web",
+            function_args={"query": step.description}, status=ToolStatus.CALLED,
+            function_result=ToolResult(success=True, data={"results": results}),
+            tool_content=SearchToolContent(results=results),
+        ))
+        console = [{"ps1": "ubuntu@sandbox:~ $", "command": "ls -la", "output": "total 8\ndrwxr-xr-x 2 ubuntu ubuntu 4096 .\n" * 5}]
+        events.append(ToolEvent(
+            tool_call_id="call_shell", tool_name="shell", function_name="shell_exec",
+            function_args={"id": "main", "exec_dir": "/home/ubuntu", "command": "ls -la"}, status=ToolStatus.CALLED,
+            function_result=ToolResult(success=True, data={"output": console[0]["output"]}),
+            tool_content=ShellToolContent(console=console),
+        ))
+        events.append(ToolEvent(
+            tool_call_id="call_file", tool_name="file", function_name="file_write",
+            function_args={"file": "/home/ubuntu/report.md", "content": "# Report\n" + "Some findings.\n" * 20}, status=ToolStatus.CALLED,
+            function_result=ToolResult(success=True),
+            tool_content=FileToolContent(content="# Report\n" + "Some findings.\n" * 20),
+        ))
+        events.append(MessageEvent(message=f"Finished {step.description}"))
+        events.append(StepEvent(status=StepStatus.COMPLETED, step=step))
+        events.append(PlanEvent(status=PlanStatus.UPDATED, plan=plan))
+    events.append(WaitEvent())
+    events.append(DoneEvent())
+    return events
+
+
+def measure(fn: Callable[[], None], rounds: int, repeat: int = 5) -> float:
+    """Seconds per call of fn, best of `repeat` runs to filter out noise"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            fn()
+        best = min(best, (time.perf_counter() - start) / rounds)
+    return best
+
+
+def run(rounds: int) -> List[Tuple[str, int, float, float]]:
+    events = sample_events()
+    results = []
+    for encoding in EventEncoding:
+        codec = AgentEventCodec(encoding)
+        # Payloads as a reader gets them from the text Redis connection
+        payloads = [codec.encode(event) for event in events]
+        received = [p if isinstance(p, str) else p.decode("utf-8", "surrogateescape") for p in payloads]
+        wire_bytes = sum(len(p.encode("utf-8") if isinstance(p, str) else p) for p in payloads)
+        encode_time = measure(lambda: [codec.encode(event) for event in events], rounds)
+        decode_time = measure(lambda: [AgentEventCodec.decode(p) for p in received], rounds)
+        results.append((encoding.value, wire_bytes, encode_time, decode_time))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=500, help="Times the event mix is encoded and decoded")
+    args = parser.parse_args()
+
+    count = len(sample_events())
+    results = run(args.rounds)
+    baseline_bytes, baseline_decode = results[0][1], results[0][3]
+    print(f"{count} events per round, {args.rounds} rounds")
+    print(f"{'encoding':<10}{'bytes/event':>14}{'vs json':>10}{'encode us/event':>18}{'decode us/event':>18}{'vs json':>10}")
+    for encoding, wire_bytes, encode_time, decode_time in results:
+        print(
+            f"{encoding:<10}{wire_bytes / count:>14.1f}{wire_bytes / baseline_bytes:>10.2f}"
+            f"{encode_time / count * 1e6:>18.2f}{decode_time / count * 1e6:>18.2f}{decode_time / baseline_decode:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Bytes sent to MongoDB per agent step by the two memory persistence schemes
+
+The old scheme $set the whole memory after every message, the new one
+$pushes only the messages of the step. Sizes are those of the BSON update
+documents for a memory already holding 10, 100 and 1000 messages.
+
+Run from the backend directory:
+    python -m benchmarks.memory_writes [--sizes 10 100 1000]
+"""
+import argparse
+import json
+from datetime import datetime, UTC
+from typing import Any, Dict, List
+import bson
+from app.domain.models.tool_result import ToolResult
+
+
+def step_messages(i: int) -> List[Dict[str, Any]]:
+    """Messages one executor step adds: a tool call and its result"""
+    results = [{"title": f"Result {j}", "link": f"https://example.com/{i}/{j}", "snippet": "Lorem ipsum dolor sit amet " * 4} for j in range(8)]
+    return [
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{
+                "id": f"call_{i}",
+                "type": "function",
+                "function": {"name": "info_search_web", "arguments": json.dumps({"query": f"topic {i}"})},
+            }],
+        },
+        {
+            "role": "tool",
+            "tool_call_id": f"call_{i}",
+            "content": ToolResult(success=True, data={"results": results}).model_dump_json(),
+        },
+    ]
+
+
+def memory_of(size: int) -> List[Dict[str, Any]]:
+    messages = [{"role": "system", "content": "You are a task execution agent. " * 20}]
+    i = 0
+    while len(messages) < size:
+        messages.extend(step_messages(i))
+        i += 1
+    return messages[:size]
+
+
+def set_update_bytes(messages: List[Dict[str, Any]], step: List[Dict[str, Any]]) -> int:
+    """The old scheme saved the whole memory once per message"""
+    total = 0
+    for i in range(1, len(step) + 1):
+        total += len(bson.encode({"$set": {
+            "memories.execution": {"messages": messages + step[:i]},
+            "updated_at": datetime.now(UTC),
+        }}))
+    return total
+
+
+def push_update_bytes(step: List[Dict[str, Any]]) -> int:
+    """The new scheme appends the step's messages in one write"""
+    return len(bson.encode({
+        "$push": {"memories.execution.messages": {"$each": step}},
+        "$inc": {"memories.execution.version": 1},
+        "$set": {"updated_at": datetime.now(UTC)},
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Messages already in memory")
+    args = parser.parse_args()
+
+    step = step_messages(-1)
+    print(f"{'messages':>10}{'$set bytes/step':>18}{'$push bytes/step':>19}{'ratio':>10}")
+    for size in args.sizes:
+        old = set_update_bytes(memory_of(size), step)
+        new = push_update_bytes(step)
+        print(f"{size:>10}{old:>18,}{new:>19,}{old / new:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
 #!/bin/bash
 
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload  --timeout-graceful-shutdown 0
\ No newline at end of file
+exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload  --timeout-graceful-shutdown 0 \
+    --proxy-headers --forwarded-allow-ips "${FORWARDED_ALLOW_IPS:-127.0.0.1}"
\ No newline at end of file
@@ -1,3 +1,5 @@
 #!/bin/bash
 
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000  --timeout-graceful-shutdown 5
\ No newline at end of file
+# Client addresses come from X-Forwarded-For only when sent by a proxy in FORWARDED_ALLOW_IPS
+exec uvicorn app.main:app --host 0.0.0.0 --port 8000  --timeout-graceful-shutdown 5 \
+    --proxy-headers --forwarded-allow-ips "${FORWARDED_ALLOW_IPS:-127.0.0.1}"
\ No newline at end of file
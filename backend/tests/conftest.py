@@ -0,0 +1,4 @@
+import os
+
+# Settings refuse to load without an API key, the tests never reach the LLM
+os.environ.setdefault("API_KEY", "test")
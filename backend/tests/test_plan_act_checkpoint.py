@@ -0,0 +1,129 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+from app.domain.events.agent_events import PlanEvent, PlanStatus
+from app.domain.models.checkpoint import FlowCheckpoint
+from app.domain.models.plan import ExecutionStatus, Plan, Step
+from app.domain.models.session import Session, SessionStatus
+from app.domain.services.flows.plan_act import AgentStatus, PlanActFlow
+
+
+class FakeSessionRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    async def find_by_id(self, session_id: str) -> Optional[Session]:
+        return self.session
+
+    async def update_status(self, session_id: str, status: SessionStatus) -> None:
+        self.session.status = status
+
+    async def get_latest_event(self, session_id: str, event_type: str):
+        return None
+
+
+class FakeCheckpointRepository:
+    def __init__(self):
+        self.checkpoints: Dict[str, FlowCheckpoint] = {}
+
+    async def save(self, checkpoint: FlowCheckpoint) -> None:
+        self.checkpoints[checkpoint.session_id] = checkpoint
+
+    async def find_by_session_id(self, session_id: str) -> Optional[FlowCheckpoint]:
+        return self.checkpoints.get(session_id)
+
+    async def delete(self, session_id: str) -> None:
+        self.checkpoints.pop(session_id, None)
+
+
+class FakePlanner:
+    def __init__(self, plan: Plan):
+        self.plan = plan
+        self.messages: List[str] = []
+
+    async def roll_back(self):
+        pass
+
+    async def create_plan(self, message: Optional[str] = None):
+        self.messages.append(message)
+        yield PlanEvent(status=PlanStatus.CREATED, plan=self.plan)
+
+    async def update_plan(self, plan: Plan):
+        return
+        yield
+
+
+class FakeExecutor:
+    def __init__(self):
+        self.steps: List[str] = []
+
+    async def roll_back(self):
+        pass
+
+    async def execute_step(self, plan: Plan, step: Step, message: str = ""):
+        self.steps.append(step.id)
+        step.status = ExecutionStatus.COMPLETED
+        return
+        yield
+
+
+def _plan(plan_id: str) -> Plan:
+    return Plan(id=plan_id, title=plan_id, goal=plan_id, message=plan_id, steps=[Step(id=f"{plan_id}-1", description=plan_id)])
+
+
+def _flow(status: SessionStatus, checkpoint: Optional[FlowCheckpoint]):
+    session = Session(id="session", agent_id="agent", status=status)
+    checkpoints = FakeCheckpointRepository()
+    if checkpoint:
+        checkpoints.checkpoints[checkpoint.session_id] = checkpoint
+    llm = SimpleNamespace(model_name="model", temperature=0.0, max_tokens=1024)
+    flow = PlanActFlow(
+        agent_id="agent",
+        agent_repository=None,
+        session_id=session.id,
+        session_repository=FakeSessionRepository(session),
+        llm=llm,
+        sandbox=None,
+        browser=None,
+        json_parser=None,
+        checkpoint_repository=checkpoints,
+    )
+    flow.planner = FakePlanner(_plan("new"))
+    flow.executor = FakeExecutor()
+    return flow, checkpoints
+
+
+async def _run(flow: PlanActFlow, message: str) -> None:
+    async for _ in flow.run(message):
+        pass
+
+
+def _checkpoint(message: str) -> FlowCheckpoint:
+    return FlowCheckpoint(
+        session_id="session",
+        agent_id="agent",
+        status=AgentStatus.EXECUTING.value,
+        message=message,
+        plan=_plan("old"),
+        step_id="old-1",
+    )
+
+
+def test_checkpoint_of_another_message_is_not_resumed():
+    flow, checkpoints = _flow(SessionStatus.RUNNING, _checkpoint("old message"))
+
+    asyncio.run(_run(flow, "new message"))
+
+    assert flow.planner.messages == ["new message"]
+    assert flow.executor.steps == ["new-1"]
+    assert checkpoints.checkpoints == {}
+
+
+def test_checkpoint_of_the_same_message_is_resumed():
+    flow, checkpoints = _flow(SessionStatus.RUNNING, _checkpoint("old message"))
+
+    asyncio.run(_run(flow, "old message"))
+
+    assert flow.planner.messages == []
+    assert flow.executor.steps == ["old-1"]
+    assert checkpoints.checkpoints == {}
@@ -0,0 +1,217 @@
+"""Check that every repository query is answered from an index
+
+Runs every MongoDB repository method against a scratch database on a real
+mongod, records the commands they send and explains each of them. Skipped
+when no mongod is reachable at TEST_MONGODB_URI (mongodb://localhost:27017
+by default).
+"""
+import asyncio
+import copy
+import os
+import uuid
+from datetime import datetime, timedelta, UTC
+from typing import Any, Dict, Iterator, List
+import pytest
+from beanie import init_beanie
+from pymongo import AsyncMongoClient, monitoring
+from pymongo.errors import PyMongoError
+from app.domain.events.agent_events import MessageEvent, PlanEvent, PlanStatus, TitleEvent
+from app.domain.models.agent import Agent
+from app.domain.models.checkpoint import FlowCheckpoint
+from app.domain.models.llm_usage import LLMCall
+from app.domain.models.memory import Memory
+from app.domain.models.plan import Plan, Step
+from app.domain.models.session import Session, SessionStatus, SessionUpdate
+from app.infrastructure.external.archive.gridfs_session_archive import GridFSSessionArchive
+from app.infrastructure.models.documents import DOCUMENT_MODELS, AttachmentDocument
+from app.infrastructure.models.index_sync import sync_indexes
+from app.infrastructure.repositories.mongo_agent_repository import MongoAgentRepository
+from app.infrastructure.repositories.mongo_attachment_repository import AttachmentRepository
+from app.infrastructure.repositories.mongo_checkpoint_repository import MongoCheckpointRepository
+from app.infrastructure.repositories.mongo_llm_usage_repository import MongoLLMUsageRepository
+from app.infrastructure.repositories.mongo_session_repository import MongoSessionRepository
+
+MONGODB_URI = os.environ.get("TEST_MONGODB_URI", "mongodb://localhost:27017")
+
+_EXPLAINABLE = {"find", "update", "delete", "findAndModify", "aggregate", "count", "distinct"}
+# Fields the driver adds to commands that explain does not accept
+_DRIVER_FIELDS = {"lsid", "$db", "$clusterTime", "$readPreference", "txnNumber", "readConcern", "writeConcern"}
+# Stages reading an index, lookups by _id show up as IDHACK or EXPRESS_IXSCAN rather than IXSCAN
+_INDEX_STAGES = {"IXSCAN", "IDHACK", "EXPRESS_IXSCAN", "COUNT_SCAN", "DISTINCT_SCAN"}
+
+
+class CommandRecorder(monitoring.CommandListener):
+    """Keeps a copy of the query commands sent to one database"""
+
+    def __init__(self, database: str):
+        self.database = database
+        self.recording = False
+        self.commands: List[Dict[str, Any]] = []
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if self.recording and event.database_name == self.database and event.command_name in _EXPLAINABLE:
+            command = {key: copy.deepcopy(value) for key, value in event.command.items() if key not in _DRIVER_FIELDS}
+            self.commands.append(command)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        pass
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        pass
+
+
+async def exercise_repositories() -> None:
+    """Call every repository method at least once"""
+    agents = MongoAgentRepository()
+    agent = Agent()
+    await agents.save(agent)
+    await agents.save(agent)
+    await agents.find_by_id(agent.id)
+    await agents.add_memory(agent.id, "planner", Memory())
+    await agents.get_memory(agent.id, "planner")
+    version = await agents.append_memory(agent.id, "planner", [{"role": "user", "content": "hello"}], 0)
+    await agents.append_memory(agent.id, "planner", [{"role": "user", "content": "stale"}], version + 10)
+    await agents.save_memory(agent.id, "planner", Memory(messages=[{"role": "user", "content": "hello"}]))
+    await agents.save_memory_summary(agent.id, "planner", "Greeted", 1)
+    await agents.save_tool_payload(agent.id, "call-1", "result")
+    await agents.save_tool_payload(agent.id, "call-1", "result")
+    await agents.get_tool_payload(agent.id, "call-1")
+
+    sessions = MongoSessionRepository(cache_size=10)
+    session = Session(agent_id=agent.id)
+    await sessions.save(session)
+    await sessions.save(session)
+    await sessions.find_by_id(session.id)
+    await sessions.find_by_id(session.id)
+    plan = Plan(id="plan", title="Plan", goal="Goal", steps=[Step(id="1", description="Step")])
+    await sessions.add_event(session.id, MessageEvent(message="hello", role="user"))
+    await sessions.add_events(session.id, [TitleEvent(title="Title"), PlanEvent(status=PlanStatus.CREATED, plan=plan)])
+    async for _ in sessions.get_events(session.id):
+        pass
+    await sessions.get_latest_event(session.id, "plan")
+    await sessions.get_event_page(session.id, 2)
+    await sessions.get_event_page(session.id, 2, before_seq=3, compact=True)
+    await sessions.get_event_page(session.id, 2, after_seq=1)
+    await sessions.update_title(session.id, "Title")
+    await sessions.update_latest_message(session.id, "hello", datetime.now(UTC))
+    await sessions.update_status(session.id, SessionStatus.RUNNING)
+    await sessions.update_unread_message_count(session.id, 0)
+    await sessions.increment_unread_message_count(session.id)
+    await sessions.apply_update(session.id, SessionUpdate(title="Title", unread_message_increment=1))
+    await sessions.get_all()
+    await sessions.get_summaries(10)
+    await sessions.get_summaries(10, (datetime.now(UTC), session.id))
+    await sessions.get_summaries_by_ids([session.id])
+    await sessions.migrate_embedded_events()
+
+    archive = GridFSSessionArchive()
+    await archive.sweep()
+    await archive.restore(session.id)
+    await archive.discard(session.id)
+
+    checkpoints = MongoCheckpointRepository()
+    await checkpoints.save(FlowCheckpoint(session_id=session.id, agent_id=agent.id, status="planning", message="hello"))
+    await checkpoints.find_by_session_id(session.id)
+    await checkpoints.get_all()
+    await checkpoints.claim_recovery(session.id, 0)
+    await checkpoints.delete(session.id)
+
+    llm_usage = MongoLLMUsageRepository()
+    await llm_usage.add_calls([LLMCall(session_id=session.id, agent_id=agent.id, caller="planner", model="model")])
+    await llm_usage.get_usage(session_id=session.id)
+    await llm_usage.get_usage(agent_id=agent.id, since=datetime.now(UTC) - timedelta(days=1))
+    await llm_usage.get_usage(since=datetime.now(UTC) - timedelta(days=1))
+
+    attachments = AttachmentRepository()
+    attachment = await attachments.save(AttachmentDocument(
+        attachment_id=uuid.uuid4().hex, session_id=session.id, filename="a.txt", content_type="text/plain",
+        file_size=1, storage_type="mongodb", storage_url="gridfs://a",
+    ))
+    await attachments.find_by_id(attachment.id)
+    await attachments.find_by_session_id(session.id)
+    await attachments.delete(attachment.attachment_id)
+
+    await sessions.delete(session.id)
+
+
+def stages(plan: Any) -> Iterator[str]:
+    """Stages of an explained plan, rejected plans left out"""
+    if isinstance(plan, dict):
+        for key, value in plan.items():
+            if key == "rejectedPlans":
+                continue
+            if key == "stage" and isinstance(value, str):
+                yield value
+            else:
+                yield from stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from stages(item)
+
+
+def describe(command: Dict[str, Any]) -> str:
+    name = next(iter(command))
+    if name == "update":
+        query = [statement["q"] for statement in command["updates"]]
+    elif name == "delete":
+        query = [statement["q"] for statement in command["deletes"]]
+    elif name == "aggregate":
+        query = command["pipeline"]
+    else:
+        query = command.get("filter", command.get("query", {}))
+    extras = {key: command[key] for key in ("sort", "hint") if key in command}
+    return f"{name} {command[name]} {query}{' ' + str(extras) if extras else ''}"
+
+
+async def explain_repository_queries(uri: str) -> List[str]:
+    """Explain every distinct query the repositories send
+
+    Returns:
+        List[str]: Queries whose winning plan scans a collection or reads no index
+    """
+    database = f"query_plans_{uuid.uuid4().hex[:8]}"
+    recorder = CommandRecorder(database)
+    client = AsyncMongoClient(uri, event_listeners=[recorder])
+    try:
+        db = client[database]
+        await init_beanie(database=db, document_models=DOCUMENT_MODELS, skip_indexes=True)
+        await sync_indexes(DOCUMENT_MODELS)
+        recorder.recording = True
+        await exercise_repositories()
+        recorder.recording = False
+
+        failures = []
+        seen = set()
+        for command in recorder.commands:
+            description = describe(command)
+            if description in seen:
+                continue
+            seen.add(description)
+            explained = await db.command({"explain": command, "verbosity": "queryPlanner"})
+            plan_stages = list(stages(explained.get("queryPlanner", explained)))
+            if "COLLSCAN" in plan_stages or not _INDEX_STAGES.intersection(plan_stages):
+                failures.append(f"{'>'.join(plan_stages)} {description}")
+        return failures
+    finally:
+        await client.drop_database(database)
+        await client.close()
+
+
+async def _mongod_reachable(uri: str) -> bool:
+    client = AsyncMongoClient(uri, serverSelectionTimeoutMS=1000)
+    try:
+        await client.admin.command("ping")
+        return True
+    except PyMongoError:
+        return False
+    finally:
+        await client.close()
+
+
+def test_repository_queries_use_indexes():
+    if not asyncio.run(_mongod_reachable(MONGODB_URI)):
+        pytest.skip(f"No mongod reachable at {MONGODB_URI}")
+
+    failures = asyncio.run(explain_repository_queries(MONGODB_URI))
+
+    assert not failures, "Queries not answered from an index:\n" + "\n".join(failures)
@@ -0,0 +1,3 @@
+#!/bin/bash
+
+exec python -m app.worker
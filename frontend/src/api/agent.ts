@@ -1,7 +1,7 @@
 // Backend API service
 import { apiClient, BASE_URL, ApiResponse, createSSEConnection, SSECallbacks } from './client';
 import { AgentSSEEvent } from '../types/event';
-import { CreateSessionResponse, GetSessionResponse, ShellViewResponse, FileViewResponse, ListSessionResponse } from '../types/response';
+import { CreateSessionResponse, GetSessionResponse, ShellViewResponse, FileViewResponse, ListSessionResponse, SessionChangesResponse } from '../types/response';
 
 /**
  * Create Session
@@ -12,18 +12,33 @@ export async function createSession(): Promise<CreateSessionResponse> {
   return response.data.data;
 }
 
-export async function getSession(sessionId: string): Promise<GetSessionResponse> {
-  const response = await apiClient.get<ApiResponse<GetSessionResponse>>(`/sessions/${sessionId}`);
+export interface GetSessionOptions {
+  limit?: number;   // Latest events only, the whole history if unset
+  before?: number;  // prev_cursor of a page, to read older events
+  after?: number;   // next_cursor of a page, to read newer events
+  compact?: boolean;  // Leave tool content out
+}
+
+export async function getSession(sessionId: string, options?: GetSessionOptions): Promise<GetSessionResponse> {
+  const response = await apiClient.get<ApiResponse<GetSessionResponse>>(`/sessions/${sessionId}`, {
+    params: options
+  });
   return response.data.data;
 }
 
-export async function getSessions(): Promise<ListSessionResponse> {
-  const response = await apiClient.get<ApiResponse<ListSessionResponse>>('/sessions');
+export async function getSessions(limit?: number, cursor?: string): Promise<ListSessionResponse> {
+  const response = await apiClient.get<ApiResponse<ListSessionResponse>>('/sessions', {
+    params: { limit, cursor }
+  });
   return response.data.data;
 }
 
-export async function getSessionsSSE(callbacks?: SSECallbacks<ListSessionResponse>): Promise<() => void> {
-  return createSSEConnection<ListSessionResponse>(
+/**
+ * Follow the session list: a 'sessions' event carries a full first page,
+ * 'session_changes' events only the sessions changed or deleted since
+ */
+export async function getSessionsSSE(callbacks?: SSECallbacks<ListSessionResponse | SessionChangesResponse>): Promise<() => void> {
+  return createSSEConnection<ListSessionResponse | SessionChangesResponse>(
     '/sessions',
     {
       method: 'POST'
@@ -35,7 +35,10 @@ export const TOOL_FUNCTION_MAP: {[key: string]: string} = {
   
   // Message tools
   "message_notify_user": "Sending notification",
-  "message_ask_user": "Asking question"
+  "message_ask_user": "Asking question",
+
+  // Recall tools
+  "recall_tool_result": "Recalling tool result"
 };
 
 /**
@@ -66,7 +69,8 @@ export const TOOL_FUNCTION_ARG_MAP: {[key: string]: string} = {
   "browser_console_view": "console",
   "info_search_web": "query",
   "message_notify_user": "message",
-  "message_ask_user": "question"
+  "message_ask_user": "question",
+  "recall_tool_result": "tool_call_id"
 };
 
 /**
@@ -77,7 +81,8 @@ export const TOOL_NAME_MAP: {[key: string]: string} = {
   "file": "File",
   "browser": "Browser",
   "info": "Information",
-  "message": "Message"
+  "message": "Message",
+  "recall": "Memory"
 };
 
 import SearchIcon from '../components/icons/SearchIcon.vue';
@@ -5,9 +5,12 @@ export default {
   'New Chat': 'New Chat',
   'New Task': 'New Task',
   'Thinking': 'Thinking',
+  'Waiting in queue, position {position}': 'Waiting in queue, position {position}',
+  'Load earlier messages': 'Load earlier messages',
   'Task Progress': 'Task Progress',
   'Task Completed': 'Task Completed',
   'Create a task to get started': 'Create a task to get started',
+  'Load more tasks': 'Load more tasks',
   'Delete': 'Delete',
   'Just now': 'Just now',
   'minutes ago': 'minutes ago',
@@ -58,12 +61,15 @@ export default {
   // Message tools
   'Sending notification': 'Sending notification',
   'Asking question': 'Asking question',
+  // Recall tools
+  'Recalling tool result': 'Recalling tool result',
   // Tool names
   'Terminal': 'Terminal',
   'File': 'File',
   'Browser': 'Browser',
   'Information': 'Information',
   'Message': 'Message',
+  'Memory': 'Memory',
   // Dialog
   'Confirm': 'Confirm',
   'Cancel': 'Cancel',
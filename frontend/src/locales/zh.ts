@@ -5,9 +5,12 @@ export default {
   'New Chat': '新对话',
   'New Task': '新建任务',
   'Thinking': '思考中',
+  'Waiting in queue, position {position}': '排队中，第 {position} 位',
+  'Load earlier messages': '加载更早的消息',
   'Task Progress': '任务进度',
   'Task Completed': '任务已完成',
   'Create a task to get started': '新建一个任务以开始',
+  'Load more tasks': '加载更多任务',
   'Delete': '删除',
   'Just now': '刚刚',
   'minutes ago': '分钟前',
@@ -58,12 +61,15 @@ export default {
   // Message tools
   'Sending notification': '正在发送通知',
   'Asking question': '正在提问',
+  // Recall tools
+  'Recalling tool result': '正在调取工具结果',
   // Tool names
   'Terminal': '终端',
   'File': '文件',
   'Browser': '浏览器',
   'Information': '信息',
   'Message': '消息',
+  'Memory': '记忆',
   // Dialog
   'Confirm': '确认',
   'Cancel': '取消',
@@ -1,6 +1,6 @@
 export type AgentSSEEvent = {
-  event: 'tool' | 'step' | 'message' | 'error' | 'done' | 'title' | 'wait' | 'plan';
-  data: ToolEventData | StepEventData | MessageEventData | ErrorEventData | DoneEventData | TitleEventData | WaitEventData | PlanEventData;
+  event: 'tool' | 'step' | 'message' | 'message_delta' | 'error' | 'done' | 'title' | 'wait' | 'plan' | 'queue';
+  data: ToolEventData | StepEventData | MessageEventData | MessageDeltaEventData | ErrorEventData | DoneEventData | TitleEventData | WaitEventData | PlanEventData | QueueEventData;
 }
 
 export interface BaseEventData {
@@ -28,6 +28,12 @@ export interface MessageEventData extends BaseEventData {
   role: "user" | "assistant";
 }
 
+export interface MessageDeltaEventData extends BaseEventData {
+  role: "assistant";
+  message_id: string;
+  delta: string;
+}
+
 export interface ErrorEventData extends BaseEventData {
   error: string;
 }
@@ -44,4 +50,8 @@ export interface TitleEventData extends BaseEventData {
 
 export interface PlanEventData extends BaseEventData {
   steps: StepEventData[];
-}
\ No newline at end of file
+}
+
+export interface QueueEventData extends BaseEventData {
+  position: number;
+}
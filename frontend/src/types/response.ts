@@ -15,6 +15,9 @@ export interface GetSessionResponse {
     session_id: string;
     title: string | null;
     events: AgentSSEEvent[];
+    prev_cursor?: number | null;
+    next_cursor?: number | null;
+    latest_plan?: AgentSSEEvent | null;
 }
 
 export interface ListSessionItem {
@@ -28,6 +31,12 @@ export interface ListSessionItem {
 
 export interface ListSessionResponse {
     sessions: ListSessionItem[];
+    next_cursor?: string | null;
+}
+
+export interface SessionChangesResponse {
+    sessions: ListSessionItem[];
+    deleted_session_ids: string[];
 }
 
 export interface ConsoleRecord {
@@ -1,7 +1,9 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import json
+import uuid
 import yaml
 from typing import List, Optional, Dict, Any
 import os
@@ -65,6 +67,40 @@ def load_mock_data():
 
 current_index = 0
 
+STREAM_PIECE_CHARS = 8
+
+def _pieces(text: str) -> List[str]:
+    return [text[i:i + STREAM_PIECE_CHARS] for i in range(0, len(text), STREAM_PIECE_CHARS)]
+
+def _chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+    chunk = {
+        "object": "chat.completion.chunk",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(chunk)}\n\n"
+
+async def stream_response(response: Dict[str, Any], delay: float):
+    """Send a mock response as chat completion chunks, content and tool call arguments in pieces"""
+    message = response["choices"][0]["message"]
+    pieces = _pieces(message.get("content") or "")
+    tool_calls = message.get("tool_calls") or []
+    for i, tool_call in enumerate(tool_calls):
+        function = tool_call.get("function") or {}
+        pieces.append({
+            "index": i,
+            "id": tool_call.get("id") or f"call_{uuid.uuid4().hex[:24]}",
+            "type": "function",
+            "function": {"name": function.get("name"), "arguments": ""},
+        })
+        pieces.extend({"index": i, "function": {"arguments": part}} for part in _pieces(function.get("arguments") or ""))
+    yield _chunk({"role": "assistant"})
+    for piece in pieces:
+        if delay > 0:
+            await asyncio.sleep(delay / max(len(pieces), 1))
+        yield _chunk({"content": piece} if isinstance(piece, str) else {"tool_calls": [piece]})
+    yield _chunk({}, "tool_calls" if tool_calls else "stop")
+    yield "data: [DONE]\n\n"
+
 @app.post("/v1/chat/completions", response_model=ChatCompletionResponse)
 async def chat_completions(request: ChatCompletionRequest):
     global current_index
@@ -75,6 +111,12 @@ async def chat_completions(request: ChatCompletionRequest):
         raise HTTPException(status_code=500, detail="No mock data available")
     
     delay = float(os.getenv("MOCK_DELAY", "1"))
+    if request.stream:
+        response = mock_data[current_index]
+        current_index = (current_index + 1) % len(mock_data)
+        logger.info(f"Streaming mock response {current_index}/{len(mock_data)}")
+        return StreamingResponse(stream_response(response, delay), media_type="text/event-stream")
+
     if delay > 0:
         logger.debug(f"Applying mock delay of {delay} seconds")
         await asyncio.sleep(delay)